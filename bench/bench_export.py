@@ -0,0 +1,270 @@
+# Benchmarks the extraction and encoding stages of the exporter on synthetic meshes, without Blender:
+#   python bench/bench_export.py [--cases small medium ...] [--repeat 5] [--save-baseline] [--threshold 0.25]
+#
+# Every case is one grid mesh run through the stages of a rigid model node:
+#   extract   Blender data -> MeshArrays, extract_loop_triangles
+#   process   welding, submesh split and stripping, process_mesh_arrays
+#   encode    sizing and writing the finished node, encode_blocks
+# Times are the median of --repeat runs, peak memory is what tracemalloc traces during one more run on top of
+# the memory in use when the stage starts. With a baseline, any stage whose time grew by more than
+# --threshold, and by more than 10 ms, is a regression and the exit code is 1. Baseline times are first
+# scaled by how much slower a fixed calibration workload runs now, shared machines vary by 2x between runs.
+
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+import fake_blender
+
+CONST_BASELINE_FILEPATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# name -> triangles, uv layers, materials
+CONST_CASES = {
+    "tiny": (1000, 0, 1),
+    "small": (10000, 1, 4),
+    "medium": (100000, 2, 16),
+    "uvs": (100000, 8, 4),
+    "materials": (100000, 1, 256),
+    "large": (1000000, 2, 8),
+    "huge": (5000000, 1, 8),
+}
+
+# huge needs several GB of memory, it only runs when asked for
+CONST_DEFAULT_CASES = ["tiny", "small", "medium", "uvs", "materials", "large"]
+
+CONST_STAGES = ("extract", "process", "encode")
+
+# Stages of the small cases take a few milliseconds and vary by as much between runs, slowdowns below this are noise
+CONST_MIN_REGRESSION_SECONDS = 0.01
+
+class StageResult:
+    def __init__(self, name):
+        self.name = name
+        self.runs_seconds = []
+        self.peak_bytes = 0
+        self.triangles_count = 0
+        self.output_bytes = 0
+
+    @property
+    def seconds(self):
+        # The median, one run slowed down by the machine moves it less than the mean or the best
+        return float(np.median(self.runs_seconds))
+
+    def to_dict(self):
+        return {
+            "seconds": round(self.seconds, 6),
+            "triangles_per_second": round(self.triangles_count / self.seconds),
+            "megabytes_per_second": round(self.output_bytes / self.seconds / (1024 * 1024), 3),
+            "peak_bytes": self.peak_bytes,
+        }
+
+def run_stages(exporter, obj, settings):
+    # One pass through every stage, returns the stage name -> (seconds, output bytes) of this pass
+    timings = {}
+    mesh = obj.data
+
+    start = time.perf_counter()
+    arrays = exporter.extract_loop_triangles(obj)
+    timings["extract"] = (time.perf_counter() - start, sum(array.nbytes for array in exporter.mesh_arrays_to_dict(arrays).values()))
+
+    start = time.perf_counter()
+    processed = exporter.process_mesh_arrays(arrays, len(mesh.materials), settings.weld_vertices, settings.weld_epsilon, settings.optimize_vertex_cache, settings.strip_unused_geometry)
+    timings["process"] = (time.perf_counter() - start, processed.vertices.nbytes + sum(triangles.nbytes for _, triangles in processed.sub_meshes))
+    del arrays, processed
+
+    # The node is built outside the timing, extracting and processing once more
+    model = exporter.ModelNode(obj, settings)
+    start = time.perf_counter()
+    buffer = exporter.encode_blocks([model])
+    timings["encode"] = (time.perf_counter() - start, len(buffer))
+
+    return timings
+
+def trace_stage_peaks(exporter, obj, settings):
+    # Same stages as run_stages with tracemalloc on, which slows them down too much to time them
+    peaks = {}
+    mesh = obj.data
+    tracemalloc.start()
+
+    try:
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        arrays = exporter.extract_loop_triangles(obj)
+        peaks["extract"] = tracemalloc.get_traced_memory()[1] - start_bytes
+
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        processed = exporter.process_mesh_arrays(arrays, len(mesh.materials), settings.weld_vertices, settings.weld_epsilon, settings.optimize_vertex_cache, settings.strip_unused_geometry)
+        peaks["process"] = tracemalloc.get_traced_memory()[1] - start_bytes
+        del arrays, processed
+
+        model = exporter.ModelNode(obj, settings)
+        start_bytes = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        buffer = exporter.encode_blocks([model])
+        peaks["encode"] = tracemalloc.get_traced_memory()[1] - start_bytes
+        del model, buffer
+    finally:
+        tracemalloc.stop()
+
+    return peaks
+
+def run_case(exporter, name, repeat):
+    triangles_count, uv_layers_count, materials_count = CONST_CASES[name]
+    obj = fake_blender.build_grid_mesh(name, triangles_count, uv_layers_count, materials_count)
+    obj.data.calc_loop_triangles()
+    triangles_count = len(obj.data.loop_triangles)
+
+    settings = exporter.ExportSettings()
+    results = {stage: StageResult(stage) for stage in CONST_STAGES}
+
+    for _ in range(repeat):
+        gc.collect()
+        for stage, (seconds, output_bytes) in run_stages(exporter, obj, settings).items():
+            result = results[stage]
+            result.runs_seconds.append(seconds)
+            result.triangles_count = triangles_count
+            result.output_bytes = output_bytes
+
+    gc.collect()
+    for stage, peak_bytes in trace_stage_peaks(exporter, obj, settings).items():
+        results[stage].peak_bytes = peak_bytes
+
+    return triangles_count, results
+
+def calibrate(repeat):
+    # Median seconds of a fixed mix of NumPy sorting and a Python loop, like the stages
+    rng = np.random.default_rng(0)
+    values = rng.random(1000000)
+    runs_seconds = []
+
+    for _ in range(max(repeat, 3)):
+        start = time.perf_counter()
+        np.sort(values)
+        total = 0
+        for i in range(300000):
+            total += i & 7
+        runs_seconds.append(time.perf_counter() - start)
+
+    return float(np.median(runs_seconds))
+
+def describe_machine():
+    return {
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+    }
+
+def load_baseline(filepath):
+    if not os.path.exists(filepath):
+        return None
+
+    with open(filepath, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def machine_speed_ratio(report, baseline):
+    # How much slower the machine runs the calibration now than when the baseline was stored
+    baseline_seconds = baseline.get("calibration_seconds")
+    return report["calibration_seconds"] / baseline_seconds if baseline_seconds else 1.0
+
+def find_regressions(report, baseline, threshold):
+    # (case, stage, baseline seconds, seconds) of every stage slower than the scaled baseline by more than threshold
+    regressions = []
+    speed_ratio = machine_speed_ratio(report, baseline)
+
+    for name, case in report["cases"].items():
+        baseline_case = baseline["cases"].get(name)
+        if baseline_case is None:
+            continue
+
+        for stage in CONST_STAGES:
+            baseline_seconds = baseline_case["stages"][stage]["seconds"] * speed_ratio
+            seconds = case["stages"][stage]["seconds"]
+            if seconds > baseline_seconds * (1.0 + threshold) and seconds - baseline_seconds > CONST_MIN_REGRESSION_SECONDS:
+                regressions.append((name, stage, baseline_seconds, seconds))
+
+    return regressions
+
+def print_case(name, triangles_count, results, baseline_case, speed_ratio):
+    print(f"{name}: {triangles_count} triangles, {CONST_CASES[name][1]} uv layers, {CONST_CASES[name][2]} materials", flush=True)
+
+    for stage in CONST_STAGES:
+        result = results[stage]
+        line = f"  {stage:8} {result.seconds:9.4f} s {result.triangles_count / result.seconds / 1e6:9.2f} Mtris/s {result.output_bytes / result.seconds / (1024 * 1024):9.1f} MB/s {result.peak_bytes / (1024 * 1024):9.1f} MB peak"
+        if baseline_case is not None:
+            baseline_seconds = baseline_case["stages"][stage]["seconds"] * speed_ratio
+            line += f" {(result.seconds / baseline_seconds - 1.0) * 100.0:+7.1f} % vs baseline"
+
+        print(line, flush=True)
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="bench_export.py", description="Benchmark mesh extraction and encoding on synthetic meshes, without Blender.")
+    parser.add_argument("--cases", nargs="+", choices=list(CONST_CASES), default=CONST_DEFAULT_CASES, help="cases to run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case, the median counts")
+    parser.add_argument("--baseline", default=CONST_BASELINE_FILEPATH, help="baseline JSON to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results of the cases run in the baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=0.25, help="slowdown over the baseline that counts as a regression, 0.25 is 25 percent")
+    parser.add_argument("--report", help="write the results to this JSON file")
+    arguments = parser.parse_args(argv)
+
+    # The stand-in has to be in place before the exporter imports bpy
+    fake_blender.install()
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+    from BlenderCas2Exporter import exporter
+
+    baseline = None if arguments.save_baseline else load_baseline(arguments.baseline)
+    report = {"machine": describe_machine(), "calibration_seconds": calibrate(arguments.repeat), "cases": {}}
+    speed_ratio = machine_speed_ratio(report, baseline) if baseline is not None else 1.0
+    if speed_ratio != 1.0:
+        print(f"Calibration runs {speed_ratio:.2f}x as long as for the baseline, baseline times are scaled by it")
+
+    for name in arguments.cases:
+        triangles_count, results = run_case(exporter, name, arguments.repeat)
+        baseline_case = baseline["cases"].get(name) if baseline is not None else None
+        print_case(name, triangles_count, results, baseline_case, speed_ratio)
+        report["cases"][name] = {
+            "triangles": triangles_count,
+            "repeat": arguments.repeat,
+            "stages": {stage: results[stage].to_dict() for stage in CONST_STAGES},
+        }
+
+    if arguments.report:
+        with open(arguments.report, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+
+    if arguments.save_baseline:
+        # Cases that did not run keep their baseline, unless it was measured on another machine or without calibration
+        previous_baseline = load_baseline(arguments.baseline)
+        if previous_baseline is not None and previous_baseline["machine"] == report["machine"] and "calibration_seconds" in previous_baseline:
+            report["cases"] = {**previous_baseline["cases"], **report["cases"]}
+
+        with open(arguments.baseline, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=4)
+
+        print(f"Baseline written to {arguments.baseline}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline at {arguments.baseline}, run with --save-baseline to store one")
+        return 0
+
+    if baseline["machine"] != report["machine"]:
+        print("Baseline was measured on a different machine, compare with care: " + json.dumps(baseline["machine"]))
+
+    regressions = find_regressions(report, baseline, arguments.threshold)
+    for name, stage, baseline_seconds, seconds in regressions:
+        print(f"REGRESSION {name} {stage}: {seconds:.4f} s, baseline {baseline_seconds:.4f} s")
+
+    return 1 if len(regressions) > 0 else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
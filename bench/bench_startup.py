@@ -0,0 +1,58 @@
+# Measures what enabling the add-on costs at Blender startup, run it in the Blender to measure:
+#   blender --background --factory-startup --python bench/bench_startup.py
+# or with the bpy module installed in a plain Python:
+#   python bench/bench_startup.py
+#
+# Prints the time to import the package, register and unregister it, and the modules registering
+# pulled in, then the time the first export and import spend on loading what registering left out.
+
+import os
+import sys
+import time
+
+CONST_DEFERRED_MODULES = ("exporter", "importer", "watch")
+
+# Modules whose presence after registering means it did more than define operators
+CONST_WATCHED_MODULES = ("numpy", "bmesh", "mathutils", "multiprocessing", "concurrent.futures", "hashlib")
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+def main():
+    import bpy
+    import importlib
+
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+    modules_before = set(sys.modules)
+
+    import_seconds, package = timed(lambda: importlib.import_module("BlenderCas2Exporter"))
+    register_seconds, _ = timed(package.register)
+    registered_modules = set(sys.modules) - modules_before
+
+    print(f"import:     {import_seconds * 1000.0:8.2f} ms")
+    print(f"register:   {register_seconds * 1000.0:8.2f} ms, {len(registered_modules)} modules loaded")
+    for name in sorted(registered_modules):
+        print(f"  {name}")
+
+    pulled_in = [name for name in CONST_WATCHED_MODULES if name in registered_modules]
+    if len(pulled_in) > 0:
+        print("register pulled in " + ", ".join(pulled_in))
+
+    unregister_seconds, _ = timed(package.unregister)
+    print(f"unregister: {unregister_seconds * 1000.0:8.2f} ms")
+
+    # What the first export and import load, registering used to pay for this on every start
+    modules_before = set(sys.modules)
+    deferred_seconds, _ = timed(lambda: [importlib.import_module("BlenderCas2Exporter." + name) for name in CONST_DEFERRED_MODULES])
+    deferred_modules = set(sys.modules) - modules_before
+    print(f"first use:  {deferred_seconds * 1000.0:8.2f} ms, {len(deferred_modules)} modules loaded")
+
+    # Registering again after the modules are loaded must still work, as on reloading scripts
+    package.register()
+    package.unregister()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
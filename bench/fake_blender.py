@@ -0,0 +1,130 @@
+# Stand-in for the parts of bpy and bmesh the exporter reads while building a rigid model node,
+# so the extraction and encoding stages run on a plain Python with NumPy. Meshes keep their data in NumPy
+# arrays and hand it out through foreach_get like Blender's collections do. Nothing here draws, evaluates
+# modifiers or triangulates with BMesh: only the loop triangles path of the exporter is supported.
+
+import sys
+import types
+import numpy as np
+
+class FakeCollection:
+    # A bpy_prop_collection of len(self) items, attribute name -> (items, components) array
+    def __init__(self, length, arrays = None):
+        self.length = length
+        self.arrays = arrays or {}
+
+    def __len__(self):
+        return self.length
+
+    def foreach_get(self, attribute, data):
+        data[:] = self.arrays[attribute].ravel()
+
+class FakeUVLayer:
+    def __init__(self, name, uvs):
+        self.name = name
+        self.data = FakeCollection(len(uvs), {"uv": uvs})
+
+class FakeAttribute:
+    def __init__(self, name, data_type, domain, arrays):
+        self.name = name
+        self.data_type = data_type
+        self.domain = domain
+        self.data = FakeCollection(len(next(iter(arrays.values()))), arrays)
+
+class FakeMesh:
+    def __init__(self, name, positions, polygon_sizes, loop_vertices, material_indices, materials_count):
+        loop_starts = np.cumsum(polygon_sizes, dtype=np.int32) - polygon_sizes
+
+        self.name = name
+        self.is_editmode = False
+        self.vertices = FakeCollection(len(positions), {"co": positions})
+        self.edges = FakeCollection(len(loop_vertices)) # every loop has an edge, the exporter only checks there are some
+        self.loops = FakeCollection(len(loop_vertices), {"vertex_index": loop_vertices})
+        self.polygons = FakeCollection(len(polygon_sizes), {"loop_start": loop_starts, "loop_total": polygon_sizes, "material_index": material_indices})
+        self.loop_triangles = FakeCollection(0)
+        self.materials = [None] * materials_count
+        self.uv_layers = []
+        self.attributes = []
+
+    def calc_loop_triangles(self):
+        # Fan triangulation of every polygon, which is what Blender does for convex quads
+        polygon_sizes = self.polygons.arrays["loop_total"]
+        loop_starts = self.polygons.arrays["loop_start"]
+        triangle_counts = polygon_sizes - 2
+        polygon_of = np.repeat(np.arange(len(polygon_sizes)), triangle_counts)
+        fan_index = np.arange(len(polygon_of)) - np.repeat(np.cumsum(triangle_counts) - triangle_counts, triangle_counts)
+
+        triangle_loops = np.empty((len(polygon_of), 3), dtype=np.int32)
+        triangle_loops[:, 0] = loop_starts[polygon_of]
+        triangle_loops[:, 1] = loop_starts[polygon_of] + fan_index + 1
+        triangle_loops[:, 2] = loop_starts[polygon_of] + fan_index + 2
+        self.loop_triangles = FakeCollection(len(polygon_of), {"loops": triangle_loops, "material_index": self.polygons.arrays["material_index"][polygon_of]})
+
+class FakeObject:
+    def __init__(self, name, mesh):
+        self.name = name
+        self.type = 'MESH'
+        self.data = mesh
+        self.modifiers = []
+        self.properties = {}
+
+        positions = mesh.vertices.arrays["co"]
+        low, high = positions.min(axis=0), positions.max(axis=0)
+        self.bound_box = [(x, y, z) for x in (low[0], high[0]) for y in (low[1], high[1]) for z in (low[2], high[2])]
+
+    def items(self):
+        return self.properties.items()
+
+def build_grid_mesh(name, triangles_count, uv_layers_count, materials_count, seed = 0):
+    # A wavy grid of quads with about triangles_count triangles. Materials are assigned in bands of rows,
+    # every uv layer is the grid's own unwrap at a different scale, with a seam every 32 cells on the first.
+    rng = np.random.default_rng(seed)
+    quads_count = max(1, triangles_count // 2)
+    columns = max(1, int(np.sqrt(quads_count)))
+    rows = max(1, quads_count // columns)
+
+    grid_x, grid_y = np.meshgrid(np.arange(columns + 1, dtype=np.float32), np.arange(rows + 1, dtype=np.float32))
+    heights = np.sin(grid_x * 0.3) * np.cos(grid_y * 0.2) + rng.random(grid_x.shape, dtype=np.float32) * 0.01
+    positions = np.stack([grid_x.ravel() * 0.1, grid_y.ravel() * 0.1, heights.ravel()], axis=1).astype(np.float32)
+
+    # Counter-clockwise quads, row by row
+    cell_x, cell_y = np.meshgrid(np.arange(columns), np.arange(rows))
+    first = (cell_y * (columns + 1) + cell_x).ravel()
+    loop_vertices = np.stack([first, first + 1, first + columns + 2, first + columns + 1], axis=1).astype(np.int32).ravel()
+    polygon_sizes = np.full(rows * columns, 4, dtype=np.int32)
+    material_indices = (cell_y.ravel() * materials_count // rows).astype(np.int32)
+
+    mesh = FakeMesh(name, positions, polygon_sizes, loop_vertices, material_indices, materials_count)
+
+    loop_cells = np.repeat(np.stack([cell_x.ravel(), cell_y.ravel()], axis=1), 4, axis=0)
+    loop_uvs = np.stack([grid_x.ravel()[loop_vertices], grid_y.ravel()[loop_vertices]], axis=1)
+    for layer in range(uv_layers_count):
+        uvs = loop_uvs / np.float32(max(columns, rows) * (layer + 1))
+        if layer == 0:
+            uvs = uvs + (loop_cells // 32).astype(np.float32) * np.float32(0.01)
+
+        mesh.uv_layers.append(FakeUVLayer("UVMap" + ("" if layer == 0 else "." + str(layer).zfill(3)), uvs.astype(np.float32)))
+
+    colors = np.empty((len(loop_vertices), 4), dtype=np.float32)
+    colors[:, :3] = rng.integers(0, 256, (len(loop_vertices), 3)) / np.float32(255.0)
+    colors[:, 3] = 1.0
+    mesh.attributes.append(FakeAttribute("Color", 'BYTE_COLOR', 'CORNER', {"color_srgb": colors}))
+
+    return FakeObject(name, mesh)
+
+def build_bpy():
+    # The operators live in their own module, the exporter itself only reaches these at run time
+    bpy = types.ModuleType("bpy")
+    bpy.context = types.SimpleNamespace(scene=None)
+    bpy.data = types.SimpleNamespace(filepath="", objects=[], meshes=None)
+    bpy.app = types.SimpleNamespace(version_string="fake")
+    return bpy
+
+def install():
+    # Must run before the exporter is imported. Real modules are left alone, inside Blender this does nothing.
+    if "bpy" in sys.modules:
+        return False
+
+    sys.modules["bpy"] = build_bpy()
+    sys.modules["bmesh"] = types.ModuleType("bmesh")
+    return True
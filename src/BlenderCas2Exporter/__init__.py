@@ -0,0 +1,19 @@
+bl_info = {
+    "name": "Cas2 Exporter",
+    "author": "Mr.Jox (victimized.)",
+    "version": (1, 0, 0),
+    "blender": (4, 3, 1),
+    "category": "Export",
+}
+
+# Registering only defines the operators and menu entries, see operators.py. The exporter, importer and
+# watch modules import bpy, NumPy and bmesh when an operator first runs, and the file format and reader
+# modules of this package can be imported outside Blender.
+
+def register():
+    from . import operators
+    operators.register()
+
+def unregister():
+    from . import operators
+    operators.unregister()
@@ -0,0 +1,216 @@
+# Headless batch export, every job of a manifest is exported in a single Blender session:
+#   blender --background --python batch_export.py -- manifest.toml [--report report.json] [--dry-run] [--cache directory] [--profile]
+#
+# Manifest (JSON or TOML), relative paths are resolved against the manifest's directory:
+#   [defaults]                      optional, export settings applied to every job
+#   weld_vertices = true
+#
+#   [[jobs]]
+#   blend = "props/barrel.blend"
+#   output = "export/barrel.cs2"
+#   collection = "Export"           optional, objects of this collection and its children
+#   objects = ["barrel_*"]          optional, fnmatch patterns on object names
+#   weld_epsilon = 0.0001           optional, overrides the defaults for this job
+#   lod_ratios = [0.5, 0.25]        optional, generated LODs
+
+import argparse
+import fnmatch
+import json
+import os
+import sys
+import time
+import traceback
+
+# bpy and the exporter are imported inside the functions that need them: run as a script,
+# this file only becomes part of the package once the __main__ block imports it through it
+
+CONST_JOB_KEYS = {"blend", "output", "collection", "objects"}
+CONST_SETTINGS_KEYS = {"triangulation_method", "weld_vertices", "weld_epsilon", "optimize_vertex_cache", "strip_unused_geometry", "lod_ratios", "export_instances", "export_tangents", "export_animation", "translation_tolerance", "rotation_tolerance", "encode_processes", "streaming", "write_index"}
+
+class JobResult:
+    def __init__(self, job_index, output):
+        self.job_index = job_index
+        self.output = output
+        self.succeeded = False
+        self.seconds = 0.0
+        self.models_count = 0
+        self.file_size = 0
+        self.stripped_bytes = 0
+        self.dropped_lods_count = 0
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "job": self.job_index,
+            "output": self.output,
+            "succeeded": self.succeeded,
+            "seconds": round(self.seconds, 3),
+            "models": self.models_count,
+            "bytes": self.file_size,
+            "stripped_bytes": self.stripped_bytes,
+            "dropped_lods": self.dropped_lods_count,
+            "error": self.error,
+        }
+
+def load_manifest(path):
+    if path.lower().endswith(".toml"):
+        import tomllib
+        with open(path, 'rb') as file:
+            manifest = tomllib.load(file)
+    else:
+        with open(path, 'r', encoding='utf-8') as file:
+            manifest = json.load(file)
+
+    if not isinstance(manifest.get("jobs"), list) or len(manifest["jobs"]) == 0:
+        raise ValueError(path + " has no jobs")
+
+    base_directory = os.path.dirname(os.path.abspath(path))
+    defaults = manifest.get("defaults", {})
+    unknown_keys = set(defaults) - CONST_SETTINGS_KEYS
+    if unknown_keys:
+        raise ValueError("Unknown default settings: " + ", ".join(sorted(unknown_keys)))
+
+    jobs = []
+    for index, job in enumerate(manifest["jobs"]):
+        unknown_keys = set(job) - CONST_JOB_KEYS - CONST_SETTINGS_KEYS
+        if unknown_keys:
+            raise ValueError(f"Job {index} has unknown keys: " + ", ".join(sorted(unknown_keys)))
+
+        if "blend" not in job or "output" not in job:
+            raise ValueError(f"Job {index} needs both blend and output")
+
+        resolved = {**defaults, **job}
+        resolved["blend"] = os.path.join(base_directory, job["blend"])
+        resolved["output"] = os.path.join(base_directory, job["output"])
+        if isinstance(resolved.get("objects"), str):
+            resolved["objects"] = [resolved["objects"]]
+
+        jobs.append(resolved)
+
+    return jobs
+
+def build_settings(job):
+    from .exporter import ExportSettings, TriangulationMethod, check_lod_ratios
+
+    settings = ExportSettings()
+    settings.triangulation_method = TriangulationMethod[job.get("triangulation_method", settings.triangulation_method.name)]
+    settings.weld_vertices = bool(job.get("weld_vertices", settings.weld_vertices))
+    settings.weld_epsilon = float(job.get("weld_epsilon", settings.weld_epsilon))
+    settings.optimize_vertex_cache = bool(job.get("optimize_vertex_cache", settings.optimize_vertex_cache))
+    settings.strip_unused_geometry = bool(job.get("strip_unused_geometry", settings.strip_unused_geometry))
+    settings.lod_ratios = check_lod_ratios([float(ratio) for ratio in job.get("lod_ratios", settings.lod_ratios)])
+    settings.export_instances = bool(job.get("export_instances", settings.export_instances))
+    settings.export_tangents = bool(job.get("export_tangents", settings.export_tangents))
+    settings.export_animation = bool(job.get("export_animation", settings.export_animation))
+    settings.translation_tolerance = float(job.get("translation_tolerance", settings.translation_tolerance))
+    settings.rotation_tolerance = float(job.get("rotation_tolerance", settings.rotation_tolerance))
+    settings.encode_processes = int(job.get("encode_processes", settings.encode_processes))
+    settings.write_index = bool(job.get("write_index", settings.write_index))
+    return settings
+
+def select_objects(job):
+    import bpy
+
+    if "collection" in job:
+        collection = bpy.data.collections.get(job["collection"])
+        if collection is None:
+            raise ValueError("No collection named " + job["collection"])
+
+        objects = list(collection.all_objects)
+    else:
+        objects = list(bpy.data.objects)
+
+    if "objects" in job:
+        patterns = job["objects"]
+        objects = [obj for obj in objects if any(fnmatch.fnmatchcase(obj.name, pattern) for pattern in patterns)]
+
+    return objects
+
+def run_job(job, dry_run, cache, profile = False):
+    import bpy
+    from .exporter import export_cas2
+    from .cas2_profile import ExportProfile, Profiling, report_filepath
+
+    # Consecutive jobs on the same .blend file reuse the open file
+    if os.path.normcase(os.path.abspath(bpy.data.filepath)) != os.path.normcase(os.path.abspath(job["blend"])):
+        bpy.ops.wm.open_mainfile(filepath=job["blend"])
+
+    if not dry_run:
+        os.makedirs(os.path.dirname(job["output"]) or ".", exist_ok=True)
+
+    export_profile = ExportProfile(job["output"]) if profile else None
+    with Profiling(export_profile):
+        stats = export_cas2(job["output"], select_objects(job), build_settings(job), job.get("streaming", True), dry_run, cache)
+
+    if export_profile is not None and not dry_run:
+        export_profile.write_report(report_filepath(job["output"]))
+
+    return stats
+
+def run_jobs(jobs, dry_run = False, cache = None, profile = False):
+    results = []
+
+    for index, job in enumerate(jobs):
+        result = JobResult(index, job["output"])
+        start = time.perf_counter()
+
+        try:
+            stats = run_job(job, dry_run, cache, profile)
+            result.succeeded = True
+            result.models_count = stats.models_count
+            result.file_size = stats.file_size()
+            result.stripped_bytes = sum(size for _, size in stats.stripped_bytes)
+            result.dropped_lods_count = sum(count for _, count in stats.dropped_lods)
+        except Exception as error:
+            result.error = f"{type(error).__name__}: {str(error).strip()}"
+            traceback.print_exc()
+
+        result.seconds = time.perf_counter() - start
+        results.append(result)
+
+        status = "OK" if result.succeeded else "FAILED " + result.error
+        if result.dropped_lods_count > 0:
+            status += f", {result.dropped_lods_count} LODs left out"
+        print(f"[{index + 1}/{len(jobs)}] {job['output']}: {status} ({result.seconds:.2f} s)", flush=True)
+
+    return results
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="batch_export.py", description="Export every job of a manifest to .cs2 files.")
+    parser.add_argument("manifest", help="JSON or TOML job manifest")
+    parser.add_argument("--report", help="write per-job results to this JSON file")
+    parser.add_argument("--dry-run", action="store_true", help="compute block sizes without writing files")
+    parser.add_argument("--cache", help="reuse encoded model nodes cached in this directory")
+    parser.add_argument("--cache-size-mb", type=int, default=4096, help="size limit of the model cache")
+    parser.add_argument("--profile", action="store_true", help="write a .profile.json with phase timings next to every output")
+    arguments = parser.parse_args(argv)
+
+    from .cas2_cache import BlockCache
+
+    jobs = load_manifest(arguments.manifest)
+    cache = None
+    if arguments.cache and not arguments.dry_run:
+        cache = BlockCache(arguments.cache, arguments.cache_size_mb * 1024 * 1024)
+
+    start = time.perf_counter()
+    results = run_jobs(jobs, arguments.dry_run, cache, arguments.profile)
+    seconds = time.perf_counter() - start
+
+    failed_count = sum(1 for result in results if not result.succeeded)
+    print(f"Exported {len(results) - failed_count} of {len(results)} jobs in {seconds:.2f} s", flush=True)
+    if cache is not None:
+        print(f"Model cache: {cache.hits} hits, {cache.misses} misses", flush=True)
+
+    if arguments.report:
+        with open(arguments.report, 'w', encoding='utf-8') as file:
+            json.dump({"seconds": round(seconds, 3), "jobs": [result.to_dict() for result in results]}, file, indent=4)
+
+    return 1 if failed_count > 0 else 0
+
+if __name__ == "__main__":
+    # Run as a script by Blender, import through the package so the relative imports resolve
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from BlenderCas2Exporter.batch_export import main as batch_main
+
+    script_argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    sys.exit(batch_main(script_argv))
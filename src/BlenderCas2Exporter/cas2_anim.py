@@ -0,0 +1,147 @@
+# Animation keys from sampled transforms, on all frames of all tracks at once and without bpy.
+
+import numpy as np
+
+def matrices_to_file_transforms(matrices):
+    # (..., 4, 4) Blender matrices -> (..., 3) translations and (..., 4) x, y, z, w quaternions in file axes, the format has no scale
+    matrices = np.asarray(matrices, dtype=np.float64)
+    rotations = matrices[..., :3, :3] / np.linalg.norm(matrices[..., :3, :3], axis=-2, keepdims=True)
+
+    m = rotations
+    x2 = 1.0 + m[..., 0, 0] - m[..., 1, 1] - m[..., 2, 2]
+    y2 = 1.0 - m[..., 0, 0] + m[..., 1, 1] - m[..., 2, 2]
+    z2 = 1.0 - m[..., 0, 0] - m[..., 1, 1] + m[..., 2, 2]
+    w2 = 1.0 + m[..., 0, 0] + m[..., 1, 1] + m[..., 2, 2]
+    xy = m[..., 0, 1] + m[..., 1, 0]
+    xz = m[..., 0, 2] + m[..., 2, 0]
+    yz = m[..., 1, 2] + m[..., 2, 1]
+    xw = m[..., 2, 1] - m[..., 1, 2]
+    yw = m[..., 0, 2] - m[..., 2, 0]
+    zw = m[..., 1, 0] - m[..., 0, 1]
+
+    # Row k holds 4 * q[k] * (x, y, z, w), the one with the largest q[k] is the most precise
+    candidates = np.stack([
+        np.stack([x2, xy, xz, xw], axis=-1),
+        np.stack([xy, y2, yz, yw], axis=-1),
+        np.stack([xz, yz, z2, zw], axis=-1),
+        np.stack([xw, yw, zw, w2], axis=-1),
+    ], axis=-2)
+    largest = np.argmax(np.stack([x2, y2, z2, w2], axis=-1), axis=-1)
+    quaternions = np.take_along_axis(candidates, largest[..., None, None], axis=-2)[..., 0, :]
+    quaternions /= np.linalg.norm(quaternions, axis=-1, keepdims=True)
+
+    # Swap Y and Z axes, the mirrored rotation turns the other way round
+    translations = matrices[..., [0, 2, 1], 3]
+    quaternions = quaternions[..., [0, 2, 1, 3]] * np.array([-1.0, -1.0, -1.0, 1.0])
+    return translations, quaternions
+
+def bones_to_parent_space(armature_matrices, bone_matrices, parents):
+    # (frames, 4, 4) armature world matrices and (frames, bones, 4, 4) armature space bone matrices -> bone
+    # matrices relative to their parent bone, parents holds -1 for root bones which end up in world space
+    armature_matrices = np.asarray(armature_matrices, dtype=np.float64)
+    bone_matrices = np.asarray(bone_matrices, dtype=np.float64)
+    parents = np.asarray(parents, dtype=np.int64)
+
+    local_matrices = np.empty_like(bone_matrices)
+    roots = parents < 0
+    local_matrices[:, roots] = armature_matrices[:, None] @ bone_matrices[:, roots]
+    local_matrices[:, ~roots] = np.linalg.inv(bone_matrices[:, parents[~roots]]) @ bone_matrices[:, ~roots]
+    return local_matrices
+
+def make_quaternions_continuous(quaternions):
+    # Flips (frames, tracks, 4) quaternions into the hemisphere of the previous frame, so interpolating takes the short way
+    dots = np.sum(quaternions[1:] * quaternions[:-1], axis=-1)
+    signs = np.cumprod(np.where(dots < 0.0, -1.0, 1.0), axis=0)
+    quaternions[1:] *= signs[..., None]
+    return quaternions
+
+def lerp(start, end, t):
+    return start + (end - start) * t[:, None]
+
+def align_quaternions(a, b):
+    # b flipped into the hemisphere of a, both describe the same rotation
+    return np.where(np.sum(a * b, axis=-1, keepdims=True) < 0.0, -b, b)
+
+def half_angles(a, b):
+    # Angle between the aligned quaternions, which is half the angle between their rotations. Unlike
+    # arccos of the dot product this stays precise for the tiny angles tolerances are made of.
+    return 2.0 * np.arctan2(np.linalg.norm(a - b, axis=-1), np.linalg.norm(a + b, axis=-1))
+
+def slerp(start, end, t):
+    end = align_quaternions(start, end)
+    angles = half_angles(start, end)
+    sines = np.sin(angles)
+
+    # Nearly equal rotations fall back to lerp, which is exact in the limit
+    nearly_equal = sines < 1e-6
+    sines[nearly_equal] = 1.0
+    start_weights = np.where(nearly_equal, 1.0 - t, np.sin((1.0 - t) * angles) / sines)
+    end_weights = np.where(nearly_equal, t, np.sin(t * angles) / sines)
+
+    quaternions = start * start_weights[:, None] + end * end_weights[:, None]
+    return quaternions / np.linalg.norm(quaternions, axis=-1, keepdims=True)
+
+def translation_distance(a, b):
+    return np.linalg.norm(a - b, axis=-1)
+
+def rotation_distance(a, b):
+    # Angle in radians between the rotations
+    return 2.0 * half_angles(a, align_quaternions(a, b))
+
+def reduce_keys(values, tolerance, interpolate, distance):
+    # (frames, tracks, components) samples -> (frames, tracks) mask of the keys that reproduce every frame within
+    # tolerance, segments of all tracks are split at their worst frame together like Douglas-Peucker
+    frames_count, tracks_count = values.shape[:2]
+    kept = np.zeros((frames_count, tracks_count), dtype=bool)
+    kept[0] = True
+    if frames_count < 2:
+        return kept
+
+    # Tracks that stay within tolerance of their first frame keep only that key
+    segment_tracks = np.flatnonzero(np.any(distance(values, values[0][None]) > tolerance, axis=0))
+    kept[-1, segment_tracks] = True
+    segment_starts = np.zeros(len(segment_tracks), dtype=np.int64)
+    segment_ends = np.full(len(segment_tracks), frames_count - 1, dtype=np.int64)
+
+    while True:
+        inner_counts = segment_ends - segment_starts - 1
+        has_inner = inner_counts > 0
+        segment_tracks, segment_starts, segment_ends, inner_counts = (
+            segment_tracks[has_inner], segment_starts[has_inner], segment_ends[has_inner], inner_counts[has_inner])
+        if len(segment_tracks) == 0:
+            break
+
+        # Every inner frame of every segment in one flat array
+        offsets = np.cumsum(inner_counts) - inner_counts
+        segment_of = np.repeat(np.arange(len(segment_tracks)), inner_counts)
+        frames = segment_starts[segment_of] + 1 + np.arange(len(segment_of)) - offsets[segment_of]
+        tracks = segment_tracks[segment_of]
+        starts = segment_starts[segment_of]
+        ends = segment_ends[segment_of]
+
+        t = (frames - starts) / (ends - starts)
+        errors = distance(interpolate(values[starts, tracks], values[ends, tracks], t), values[frames, tracks])
+        max_errors = np.maximum.reduceat(errors, offsets)
+
+        # The first frame of every segment with its largest error
+        worst = np.flatnonzero(errors == max_errors[segment_of])
+        _, first_worst = np.unique(segment_of[worst], return_index=True)
+        split_frames = frames[worst[first_worst]]
+
+        split = max_errors > tolerance
+        split_frames = split_frames[split]
+        kept[split_frames, segment_tracks[split]] = True
+
+        segment_tracks = np.concatenate([segment_tracks[split], segment_tracks[split]])
+        segment_starts, segment_ends = (
+            np.concatenate([segment_starts[split], split_frames]),
+            np.concatenate([split_frames, segment_ends[split]]))
+
+    return kept
+
+def reduce_translation_keys(translations, tolerance):
+    return reduce_keys(translations, tolerance, lerp, translation_distance)
+
+def reduce_rotation_keys(rotations, tolerance):
+    # rotations must be continuous, see make_quaternions_continuous
+    return reduce_keys(rotations, tolerance, slerp, rotation_distance)
@@ -0,0 +1,85 @@
+# Size-bounded on-disk cache of encoded blocks by content hash, least recently used first out.
+
+import os
+import time
+
+class BlockCache:
+    CONST_ENTRY_EXTENSION = ".cs2block"
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.entries = {} # key -> [size, last_used]
+
+        os.makedirs(directory, exist_ok=True)
+        for entry in os.scandir(directory):
+            if entry.is_file() and entry.name.endswith(self.CONST_ENTRY_EXTENSION):
+                stat = entry.stat()
+                self.entries[entry.name[:-len(self.CONST_ENTRY_EXTENSION)]] = [stat.st_size, stat.st_mtime]
+
+        self.evict()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, key + self.CONST_ENTRY_EXTENSION)
+
+    def get(self, key):
+        path = self.entry_path(key)
+
+        try:
+            with open(path, 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        now = time.time()
+        os.utime(path, (now, now))
+        self.entries[key] = [len(data), now]
+        self.hits += 1
+        return data
+
+    def discard(self, key):
+        # For entries that turned out unusable, the lookup is counted as a miss
+        self.hits -= 1
+        self.misses += 1
+        self.remove(key)
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+
+        # Written under a temporary name first, so other exports never read a partial entry
+        path = self.entry_path(key)
+        partial_path = path + "." + str(os.getpid())
+        with open(partial_path, 'wb') as file:
+            file.write(data)
+
+        os.replace(partial_path, path)
+        self.entries[key] = [len(data), time.time()]
+        self.evict()
+
+    def remove(self, key):
+        try:
+            os.remove(self.entry_path(key))
+        except FileNotFoundError:
+            pass
+
+        self.entries.pop(key, None)
+
+    def size(self):
+        return sum(size for size, _ in self.entries.values())
+
+    def evict(self):
+        total_size = self.size()
+        if total_size <= self.max_bytes:
+            return
+
+        for key, (size, _) in sorted(self.entries.items(), key=lambda item: item[1][1]):
+            if total_size <= self.max_bytes:
+                break
+
+            self.remove(key)
+            total_size -= size
@@ -0,0 +1,203 @@
+# Cas2 (.cs2) binary layout shared by the exporter and the reader, without bpy.
+
+import struct
+import numpy as np
+from enum import Enum
+
+CONST_INT8_MIN = -0x80          # -128
+CONST_INT8_MAX = 0x7F           # 127
+CONST_UINT8_MIN = 0             # 0
+CONST_UINT8_MAX = 0xFF          # 255
+
+CONST_INT16_MIN = -0x8000       # -32768
+CONST_INT16_MAX = 0x7FFF        # 32767
+CONST_UINT16_MIN = 0            # 0
+CONST_UINT16_MAX = 0xFFFF       # 65535
+
+CONST_INT32_MIN = -0x80000000   # -2,147,483,648
+CONST_INT32_MAX = 0x7FFFFFFF    # 2,147,483,647
+CONST_UINT32_MIN = 0            # 0
+CONST_UINT32_MAX = 0xFFFFFFFF   # 4,294,967,295
+
+CONST_FLOAT_MAX = np.float32(2.54e+28)
+CONST_FLOAT_MIN = np.float32(-2.54e+28)
+
+CONST_UINT16_SIZE = struct.calcsize('<H')
+CONST_INT16_SIZE = struct.calcsize('<h')
+CONST_UINT32_SIZE = struct.calcsize('<I')
+CONST_INT32_SIZE = struct.calcsize('<i')
+CONST_FLOAT_SIZE = struct.calcsize('<f')
+
+CONST_CS2_FILE_TAG = bytes([0x01, 0x32, 0x53, 0x43])
+
+MESH_TRIANGLE_DTYPE = np.dtype('<u4')
+LINE_VERTEX_DTYPE = np.dtype(('<f4', (3,)))
+LINE_SEGMENT_DTYPE = np.dtype(('<u4', (2,)))
+BONE_WEIGHT_DTYPE = np.dtype([("bone_id", '<u4'), ("weight", '<f4')])
+ANIM_TIME_DTYPE = np.dtype('<f4')
+ANIM_TRANSLATION_DTYPE = np.dtype(('<f4', (3,)))
+ANIM_ROTATION_DTYPE = np.dtype(('<f4', (4,)))
+
+class BlockSchema:
+    # A fixed-layout part of a block, described once and compiled into a single little-endian struct.Struct
+    def __init__(self, *fields):
+        self.fields = fields
+        self.codec = struct.Struct('<' + ''.join(code for _, code in fields))
+        self.value_counts = [len(struct.unpack('<' + code, bytes(struct.calcsize('<' + code)))) for _, code in fields]
+
+    def size(self):
+        return self.codec.size
+
+    def write(self, buffer, offset, *values):
+        self.codec.pack_into(buffer, offset, *values)
+        return offset + self.codec.size
+
+    def read(self, buffer, offset):
+        values = self.codec.unpack_from(buffer, offset)
+        record = {}
+
+        index = 0
+        for (name, _), count in zip(self.fields, self.value_counts):
+            if count == 1:
+                record[name] = values[index]
+            elif count > 1:
+                record[name] = values[index:index + count]
+            index += count
+
+        return record
+
+UINT16_SCHEMA = BlockSchema(("value", 'H'))
+UINT32_SCHEMA = BlockSchema(("value", 'I'))
+INT32_SCHEMA = BlockSchema(("value", 'i'))
+FLOAT_SCHEMA = BlockSchema(("value", 'f'))
+
+VEC2_SCHEMA = BlockSchema(("x", 'f'), ("y", 'f'))
+VEC3_SCHEMA = BlockSchema(("x", 'f'), ("y", 'f'), ("z", 'f'))
+VEC4_SCHEMA = BlockSchema(("x", 'f'), ("y", 'f'), ("z", 'f'), ("w", 'f'))
+QUAT_VEC3_TRANSFORM_SCHEMA = BlockSchema(("rotation", '4f'), ("translation", '3f'))
+
+# Attribute records, following the attribute name string
+STRING_ATTRIBUTE_SCHEMA = BlockSchema(("type", 'I'))
+ATTRIBUTE_HEADER_FIELDS = (("unknown_1", 'I'), ("type", 'I'), ("unknown_2", 'I'), ("unknown_3", 'I'), ("unknown_4", 'I'), ("unknown_5", 'I'), ("unknown_6", 'I'))
+INT_ATTRIBUTE_SCHEMA = BlockSchema(*ATTRIBUTE_HEADER_FIELDS, ("value", 'i'))
+FLOAT_ATTRIBUTE_SCHEMA = BlockSchema(*ATTRIBUTE_HEADER_FIELDS, ("value", 'f'))
+VEC3_ATTRIBUTE_SCHEMA = BlockSchema(*ATTRIBUTE_HEADER_FIELDS, ("value", '3f'))
+VEC4_ATTRIBUTE_SCHEMA = BlockSchema(*ATTRIBUTE_HEADER_FIELDS, ("value", '4f'))
+
+# Followed by the addon and file details strings
+CAS2_HEADER_SCHEMA = BlockSchema(("file_tag", '4s'), ("header_size", 'I'), ("unknown_1", 'I'), ("unknown_2", 'f'))
+
+SCENE_INFO_SCHEMA = BlockSchema(
+    ("block_size", 'I'),
+    ("unknown_1", 'I'),
+    ("scene_object_types_count", 'I'),
+    ("unknown_2", 'I'),
+    ("cameras_count", 'I'),
+    ("rigid_models_count", 'I'),
+    ("unknown_3", 'I'),
+    ("unknown_4", 'I'),
+    ("weighted_models_count", 'I'),
+    ("lines_count", 'I'),
+    ("dummies_count", 'I'),
+    ("materials_count", 'I'),
+    ("unknown_5", 'I'),
+    ("unknown_6", 'I'),
+    ("instances_count", 'I'),
+    ("reserved", '44x'), # 11 unknown uint32 values, likely just reserved for future use
+)
+
+# Followed by UnknownKeyFramesBlockStruct1 and UnknownKeyFramesBlockStruct2
+KEY_FRAMES_1_SCHEMA = BlockSchema(("block_size", 'I'), ("unknown_1", 'I'), ("key_start", 'f'), ("key_end", 'f'))
+
+# Followed by UnknownKeyFramesBlockStruct3
+KEY_FRAMES_2_SCHEMA = BlockSchema(("block_size", 'I'), ("unknown_1", 'I'))
+
+UNKNOWN_SCENE_ROOT_DATA_1_SCHEMA = BlockSchema(*[(f"unknown_{i}", 'I') for i in range(1, 17)], ("unknown_quaternion", '4f'))
+
+# Bounding boxes are stored in file axes, Y up
+BOUNDING_BOX_SCHEMA = BlockSchema(("min_x", 'f'), ("min_y", 'f'), ("min_z", 'f'), ("max_x", 'f'), ("max_y", 'f'), ("max_z", 'f'))
+
+# Followed by the unknown float array and the bounding box array
+GEOMETRY_DATA_HEADER_SCHEMA = BlockSchema(("unknown_1", 'I'), ("unknown_2", 'I'), ("unknown_3", 'I'))
+
+# Instance geometry data, following the geometry data header and the bounding box array
+INSTANCE_GEOMETRY_SCHEMA = BlockSchema(("original_node_index", 'I'), ("unknown", 'i'))
+INSTANCE_OVERRIDE_GEOMETRY_SCHEMA = BlockSchema(("original_node_index", 'I'), ("unknown_1", 'i'), ("unknown_2", 'i'), ("material_id", 'I'))
+
+# Start of every node block
+NODE_HEADER_SCHEMA = BlockSchema(("block_size", 'I'), ("node_type", 'I'))
+
+# SceneRootBlock: header + nodes_count, node name, root data, file info, footer
+SCENE_ROOT_HEADER_SCHEMA = BlockSchema(("block_size", 'I'), ("node_type", 'I'), ("nodes_count", 'I'))
+SCENE_ROOT_DATA_SCHEMA = BlockSchema(("unknown_1", 'i'), ("unknown_2", 'I')) # followed by UnknownSceneRootData1 and unknown_3
+SCENE_ROOT_FOOTER_SCHEMA = BlockSchema(("unknown_4", 'I'), ("unknown_5", 'I'), ("unknown_6", 'I'), ("unknown_7", 'I'), ("unknown_8", 'I'))
+
+# SceneNode: node name, header, anim data, footer, unknown name, attributes. The scene root is followed by
+# nodes_count - 1 of them, the node index of a model node is its position in that list plus one.
+SCENE_NODE_HEADER_SCHEMA = BlockSchema(("parent_index", 'I'), ("unknown_data", '16x'))
+SCENE_NODE_FOOTER_SCHEMA = BlockSchema(("unknown_value", 'i')) # followed by the unknown name string
+
+# AnimData: translation times and translations, unknown data, rotation times and rotations. Every array starts with its length.
+ANIM_DATA_UNKNOWN_SCHEMA = BlockSchema(("unknown_data", '16x'))
+
+class NodeType(Enum):
+    CAMERA = 6
+    RIGID_MODEL = 7
+    WEIGHTED_MODEL = 10
+    LINE = 11
+    SCENE_ROOT = 12
+    MATERIAL = 13
+    INSTANCE_NO_MATERIAL = 16
+    DUMMY = 17
+    INSTANCE_OVERRIDE_MATERIAL = 18
+
+class AttributeType(Enum):
+    FLOAT = 0
+    STRING = 1
+    VEC3 = 3
+    INT32 = 8
+    VEC4 = 9
+
+class GeometryDataType(Enum):
+    UNSET = -1
+    MESH = 0
+    LINE = 1
+
+def vertex_data_rigid_dtype(uv_channels_count):
+    # On-disk layout of VERTEX_DATA_RIGID, texture coordinates are stored as VEC3
+    return np.dtype([
+        ("position", '<f4', (3,)),
+        ("normal", '<f4', (3,)),
+        ("color", '<f4', (4,)),
+        ("tex_coords_count", '<u4'),
+        ("tex_coords", '<f4', (uv_channels_count, 3)),
+        ("unknown", '<f4'),
+    ])
+
+def vertex_data_weighted_dtype(uv_channels_count, bones_count):
+    # VERTEX_DATA_WEIGHTED with room for bones_count weights. On disk every vertex only has the
+    # bone weights it uses, see encode_weighted_vertices.
+    return np.dtype([
+        ("position", '<f4', (3,)),
+        ("normal", '<f4', (3,)),
+        ("color", '<f4', (4,)),
+        ("tex_coords_count", '<u4'),
+        ("tex_coords", '<f4', (uv_channels_count, 3)),
+        ("unknown", '<f4'),
+        ("bones_count", '<u4'),
+        ("bone_weights", BONE_WEIGHT_DTYPE, (bones_count,)),
+        ("position_2", '<f4', (3,)),
+        ("normal_2", '<f4', (3,)),
+    ])
+
+def encode_weighted_vertices(vertices):
+    # Returns the on-disk bytes of vertex_data_weighted_dtype vertices: the unused bone weights of every
+    # vertex are dropped, those have to follow the used ones
+    rows = vertices.view(np.uint8).reshape(len(vertices), vertices.dtype.itemsize)
+    bones_count = vertices.dtype["bone_weights"].shape[0]
+    weights_start = vertices.dtype.fields["bone_weights"][1]
+    weights_end = weights_start + bones_count * BONE_WEIGHT_DTYPE.itemsize
+
+    kept = np.ones(rows.shape, dtype=bool)
+    kept[:, weights_start:weights_end] = np.arange(weights_end - weights_start) // BONE_WEIGHT_DTYPE.itemsize < vertices["bones_count"][:, None]
+    return rows[kept]
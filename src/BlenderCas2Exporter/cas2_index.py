@@ -0,0 +1,171 @@
+# Sidecar table of contents of a .cs2 file, to read a single node with one seek.
+
+import hashlib
+import json
+import os
+import sys
+
+from .cas2_format import NODE_HEADER_SCHEMA, NodeType
+from .cas2_reader import create_node_view
+
+CONST_INDEX_VERSION = 1
+
+def index_filepath(filepath):
+    # scene.cs2 -> scene.index.json
+    root, _ = os.path.splitext(filepath)
+    return root + ".index.json"
+
+def hash_node_data(data):
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+class IndexEntry:
+    def __init__(self, name, node_type, offset, size, vertices_count = 0, triangles_count = 0, content_hash = ""):
+        self.name = name
+        self.node_type = node_type
+        self.offset = offset
+        self.size = size
+        self.vertices_count = vertices_count
+        self.triangles_count = triangles_count
+        self.content_hash = content_hash
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "node_type": self.node_type,
+            "offset": self.offset,
+            "size": self.size,
+            "vertices_count": self.vertices_count,
+            "triangles_count": self.triangles_count,
+            "content_hash": self.content_hash,
+        }
+
+class Cas2Index:
+    def __init__(self):
+        self.file_size = 0 # end of the last block added, the size of the whole file once every block is in
+        self.entries = []
+        self.entries_by_name = {} # name -> IndexEntry, the first node of a name wins like Cas2File.find_node
+
+    def skip(self, size):
+        # Blocks that are not nodes only move the offset of the next one
+        self.file_size += size
+
+    def add_node(self, name, node_type, data, counts = None):
+        entry = IndexEntry(name, node_type, self.file_size, len(data), content_hash=hash_node_data(data))
+        if counts is not None:
+            entry.vertices_count = counts["vertices_count"]
+            entry.triangles_count = counts["triangles_count"]
+
+        self.add_entry(entry)
+        self.file_size += len(data)
+        return entry
+
+    def add_entry(self, entry):
+        self.entries.append(entry)
+        self.entries_by_name.setdefault(entry.name, entry)
+
+    def find(self, name):
+        return self.entries_by_name.get(name)
+
+    def to_dict(self):
+        return {
+            "version": CONST_INDEX_VERSION,
+            "file_size": self.file_size,
+            "nodes": [entry.to_dict() for entry in self.entries],
+        }
+
+    def write(self, filepath):
+        # Written under a temporary name first, like the .cs2 file it describes
+        partial_filepath = filepath + ".partial"
+        with open(partial_filepath, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file)
+
+        os.replace(partial_filepath, filepath)
+
+def load_index(filepath):
+    with open(filepath, 'r', encoding='utf-8') as file:
+        data = json.load(file)
+
+    if data.get("version") != CONST_INDEX_VERSION:
+        raise ValueError(filepath + " has index version " + str(data.get("version")) + ", expected " + str(CONST_INDEX_VERSION))
+
+    index = Cas2Index()
+    index.file_size = data["file_size"]
+    for entry in data["nodes"]:
+        index.add_entry(IndexEntry(**entry))
+
+    return index
+
+class IndexedCas2File:
+    # Random access to the nodes of a .cs2 file through its index, every lookup is one seek and one read
+    def __init__(self, filepath, index_path = None):
+        self.filepath = filepath
+        self.index_path = index_path or index_filepath(filepath)
+        self.index = load_index(self.index_path)
+        self.file = open(filepath, 'rb')
+
+        file_size = os.fstat(self.file.fileno()).st_size
+        if file_size != self.index.file_size:
+            self.file.close()
+            raise ValueError(self.index_path + " describes a file of " + str(self.index.file_size) + " bytes, " + filepath + " has " + str(file_size) + ", export the index again")
+
+    @property
+    def entries(self):
+        return self.index.entries
+
+    def read_node_data(self, entry):
+        self.file.seek(entry.offset)
+        data = self.file.read(entry.size)
+
+        header = NODE_HEADER_SCHEMA.read(data, 0) if len(data) >= NODE_HEADER_SCHEMA.size() else None
+        if header is None or header["block_size"] != entry.size:
+            raise ValueError("Node \"" + entry.name + "\" is not at offset " + str(entry.offset) + " of " + self.filepath + ", export the index again")
+
+        return data
+
+    def find_node(self, name, verify_hash = False):
+        # A node view over a copy of the node's block, None for names not in the index
+        entry = self.index.find(name)
+        if entry is None:
+            return None
+
+        data = self.read_node_data(entry)
+        if verify_hash and hash_node_data(data) != entry.content_hash:
+            raise ValueError("Node \"" + name + "\" of " + self.filepath + " does not match the hash in its index")
+
+        node = create_node_view(data, 0)
+        if node.name != name:
+            raise ValueError("Node at offset " + str(entry.offset) + " of " + self.filepath + " is \"" + node.name + "\", the index expects \"" + name + "\"")
+
+        return node
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def print_index(filepath, names):
+    with IndexedCas2File(filepath) as indexed_file:
+        if len(names) == 0:
+            for entry in indexed_file.entries:
+                print(entry.node_type + " \"" + entry.name + "\" at " + str(entry.offset) + " (" + str(entry.size) + " bytes, " + str(entry.vertices_count) + " vertices, " + str(entry.triangles_count) + " triangles)")
+            return
+
+        for name in names:
+            node = indexed_file.find_node(name, verify_hash=True)
+            if node is None:
+                print("No node \"" + name + "\" in " + indexed_file.index_path)
+                continue
+
+            node_type = node.node_type.name if isinstance(node.node_type, NodeType) else str(node.node_type)
+            print(node_type + " \"" + node.name + "\" (" + str(node.block_size) + " bytes)")
+            if node.node_type in (NodeType.RIGID_MODEL, NodeType.WEIGHTED_MODEL):
+                for geometry in node.geometry_data:
+                    print("    " + str(len(geometry.vertices)) + " vertices, " + str(geometry.triangles_count()) + " triangles, " + str(len(geometry.sub_meshes)) + " submeshes")
+
+if __name__ == "__main__":
+    # python -m BlenderCas2Exporter.cas2_index scene.cs2 [node names]
+    print_index(sys.argv[1], sys.argv[2:])
@@ -0,0 +1,555 @@
+# Mesh processing after extraction, without bpy so it also runs in the worker processes.
+
+import numpy as np
+from multiprocessing import shared_memory
+
+from .cas2_format import MESH_TRIANGLE_DTYPE, LINE_VERTEX_DTYPE, LINE_SEGMENT_DTYPE, vertex_data_rigid_dtype, vertex_data_weighted_dtype
+
+# Entries of the FIFO post-transform cache the triangle order is optimized and measured for
+CONST_VERTEX_CACHE_SIZE = 16
+
+# Bones the game's skinning blends per vertex, the weakest weights beyond it are dropped
+CONST_MAX_BONE_INFLUENCES = 4
+
+class MeshArrays:
+    def __init__(self):
+        self.positions = None           # (corners, 3) float32, emission order
+        self.normals = None             # (corners, 3) float32, flat triangle normal per corner
+        self.colors = None              # (corners, 4) float32
+        self.uvs = []                   # one (corners, 2) float32 array per uv layer
+        self.material_indices = None    # (triangles,) int32
+        self.bone_ids = None            # (corners, influences) uint32 or None for rigid meshes, see reduce_bone_weights
+        self.bone_weights = None        # (corners, influences) float32
+        self.tangents = None            # (corners, 3) float32 tangent frames of the first uv layer or None, see calc_tangents
+        self.bitangents = None          # (corners, 3) float32
+
+    def triangles_count(self):
+        return len(self.material_indices)
+
+    def corners_count(self):
+        return len(self.positions)
+
+class ProcessedMesh:
+    # Figures gathered while processing, they travel back from worker processes with the arrays
+    CONST_COUNT_NAMES = ("unwelded_vertices_count", "cache_misses_before", "cache_misses_after", "degenerate_triangles_count", "unused_vertices_count")
+
+    def __init__(self):
+        self.vertices = None                # structured array of vertex_data_rigid_dtype or vertex_data_weighted_dtype
+        self.unwelded_vertices_count = 0
+        self.sub_meshes = []                # (material_index, (triangles, 3) array of MESH_TRIANGLE_DTYPE) pairs
+        self.cache_misses_before = 0        # vertex cache misses of all submeshes, before (only when measured) and after reordering
+        self.cache_misses_after = 0
+        self.degenerate_triangles_count = 0 # zero-area triangles removed
+        self.unused_vertices_count = 0      # vertices removed because no remaining triangle uses them
+
+    def counts(self):
+        return {name: getattr(self, name) for name in self.CONST_COUNT_NAMES}
+
+def calc_triangle_normals(v1, v2, v3):
+    # Same float32 operation order as BMesh normal_tri_v3, so results match bit for bit
+    n1 = v1 - v2
+    n2 = v2 - v3
+
+    normals = np.empty_like(n1)
+    normals[:, 0] = n1[:, 1] * n2[:, 2] - n1[:, 2] * n2[:, 1]
+    normals[:, 1] = n1[:, 2] * n2[:, 0] - n1[:, 0] * n2[:, 2]
+    normals[:, 2] = n1[:, 0] * n2[:, 1] - n1[:, 1] * n2[:, 0]
+
+    squared_lengths = normals[:, 0] * normals[:, 0] + normals[:, 1] * normals[:, 1] + normals[:, 2] * normals[:, 2]
+    valid = squared_lengths > np.float32(1.0e-35)
+
+    normals[valid] *= (np.float32(1.0) / np.sqrt(squared_lengths[valid]))[:, None]
+    normals[~valid] = 0.0
+
+    return normals
+
+def normalize_rows(vectors):
+    # Rows too short to have a direction become zero
+    lengths = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, lengths, out=np.zeros_like(vectors), where=lengths > np.float32(1.0e-20))
+
+def calc_tangents(positions, normals, uvs):
+    # MikkTSpace-style unit tangents along u and bitangents along v of every corner, angle-weighted over the
+    # corners sharing position, normal, uv and winding
+    corners_count = len(positions)
+    triangle_positions = positions.reshape(-1, 3, 3)
+    triangle_uvs = uvs.reshape(-1, 3, 2)
+
+    edges_1 = triangle_positions[:, 1] - triangle_positions[:, 0]
+    edges_2 = triangle_positions[:, 2] - triangle_positions[:, 0]
+    uv_edges_1 = triangle_uvs[:, 1] - triangle_uvs[:, 0]
+    uv_edges_2 = triangle_uvs[:, 2] - triangle_uvs[:, 0]
+    signed_uv_areas = uv_edges_1[:, 0] * uv_edges_2[:, 1] - uv_edges_1[:, 1] * uv_edges_2[:, 0]
+
+    # Directions of dP/du and dP/dv, triangles without uv area have none and add nothing
+    orientations = np.where(signed_uv_areas < 0.0, np.float32(-1.0), np.float32(1.0))[:, None]
+    triangle_tangents = normalize_rows((edges_1 * uv_edges_2[:, 1:2] - edges_2 * uv_edges_1[:, 1:2]) * orientations)
+    triangle_bitangents = normalize_rows((edges_2 * uv_edges_1[:, 0:1] - edges_1 * uv_edges_2[:, 0:1]) * orientations)
+    triangle_tangents[signed_uv_areas == 0.0] = 0.0
+    triangle_bitangents[signed_uv_areas == 0.0] = 0.0
+
+    # Angle of every corner between its two triangle edges
+    next_corners = triangle_positions[:, [1, 2, 0]] - triangle_positions
+    previous_corners = triangle_positions[:, [2, 0, 1]] - triangle_positions
+    cosines = np.sum(normalize_rows(next_corners.reshape(-1, 3)) * normalize_rows(previous_corners.reshape(-1, 3)), axis=1)
+    angles = np.arccos(np.clip(cosines, -1.0, 1.0)).astype(np.float32)
+
+    corner_tangents = np.repeat(triangle_tangents, 3, axis=0)
+    corner_bitangents = np.repeat(triangle_bitangents, 3, axis=0)
+    corner_tangents = normalize_rows(corner_tangents - normals * np.sum(normals * corner_tangents, axis=1, keepdims=True)) * angles[:, None]
+    corner_bitangents = normalize_rows(corner_bitangents - normals * np.sum(normals * corner_bitangents, axis=1, keepdims=True)) * angles[:, None]
+
+    # Corners that end up as one welded vertex share their frame, uv mirrored triangles are kept apart.
+    # bincount sums the same way as np.add.at, several times faster.
+    keys = np.empty((corners_count, 9), dtype=np.uint32)
+    keys[:, 0:3] = np.ascontiguousarray(positions, dtype=np.float32).view(np.uint32)
+    keys[:, 3:6] = np.ascontiguousarray(normals, dtype=np.float32).view(np.uint32)
+    keys[:, 6:8] = np.ascontiguousarray(uvs, dtype=np.float32).view(np.uint32)
+    keys[:, 8] = np.repeat(signed_uv_areas < 0.0, 3)
+    first_uses, groups = unique_rows(keys)
+
+    tangent_sums = np.stack([np.bincount(groups, corner_tangents[:, i], len(first_uses)) for i in range(3)], axis=1)
+    bitangent_sums = np.stack([np.bincount(groups, corner_bitangents[:, i], len(first_uses)) for i in range(3)], axis=1)
+    tangents = tangent_sums[groups].astype(np.float32)
+    bitangent_sums = bitangent_sums[groups].astype(np.float32)
+
+    # Orthonormal frame: the tangent in the normal's plane, the bitangent across both on the side of dP/dv.
+    # Corners without a uv direction get any tangent in that plane.
+    tangents = normalize_rows(tangents - normals * np.sum(normals * tangents, axis=1, keepdims=True))
+    missing = ~np.any(tangents != 0.0, axis=1)
+    if np.any(missing):
+        fallback_axes = np.where(np.abs(normals[missing, 0:1]) < 0.9, np.float32([1.0, 0.0, 0.0]), np.float32([0.0, 1.0, 0.0]))
+        tangents[missing] = normalize_rows(np.cross(normals[missing], fallback_axes))
+
+    bitangents = np.cross(normals, tangents)
+    signs = np.where(np.sum(bitangents * bitangent_sums, axis=1) < 0.0, np.float32(-1.0), np.float32(1.0))
+    return tangents, (bitangents * signs[:, None]).astype(np.float32)
+
+def tex_coords_count(arrays):
+    # Tangent frames follow the uv channels as two more texture coordinates
+    return len(arrays.uvs) + (2 if arrays.tangents is not None else 0)
+
+def build_rigid_vertices(arrays):
+    vertices = np.zeros(arrays.corners_count(), dtype=vertex_data_rigid_dtype(tex_coords_count(arrays)))
+    vertices["position"] = arrays.positions
+    vertices["normal"] = arrays.normals
+    vertices["color"] = arrays.colors
+    vertices["tex_coords_count"] = tex_coords_count(arrays)
+
+    for i, uv in enumerate(arrays.uvs):
+        vertices["tex_coords"][:, i, :2] = uv
+
+    if arrays.tangents is not None:
+        vertices["tex_coords"][:, len(arrays.uvs)] = arrays.tangents
+        vertices["tex_coords"][:, len(arrays.uvs) + 1] = arrays.bitangents
+
+    return vertices
+
+def build_weighted_vertices(arrays):
+    rigid_vertices = build_rigid_vertices(arrays)
+    vertices = np.zeros(arrays.corners_count(), dtype=vertex_data_weighted_dtype(tex_coords_count(arrays), arrays.bone_ids.shape[1]))
+
+    for name in rigid_vertices.dtype.names:
+        vertices[name] = rigid_vertices[name]
+
+    vertices["bones_count"] = np.count_nonzero(arrays.bone_weights, axis=1)
+    vertices["bone_weights"]["bone_id"] = arrays.bone_ids
+    vertices["bone_weights"]["weight"] = arrays.bone_weights
+    vertices["position_2"] = arrays.positions
+    vertices["normal_2"] = arrays.normals
+
+    return vertices
+
+def reduce_bone_weights(vertex_indices, bone_indices, weights, vertices_count, max_influences = CONST_MAX_BONE_INFLUENCES):
+    # (vertex, bone, weight) entries sorted by vertex -> (vertices, influences) bone ids and normalized weights
+    # of the strongest bones, strongest first, unused influences last with a weight of 0
+    used = weights > 0.0
+    vertex_indices = vertex_indices[used]
+    bone_indices = bone_indices[used]
+    weights = weights[used]
+
+    # Dense (vertices, most groups of any vertex) matrix, each entry in the slot of its rank within its vertex
+    groups_counts = np.bincount(vertex_indices, minlength=vertices_count)
+    slots_count = int(groups_counts.max()) if vertices_count > 0 else 0
+    starts = np.cumsum(groups_counts) - groups_counts
+    slots = np.arange(len(vertex_indices)) - starts[vertex_indices]
+
+    slot_weights = np.zeros((vertices_count, slots_count), dtype=np.float32)
+    slot_bones = np.zeros((vertices_count, slots_count), dtype=np.uint32)
+    slot_weights[vertex_indices, slots] = weights
+    slot_bones[vertex_indices, slots] = bone_indices
+
+    influences_count = min(max_influences, slots_count)
+    if slots_count > influences_count:
+        strongest = np.argpartition(-slot_weights, influences_count - 1, axis=1)[:, :influences_count]
+        slot_weights = np.take_along_axis(slot_weights, strongest, axis=1)
+        slot_bones = np.take_along_axis(slot_bones, strongest, axis=1)
+
+    order = np.argsort(-slot_weights, axis=1, kind='stable')
+    slot_weights = np.take_along_axis(slot_weights, order, axis=1)
+    slot_bones = np.take_along_axis(slot_bones, order, axis=1)
+    slot_bones[slot_weights == 0.0] = 0
+
+    sums = slot_weights.sum(axis=1, keepdims=True)
+    np.divide(slot_weights, sums, out=slot_weights, where=sums > 0.0)
+
+    return slot_bones, slot_weights
+
+def float_words(dtype):
+    # Which 32-bit words of a vertex hold floats, the others are compared exactly when welding with an epsilon
+    words = np.zeros(dtype.itemsize // 4, dtype=bool)
+
+    for name in dtype.names:
+        field_dtype, offset = dtype.fields[name][:2]
+        base = field_dtype.base
+        for i in range(field_dtype.itemsize // base.itemsize):
+            start = (offset + i * base.itemsize) // 4
+            if base.names is not None:
+                words[start:start + base.itemsize // 4] = float_words(base)
+            else:
+                words[start:start + base.itemsize // 4] = base.kind == 'f'
+
+    return words
+
+def hash_rows(rows):
+    # 64-bit FNV-1a over the 32-bit words of each row, one vectorized step per column
+    hashes = np.full(len(rows), 0xcbf29ce484222325, dtype=np.uint64)
+    prime = np.uint64(0x100000001b3)
+
+    for column in rows.T:
+        hashes ^= column.astype(np.uint64)
+        hashes *= prime
+
+    return hashes
+
+def weld_vertices(vertices, epsilon = 0.0):
+    # Returns the unique vertices in first-use order and the old -> new index remap
+    vertices_count = len(vertices)
+    if vertices_count == 0:
+        return vertices, np.zeros(0, dtype=np.int64)
+
+    words = vertices.view(np.uint32).reshape(vertices_count, -1)
+    if epsilon > 0.0:
+        # Every vertex field is 4 bytes wide, the float ones are quantized and the counts and bone ids kept
+        floats = vertices.view(np.float32).reshape(vertices_count, -1)
+        keys = np.round(floats / epsilon).astype(np.int64)
+        integers = ~float_words(vertices.dtype)
+        keys[:, integers] = words[:, integers]
+        keys = keys.view(np.uint32).reshape(vertices_count, -1)
+    else:
+        # -0.0 and 0.0 compare equal, flat normals of coplanar triangles often differ only there
+        keys = np.where(words == 0x80000000, np.uint32(0), words)
+
+    first_uses, remap = unique_rows(keys)
+    return vertices[first_uses], remap
+
+def unique_rows(keys):
+    # Returns the first use of every distinct row, in first-use order, and the old -> new index remap.
+    # Runs of equal hashes also break on any byte difference, a collision costs a duplicate, not a wrong merge.
+    rows_count = len(keys)
+    order = np.argsort(hash_rows(keys), kind='stable')
+    sorted_keys = keys[order]
+
+    run_starts = np.ones(rows_count, dtype=bool)
+    run_starts[1:] = np.any(sorted_keys[1:] != sorted_keys[:-1], axis=1)
+    run_ids = np.cumsum(run_starts) - 1
+
+    first_uses = order[run_starts]
+    new_order = np.argsort(first_uses, kind='stable')
+    new_index_of_run = np.empty(len(first_uses), dtype=np.int64)
+    new_index_of_run[new_order] = np.arange(len(first_uses))
+
+    remap = np.empty(rows_count, dtype=np.int64)
+    remap[order] = new_index_of_run[run_ids]
+
+    return first_uses[new_order], remap
+
+def count_missing_rows(rows, kept_rows):
+    # Rows with no bit-identical row in kept_rows. Kept rows come first, so the distinct ones get the
+    # lowest first-use indices and any row numbered past them is missing.
+    keys = np.concatenate([kept_rows, rows]).view(np.uint32).reshape(len(kept_rows) + len(rows), -1)
+    first_uses, remap = unique_rows(keys)
+    kept_count = np.count_nonzero(first_uses < len(kept_rows))
+    return int(np.count_nonzero(remap[len(kept_rows):] >= kept_count))
+
+def find_degenerate_triangles(vertices, triangles):
+    # Zero-area triangles, the same test that gives them a zero flat normal
+    positions = vertices["position"][triangles]
+    normals = calc_triangle_normals(positions[:, 0], positions[:, 1], positions[:, 2])
+    return ~np.any(normals, axis=1)
+
+def reorder_vertices_by_first_use(vertices, sub_meshes):
+    # Drops the vertices no triangle uses and numbers the others in the order the index buffers,
+    # written submesh after submesh, first reach them
+    indices = np.concatenate([triangles.ravel() for _, triangles in sub_meshes]) if sub_meshes else np.zeros(0, dtype=MESH_TRIANGLE_DTYPE)
+
+    # Position of the first use of every vertex, len(indices) for unused ones. Indices are bounded, so
+    # this is linear where np.unique would sort.
+    first_uses = np.full(len(vertices), len(indices), dtype=np.int64)
+    np.minimum.at(first_uses, indices, np.arange(len(indices)))
+    used_vertices = np.flatnonzero(first_uses < len(indices))
+    used_vertices = used_vertices[np.argsort(first_uses[used_vertices], kind='stable')]
+
+    new_indices = np.zeros(len(vertices), dtype=MESH_TRIANGLE_DTYPE)
+    new_indices[used_vertices] = np.arange(len(used_vertices), dtype=MESH_TRIANGLE_DTYPE)
+    return vertices[used_vertices], [(material_index, new_indices[triangles]) for material_index, triangles in sub_meshes]
+
+def build_line_arrays(positions, edges, edge_faces_counts):
+    # Edges used by less than two faces become segments, returns the positions they use in first-use order
+    # and the (segments, 2) indices into them
+    segments = edges[edge_faces_counts < 2]
+    indices = segments.ravel()
+
+    first_uses = np.full(len(positions), len(indices), dtype=np.int64)
+    np.minimum.at(first_uses, indices, np.arange(len(indices)))
+    used_vertices = np.flatnonzero(first_uses < len(indices))
+    used_vertices = used_vertices[np.argsort(first_uses[used_vertices], kind='stable')]
+
+    new_indices = np.zeros(len(positions), dtype=LINE_SEGMENT_DTYPE.base)
+    new_indices[used_vertices] = np.arange(len(used_vertices), dtype=LINE_SEGMENT_DTYPE.base)
+    return np.ascontiguousarray(positions[used_vertices], dtype=LINE_VERTEX_DTYPE.base), new_indices[segments]
+
+def count_cache_misses(triangles, cache_size = CONST_VERTEX_CACHE_SIZE):
+    # Simulates a FIFO cache, a vertex loaded as the n-th miss is evicted by the cache_size-th miss after it
+    if len(triangles) == 0:
+        return 0
+
+    misses = 0
+    load_times = [-cache_size - 1] * (int(triangles.max()) + 1)
+
+    for vertex in triangles.ravel().tolist():
+        if misses - load_times[vertex] > cache_size:
+            load_times[vertex] = misses
+            misses += 1
+
+    return misses
+
+def calc_acmr(cache_misses, triangles_count):
+    # Average cache miss ratio: vertices transformed per triangle, between 0.5 and 3.0 for closed meshes
+    return cache_misses / triangles_count if triangles_count > 0 else 0.0
+
+def optimize_vertex_cache(triangles, cache_size = CONST_VERTEX_CACHE_SIZE):
+    # Tipsify (Sander, Nehab and Barczak, 2007), linear in the triangle count. Returns the reordered
+    # triangles and their cache misses, its timestamps simulate the FIFO cache of count_cache_misses.
+    triangles_count = len(triangles)
+    if triangles_count < 2:
+        return triangles, count_cache_misses(triangles, cache_size)
+
+    # Local vertex numbers keep the per-vertex lists as short as the submesh
+    used_vertices, local_corners = np.unique(triangles.ravel(), return_inverse=True)
+    vertices_count = len(used_vertices)
+    local_corners = local_corners.reshape(-1)
+
+    # Triangles around every vertex, those of vertex v are vertex_triangles[starts[v]:starts[v + 1]]
+    live_counts = np.bincount(local_corners, minlength=vertices_count)
+    starts = np.zeros(vertices_count + 1, dtype=np.int64)
+    np.cumsum(live_counts, out=starts[1:])
+    vertex_triangles = (np.argsort(local_corners, kind='stable') // 3).tolist()
+
+    starts = starts.tolist()
+    live_counts = live_counts.tolist()
+    corners = local_corners.reshape(-1, 3).tolist()
+    cache_times = [0] * vertices_count
+    emitted = [False] * triangles_count
+    dead_ends = []
+    order = []
+
+    time = cache_size + 1
+    cursor = 1
+    fanning = 0
+    while fanning >= 0:
+        # Every vertex of the triangles emitted around this one is pushed as a dead end, and is a candidate
+        candidates_start = len(dead_ends)
+        for triangle in vertex_triangles[starts[fanning]:starts[fanning + 1]]:
+            if emitted[triangle]:
+                continue
+
+            emitted[triangle] = True
+            order.append(triangle)
+            triangle_corners = corners[triangle]
+            dead_ends.extend(triangle_corners)
+            for vertex in triangle_corners:
+                live_counts[vertex] -= 1
+                if time - cache_times[vertex] > cache_size:
+                    cache_times[vertex] = time
+                    time += 1
+
+        # The candidate still in the cache after its own remaining triangles are emitted, and oldest among those
+        fanning = -1
+        best_priority = -1
+        for vertex in dead_ends[candidates_start:]:
+            live_count = live_counts[vertex]
+            if live_count > 0:
+                age = time - cache_times[vertex]
+                priority = age if age + 2 * live_count <= cache_size else 0
+                if priority > best_priority:
+                    best_priority = priority
+                    fanning = vertex
+
+        if fanning < 0:
+            while dead_ends:
+                vertex = dead_ends.pop()
+                if live_counts[vertex] > 0:
+                    fanning = vertex
+                    break
+
+        if fanning < 0:
+            while cursor < vertices_count:
+                cursor += 1
+                if live_counts[cursor - 1] > 0:
+                    fanning = cursor - 1
+                    break
+
+    # Every miss advanced the time by one
+    return triangles[np.array(order, dtype=np.int64)], time - (cache_size + 1)
+
+def process_mesh_arrays(arrays, materials_count, weld, weld_epsilon, optimize_cache = False, strip = False, tangents = False, measure_cache = False):
+    # Tangent frames need the triangles as extracted, before welding merges their corners
+    if tangents and len(arrays.uvs) > 0:
+        arrays.tangents, arrays.bitangents = calc_tangents(arrays.positions, arrays.normals, arrays.uvs[0])
+
+    processed = ProcessedMesh()
+    processed.vertices = build_rigid_vertices(arrays) if arrays.bone_ids is None else build_weighted_vertices(arrays)
+    processed.unwelded_vertices_count = len(processed.vertices)
+
+    # Faces past the last slot, left behind when a slot is removed, are drawn by Blender with the last one
+    material_indices = np.clip(arrays.material_indices, 0, materials_count - 1) if materials_count > 0 else np.zeros_like(arrays.material_indices)
+
+    for i in range(0, max(materials_count, 1)):
+        material_index = -1 if materials_count == 0 else i
+        triangle_starts = np.flatnonzero(material_indices == i) * 3
+        triangles = (triangle_starts[:, None] + np.arange(3)).astype(MESH_TRIANGLE_DTYPE)
+        processed.sub_meshes.append((material_index, triangles))
+
+    if weld:
+        processed.vertices, remap = weld_vertices(processed.vertices, weld_epsilon)
+        processed.sub_meshes = [(material_index, remap[triangles].astype(MESH_TRIANGLE_DTYPE)) for material_index, triangles in processed.sub_meshes]
+
+    if strip:
+        kept_sub_meshes = []
+        for material_index, triangles in processed.sub_meshes:
+            degenerate = find_degenerate_triangles(processed.vertices, triangles)
+            processed.degenerate_triangles_count += int(np.count_nonzero(degenerate))
+            kept_sub_meshes.append((material_index, triangles[~degenerate]))
+
+        processed.sub_meshes = kept_sub_meshes
+
+    # Unwelded triangles share no vertices, there is nothing for the cache to reuse
+    if optimize_cache and weld:
+        optimized_sub_meshes = []
+        for material_index, triangles in processed.sub_meshes:
+            # Simulating the cache over the original order is another sequential pass, only made when it is reported
+            if measure_cache:
+                processed.cache_misses_before += count_cache_misses(triangles)
+            triangles, cache_misses = optimize_vertex_cache(triangles)
+            processed.cache_misses_after += cache_misses
+            optimized_sub_meshes.append((material_index, triangles))
+
+        processed.sub_meshes = optimized_sub_meshes
+
+    # Last, so the vertex order follows the final triangle order
+    if strip:
+        vertices_count = len(processed.vertices)
+        processed.vertices, processed.sub_meshes = reorder_vertices_by_first_use(processed.vertices, processed.sub_meshes)
+        processed.unused_vertices_count = vertices_count - len(processed.vertices)
+
+    return processed
+
+def share_arrays(arrays):
+    # Copies named arrays into a single shared memory block, the layout is what a process needs to attach to it
+    layout = []
+    size = 0
+
+    for name, array in arrays.items():
+        layout.append((name, array.dtype, array.shape, size))
+        size += array.nbytes
+
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for (name, dtype, shape, offset), array in zip(layout, arrays.values()):
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)[...] = array
+
+    return shm, layout
+
+def attach_arrays(name, layout):
+    # The views must be dropped before the block is closed
+    shm = shared_memory.SharedMemory(name=name)
+    arrays = {}
+
+    for array_name, dtype, shape, offset in layout:
+        arrays[array_name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offset)
+
+    return shm, arrays
+
+def mesh_arrays_to_dict(arrays):
+    named_arrays = {
+        "positions": arrays.positions,
+        "normals": arrays.normals,
+        "colors": arrays.colors,
+        "material_indices": arrays.material_indices,
+    }
+
+    if arrays.bone_ids is not None:
+        named_arrays["bone_ids"] = arrays.bone_ids
+        named_arrays["bone_weights"] = arrays.bone_weights
+
+    if arrays.tangents is not None:
+        named_arrays["tangents"] = arrays.tangents
+        named_arrays["bitangents"] = arrays.bitangents
+
+    for i, uv in enumerate(arrays.uvs):
+        named_arrays["uv_" + str(i)] = uv
+
+    return named_arrays
+
+def mesh_arrays_from_dict(named_arrays):
+    arrays = MeshArrays()
+    arrays.positions = named_arrays["positions"]
+    arrays.normals = named_arrays["normals"]
+    arrays.colors = named_arrays["colors"]
+    arrays.material_indices = named_arrays["material_indices"]
+    arrays.bone_ids = named_arrays.get("bone_ids")
+    arrays.bone_weights = named_arrays.get("bone_weights")
+    arrays.tangents = named_arrays.get("tangents")
+    arrays.bitangents = named_arrays.get("bitangents")
+
+    i = 0
+    while "uv_" + str(i) in named_arrays:
+        arrays.uvs.append(named_arrays["uv_" + str(i)])
+        i += 1
+
+    return arrays
+
+def process_shared_mesh(name, layout, materials_count, weld, weld_epsilon, optimize_cache, strip, tangents, measure_cache):
+    # Worker entry point, the results go back through a new shared memory block owned by the caller
+    input_shm, named_arrays = attach_arrays(name, layout)
+    processed = process_mesh_arrays(mesh_arrays_from_dict(named_arrays), materials_count, weld, weld_epsilon, optimize_cache, strip, tangents, measure_cache)
+    del named_arrays
+    input_shm.close()
+
+    output_arrays = {"vertices": processed.vertices}
+    for i, (material_index, triangles) in enumerate(processed.sub_meshes):
+        output_arrays["triangles_" + str(i)] = triangles
+
+    output_shm, output_layout = share_arrays(output_arrays)
+    output_shm.close()
+
+    material_indices = [material_index for material_index, _ in processed.sub_meshes]
+    return output_shm.name, output_layout, material_indices, processed.counts()
+
+def collect_shared_mesh(name, layout, material_indices, counts):
+    # Copies a worker's results out of shared memory and frees the block
+    output_shm, named_arrays = attach_arrays(name, layout)
+
+    processed = ProcessedMesh()
+    processed.vertices = named_arrays["vertices"].copy()
+    for count_name, count in counts.items():
+        setattr(processed, count_name, count)
+
+    for i, material_index in enumerate(material_indices):
+        processed.sub_meshes.append((material_index, named_arrays["triangles_" + str(i)].copy()))
+
+    del named_arrays
+    output_shm.close()
+    output_shm.unlink()
+
+    return processed
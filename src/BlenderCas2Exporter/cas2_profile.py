@@ -0,0 +1,201 @@
+# Optional wall time, peak memory and block size profile of the export, phase() is a no-op without one.
+
+import json
+import os
+import time
+import tracemalloc
+
+class NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+CONST_NULL_PHASE = NullPhase()
+
+class PhaseTotals:
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.peak_bytes = 0 # most memory allocated on top of what was traced when a call started
+
+    def add(self, seconds, peak_bytes):
+        self.calls += 1
+        self.seconds += seconds
+        self.peak_bytes = max(self.peak_bytes, peak_bytes)
+
+    def to_dict(self):
+        return {"calls": self.calls, "seconds": round(self.seconds, 6), "peak_bytes": self.peak_bytes}
+
+class NodeProfile:
+    def __init__(self, name):
+        self.name = name
+        self.node_type = None
+        self.bytes = 0
+        self.counts = {}
+        self.phases = {} # phase name -> PhaseTotals
+
+    def to_dict(self):
+        return {
+            "name": self.name,
+            "node_type": self.node_type,
+            "bytes": self.bytes,
+            **self.counts,
+            "phases": {name: totals.to_dict() for name, totals in self.phases.items()},
+        }
+
+class Phase:
+    def __init__(self, profile, name, node_name):
+        self.profile = profile
+        self.name = name
+        self.node_name = node_name
+        self.start = 0.0
+        self.start_bytes = 0
+        self.peak_bytes = 0 # highest traced memory seen while running, in absolute bytes
+
+    def __enter__(self):
+        if self.node_name is None and len(self.profile.running) > 0:
+            self.node_name = self.profile.running[-1].node_name
+
+        self.start_bytes = self.profile.fold_peak()
+        self.peak_bytes = self.start_bytes
+        self.profile.running.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        seconds = time.perf_counter() - self.start
+        self.profile.fold_peak()
+        self.profile.running.pop()
+        self.profile.add_phase(self.name, self.node_name, seconds, self.peak_bytes - self.start_bytes)
+        return False
+
+class ExportProfile:
+    CONST_NODE_COUNT_NAMES = ("vertices_count", "triangles_count", "sub_meshes_count")
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.seconds = 0.0
+        self.peak_bytes = 0
+        self.phases = {}      # phase name -> PhaseTotals over the whole export
+        self.nodes = {}       # node name -> NodeProfile, in the order nodes were first seen
+        self.block_bytes = {} # block type -> [blocks count, bytes]
+        self.running = []     # Phase of every phase running, innermost last
+        self.start = 0.0
+        self.started_tracing = False
+
+    def begin(self):
+        self.started_tracing = not tracemalloc.is_tracing()
+        if self.started_tracing:
+            tracemalloc.start()
+
+        tracemalloc.reset_peak()
+        self.start = time.perf_counter()
+
+    def end(self):
+        self.seconds = time.perf_counter() - self.start
+        self.fold_peak()
+        if self.started_tracing:
+            tracemalloc.stop()
+
+    def fold_peak(self):
+        # tracemalloc keeps a single peak, it is handed to every running phase before it is reset
+        current_bytes, peak_bytes = tracemalloc.get_traced_memory()
+        for phase in self.running:
+            phase.peak_bytes = max(phase.peak_bytes, peak_bytes)
+
+        self.peak_bytes = max(self.peak_bytes, peak_bytes)
+        tracemalloc.reset_peak()
+        return current_bytes
+
+    def node(self, name):
+        node = self.nodes.get(name)
+        if node is None:
+            node = NodeProfile(name)
+            self.nodes[name] = node
+
+        return node
+
+    def add_phase(self, name, node_name, seconds, peak_bytes):
+        self.phases.setdefault(name, PhaseTotals()).add(seconds, peak_bytes)
+        if node_name is not None:
+            self.node(node_name).phases.setdefault(name, PhaseTotals()).add(seconds, peak_bytes)
+
+    def add_block(self, block_type, size, node_name = None, counts = None):
+        block_bytes = self.block_bytes.setdefault(block_type, [0, 0])
+        block_bytes[0] += 1
+        block_bytes[1] += size
+
+        if node_name is not None:
+            node = self.node(node_name)
+            node.node_type = block_type
+            node.bytes = size
+            if counts is not None:
+                node.counts = {name: counts[name] for name in self.CONST_NODE_COUNT_NAMES}
+
+    def to_dict(self):
+        return {
+            "file": self.filepath,
+            "seconds": round(self.seconds, 6),
+            "peak_traced_bytes": self.peak_bytes,
+            "phases": {name: totals.to_dict() for name, totals in self.phases.items()},
+            "blocks": {block_type: {"count": count, "bytes": size} for block_type, (count, size) in self.block_bytes.items()},
+            "nodes": [node.to_dict() for node in self.nodes.values()],
+        }
+
+    def write_report(self, report_filepath):
+        with open(report_filepath, 'w', encoding='utf-8') as file:
+            json.dump(self.to_dict(), file, indent=4)
+
+    def summary_lines(self, phases_count = 8):
+        # The slowest phases first, for the info area
+        lines = [f"Profile: {self.seconds:.3f} s, {self.peak_bytes / (1024 * 1024):.1f} MB peak traced memory"]
+        for name, totals in sorted(self.phases.items(), key=lambda item: item[1].seconds, reverse=True)[:phases_count]:
+            lines.append(f"  {name}: {totals.seconds:.3f} s in {totals.calls} calls, {totals.peak_bytes / (1024 * 1024):.1f} MB peak")
+
+        for block_type, (count, size) in self.block_bytes.items():
+            lines.append(f"  {count} {block_type}: {size} bytes")
+
+        return lines
+
+active_profile = None
+
+class Profiling:
+    # Makes profile the active one for the duration of a with block, None profiles nothing
+    def __init__(self, profile):
+        self.profile = profile
+
+    def __enter__(self):
+        global active_profile
+        if self.profile is not None:
+            self.profile.begin()
+            active_profile = self.profile
+
+        return self.profile
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        global active_profile
+        if self.profile is not None:
+            active_profile = None
+            self.profile.end()
+
+        return False
+
+def is_profiling():
+    return active_profile is not None
+
+def phase(name, node_name = None):
+    if active_profile is None:
+        return CONST_NULL_PHASE
+
+    return Phase(active_profile, name, node_name)
+
+def record_block(block_type, size, node_name = None, counts = None):
+    if active_profile is not None:
+        active_profile.add_block(block_type, size, node_name, counts)
+
+def report_filepath(filepath):
+    # scene.cs2 -> scene.profile.json
+    root, _ = os.path.splitext(filepath)
+    return root + ".profile.json"
@@ -0,0 +1,489 @@
+# Memory-mapped .cs2 reader, usable without Blender. Arrays are views over the mapping, copy them to outlive the Cas2File.
+
+import mmap
+import sys
+import numpy as np
+
+from .cas2_format import (
+    CONST_CS2_FILE_TAG,
+    CONST_UINT16_SIZE,
+    CONST_UINT32_SIZE,
+    MESH_TRIANGLE_DTYPE,
+    LINE_VERTEX_DTYPE,
+    LINE_SEGMENT_DTYPE,
+    ANIM_TIME_DTYPE,
+    ANIM_TRANSLATION_DTYPE,
+    ANIM_ROTATION_DTYPE,
+    NodeType,
+    AttributeType,
+    UINT16_SCHEMA,
+    UINT32_SCHEMA,
+    INT32_SCHEMA,
+    STRING_ATTRIBUTE_SCHEMA,
+    INT_ATTRIBUTE_SCHEMA,
+    FLOAT_ATTRIBUTE_SCHEMA,
+    VEC3_ATTRIBUTE_SCHEMA,
+    VEC4_ATTRIBUTE_SCHEMA,
+    CAS2_HEADER_SCHEMA,
+    SCENE_INFO_SCHEMA,
+    KEY_FRAMES_1_SCHEMA,
+    KEY_FRAMES_2_SCHEMA,
+    BOUNDING_BOX_SCHEMA,
+    GEOMETRY_DATA_HEADER_SCHEMA,
+    INSTANCE_GEOMETRY_SCHEMA,
+    INSTANCE_OVERRIDE_GEOMETRY_SCHEMA,
+    NODE_HEADER_SCHEMA,
+    SCENE_ROOT_HEADER_SCHEMA,
+    SCENE_ROOT_DATA_SCHEMA,
+    SCENE_ROOT_FOOTER_SCHEMA,
+    UNKNOWN_SCENE_ROOT_DATA_1_SCHEMA,
+    SCENE_NODE_HEADER_SCHEMA,
+    SCENE_NODE_FOOTER_SCHEMA,
+    ANIM_DATA_UNKNOWN_SCHEMA,
+    BONE_WEIGHT_DTYPE,
+    vertex_data_rigid_dtype,
+    vertex_data_weighted_dtype,
+)
+
+FLOAT_DTYPE = np.dtype('<f4')
+UINT32_DTYPE = np.dtype('<u4')
+BOUNDING_BOX_DTYPE = np.dtype(('<f4', (len(BOUNDING_BOX_SCHEMA.fields),)))
+
+# Attribute arrays are stored in this order, every array starts with its length
+ATTRIBUTE_ARRAY_SCHEMAS = [
+    (AttributeType.STRING, STRING_ATTRIBUTE_SCHEMA),
+    (AttributeType.INT32, INT_ATTRIBUTE_SCHEMA),
+    (AttributeType.FLOAT, FLOAT_ATTRIBUTE_SCHEMA),
+    (AttributeType.VEC3, VEC3_ATTRIBUTE_SCHEMA),
+    (AttributeType.VEC4, VEC4_ATTRIBUTE_SCHEMA),
+]
+
+MODEL_NODE_TYPES = {NodeType.CAMERA, NodeType.RIGID_MODEL, NodeType.WEIGHTED_MODEL, NodeType.LINE, NodeType.DUMMY}
+INSTANCE_NODE_TYPES = {NodeType.INSTANCE_NO_MATERIAL, NodeType.INSTANCE_OVERRIDE_MATERIAL}
+
+# Model nodes whose geometry layout is unknown, the template only has 144 unknown bytes after a camera's
+# geometry data count and nothing after a dummy's. Their geometry is kept as raw bytes up to the block end.
+OPAQUE_GEOMETRY_NODE_TYPES = {NodeType.CAMERA, NodeType.DUMMY}
+
+def read_uint32(buffer, offset):
+    return UINT32_SCHEMA.codec.unpack_from(buffer, offset)[0], offset + CONST_UINT32_SIZE
+
+def read_int32(buffer, offset):
+    return INT32_SCHEMA.codec.unpack_from(buffer, offset)[0], offset + CONST_UINT32_SIZE
+
+def read_utf16_string(buffer, offset):
+    length = UINT16_SCHEMA.codec.unpack_from(buffer, offset)[0]
+    start = offset + CONST_UINT16_SIZE
+    end = start + length * 2
+    return bytes(buffer[start:end]).decode('utf-16-le'), end
+
+def read_array(buffer, offset, dtype, count):
+    # Read-only view over the mapping, no bytes are copied
+    array = np.frombuffer(buffer, dtype = dtype, count = count, offset = offset)
+    return array, offset + array.nbytes
+
+def read_counted_array(buffer, offset, dtype):
+    count, offset = read_uint32(buffer, offset)
+    return read_array(buffer, offset, dtype, count)
+
+def read_node_attributes(buffer, offset):
+    attributes = {}
+
+    for attribute_type, schema in ATTRIBUTE_ARRAY_SCHEMAS:
+        values = {}
+        count, offset = read_uint32(buffer, offset)
+
+        for i in range(count):
+            name, offset = read_utf16_string(buffer, offset)
+
+            if attribute_type == AttributeType.STRING:
+                offset += schema.size()
+                values[name], offset = read_utf16_string(buffer, offset)
+            else:
+                values[name] = schema.read(buffer, offset)["value"]
+                offset += schema.size()
+
+        attributes[attribute_type] = values
+
+    return attributes, offset
+
+def node_type_from_value(value):
+    try:
+        return NodeType(value)
+    except ValueError:
+        return value # unknown node types are kept as their raw value and skipped over
+
+class LineDataView:
+    def __init__(self, buffer, offset):
+        self.vertices, offset = read_counted_array(buffer, offset, LINE_VERTEX_DTYPE) # (vertices, 3) float32
+        self.segments, offset = read_counted_array(buffer, offset, LINE_SEGMENT_DTYPE) # (segments, 2) uint32
+        self.end = offset
+
+class SubMeshView:
+    def __init__(self, buffer, offset):
+        triangles_count, offset = read_uint32(buffer, offset)
+        triangles, offset = read_array(buffer, offset, MESH_TRIANGLE_DTYPE, triangles_count * 3)
+        self.triangles = triangles.reshape(triangles_count, 3)
+        self.material_id, offset = read_int32(buffer, offset)
+        self.end = offset
+
+class GeometryDataView:
+    def __init__(self, buffer, offset, node_type):
+        self.header = GEOMETRY_DATA_HEADER_SCHEMA.read(buffer, offset)
+        offset += GEOMETRY_DATA_HEADER_SCHEMA.size()
+
+        self.unknown_float_array, offset = read_counted_array(buffer, offset, FLOAT_DTYPE)
+        self.bounding_boxes, offset = read_counted_array(buffer, offset, BOUNDING_BOX_DTYPE) # min_x, min_y, min_z, max_x, max_y, max_z in file axes
+
+        self.lines = []
+        lines_count, offset = read_uint32(buffer, offset)
+        for i in range(lines_count):
+            line = LineDataView(buffer, offset)
+            self.lines.append(line)
+            offset = line.end
+
+        self.uv_channels = None
+        self.vertices = None
+        self.sub_meshes = []
+
+        if node_type == NodeType.LINE:
+            self.unknown, offset = read_int32(buffer, offset)
+            self.end = offset
+            return
+
+        self.uv_channels, offset = read_counted_array(buffer, offset, UINT32_DTYPE)
+
+        if node_type == NodeType.RIGID_MODEL:
+            self.vertices, offset = self.read_rigid_vertices(buffer, offset)
+        elif node_type == NodeType.WEIGHTED_MODEL:
+            self.vertices, offset = self.read_weighted_vertices(buffer, offset)
+        else:
+            raise ValueError("Geometry of " + str(node_type) + " nodes has no known layout")
+
+        sub_meshes_count, offset = read_uint32(buffer, offset)
+        for i in range(sub_meshes_count):
+            submesh = SubMeshView(buffer, offset)
+            self.sub_meshes.append(submesh)
+            offset = submesh.end
+
+        self.unknown_related_to_vertex_colors, offset = read_int32(buffer, offset)
+        self.end = offset
+
+    def read_rigid_vertices(self, buffer, offset):
+        vertices_count, offset = read_uint32(buffer, offset)
+        if vertices_count == 0:
+            return read_array(buffer, offset, vertex_data_rigid_dtype(0), 0)
+
+        # The layout is only fixed if every vertex has as many texture coordinates as the first one
+        tex_coords_offset = offset + vertex_data_rigid_dtype(0).fields["tex_coords_count"][1]
+        tex_coords_count = read_uint32(buffer, tex_coords_offset)[0]
+
+        vertices, offset = read_array(buffer, offset, vertex_data_rigid_dtype(tex_coords_count), vertices_count)
+        if np.any(vertices["tex_coords_count"] != tex_coords_count):
+            raise ValueError("Vertices with differing texture coordinate counts are not supported")
+
+        return vertices, offset
+
+    def read_weighted_vertices(self, buffer, offset):
+        # Vertices store only the bone weights they use, they are copied out padded with zero weights
+        vertices_count, offset = read_uint32(buffer, offset)
+        if vertices_count == 0:
+            return np.zeros(0, dtype=vertex_data_weighted_dtype(0, 0)), offset
+
+        tex_coords_offset = offset + vertex_data_rigid_dtype(0).fields["tex_coords_count"][1]
+        tex_coords_count = read_uint32(buffer, tex_coords_offset)[0]
+
+        # Fields before the bone weights, the bones count included, and after them
+        head_size = vertex_data_weighted_dtype(tex_coords_count, 0).fields["bone_weights"][1]
+        tail_size = vertex_data_weighted_dtype(0, 0).itemsize - vertex_data_weighted_dtype(0, 0).fields["position_2"][1]
+
+        starts = np.empty(vertices_count, dtype=np.int64)
+        bones_counts = np.empty(vertices_count, dtype=np.int64)
+        for i in range(vertices_count):
+            starts[i] = offset
+            bones_counts[i] = read_uint32(buffer, offset + head_size - CONST_UINT32_SIZE)[0]
+            offset += head_size + bones_counts[i] * BONE_WEIGHT_DTYPE.itemsize + tail_size
+
+        source = np.frombuffer(buffer, dtype=np.uint8, count=offset - starts[0], offset=starts[0])
+        starts -= starts[0]
+
+        bones_count = int(bones_counts.max())
+        vertices = np.zeros(vertices_count, dtype=vertex_data_weighted_dtype(tex_coords_count, bones_count))
+        rows = vertices.view(np.uint8).reshape(vertices_count, vertices.dtype.itemsize)
+        weights_size = bones_count * BONE_WEIGHT_DTYPE.itemsize
+        used_weights_sizes = bones_counts * BONE_WEIGHT_DTYPE.itemsize
+
+        rows[:, :head_size] = source[starts[:, None] + np.arange(head_size)]
+
+        weight_bytes = np.arange(weights_size)
+        used = weight_bytes < used_weights_sizes[:, None]
+        weight_indices = np.minimum(starts[:, None] + head_size + weight_bytes, len(source) - 1)
+        rows[:, head_size:head_size + weights_size][used] = source[weight_indices][used]
+
+        rows[:, head_size + weights_size:] = source[(starts + head_size + used_weights_sizes)[:, None] + np.arange(tail_size)]
+
+        if np.any(vertices["tex_coords_count"] != tex_coords_count):
+            raise ValueError("Vertices with differing texture coordinate counts are not supported")
+
+        return vertices, offset
+
+    def triangles_count(self):
+        return sum(len(submesh.triangles) for submesh in self.sub_meshes)
+
+class InstanceGeometryView:
+    def __init__(self, buffer, offset, node_type):
+        self.header = GEOMETRY_DATA_HEADER_SCHEMA.read(buffer, offset)
+        offset += GEOMETRY_DATA_HEADER_SCHEMA.size()
+
+        self.unknown_float_array, offset = read_counted_array(buffer, offset, FLOAT_DTYPE)
+        self.bounding_boxes, offset = read_counted_array(buffer, offset, BOUNDING_BOX_DTYPE)
+
+        schema = INSTANCE_OVERRIDE_GEOMETRY_SCHEMA if node_type == NodeType.INSTANCE_OVERRIDE_MATERIAL else INSTANCE_GEOMETRY_SCHEMA
+        record = schema.read(buffer, offset)
+        self.original_node_index = record["original_node_index"]
+        self.material_id = record.get("material_id") # None for instances keeping the original's materials
+        self.end = offset + schema.size()
+
+class AnimDataView:
+    def __init__(self, buffer, offset):
+        self.translation_times, offset = read_counted_array(buffer, offset, ANIM_TIME_DTYPE)
+        self.translations, offset = read_counted_array(buffer, offset, ANIM_TRANSLATION_DTYPE) # (keys, 3) in file axes
+        offset += ANIM_DATA_UNKNOWN_SCHEMA.size()
+        self.rotation_times, offset = read_counted_array(buffer, offset, ANIM_TIME_DTYPE)
+        self.rotations, offset = read_counted_array(buffer, offset, ANIM_ROTATION_DTYPE) # (keys, 4) x, y, z, w in file axes
+        self.end = offset
+
+class SceneNodeView:
+    def __init__(self, buffer, offset):
+        self.name, offset = read_utf16_string(buffer, offset)
+        self.parent_index = SCENE_NODE_HEADER_SCHEMA.read(buffer, offset)["parent_index"]
+        offset += SCENE_NODE_HEADER_SCHEMA.size()
+
+        self.anim_data = AnimDataView(buffer, offset)
+        offset = self.anim_data.end
+
+        self.unknown_value = SCENE_NODE_FOOTER_SCHEMA.read(buffer, offset)["unknown_value"]
+        offset += SCENE_NODE_FOOTER_SCHEMA.size()
+        self.unknown_name, offset = read_utf16_string(buffer, offset)
+        self.attributes, offset = read_node_attributes(buffer, offset)
+        self.end = offset
+
+class NodeView:
+    def __init__(self, buffer, offset):
+        header = NODE_HEADER_SCHEMA.read(buffer, offset)
+        self.buffer = buffer
+        self.offset = offset
+        self.block_size = header["block_size"]
+        self.node_type = node_type_from_value(header["node_type"])
+        self.name = ""
+
+    def end(self):
+        return self.offset + self.block_size
+
+    def data(self):
+        return memoryview(self.buffer)[self.offset:self.end()]
+
+class ModelNodeView(NodeView):
+    def __init__(self, buffer, offset):
+        super().__init__(buffer, offset)
+        offset += NODE_HEADER_SCHEMA.size()
+
+        if self.node_type in INSTANCE_NODE_TYPES:
+            self.unknown_1, offset = read_uint32(buffer, offset)
+
+        self.name, offset = read_utf16_string(buffer, offset)
+        self.unknown_string, offset = read_utf16_string(buffer, offset)
+        self.user_defined_properties, offset = read_utf16_string(buffer, offset)
+        self.node_index, offset = read_uint32(buffer, offset)
+        self.attributes, offset = read_node_attributes(buffer, offset)
+        self.geometry_data_count, offset = read_uint32(buffer, offset)
+        self.geometry_data_offset = offset
+        self._geometry_data = None
+
+    @property
+    def geometry_data(self):
+        # Empty for cameras and dummies, see raw_geometry_data
+        if self._geometry_data is None:
+            geometry_data = []
+            offset = self.geometry_data_offset
+
+            geometry_view = InstanceGeometryView if self.node_type in INSTANCE_NODE_TYPES else GeometryDataView
+            geometry_data_count = 0 if self.node_type in OPAQUE_GEOMETRY_NODE_TYPES else self.geometry_data_count
+
+            for i in range(geometry_data_count):
+                geometry = geometry_view(self.buffer, offset, self.node_type)
+                geometry_data.append(geometry)
+                offset = geometry.end
+
+            self._geometry_data = geometry_data
+
+        return self._geometry_data
+
+    def raw_geometry_data(self):
+        # Bytes after the geometry data count up to the end of the block, the only way to the geometry of cameras and dummies
+        return self.data()[self.geometry_data_offset - self.offset:]
+
+class SceneRootView(NodeView):
+    def __init__(self, buffer, offset):
+        super().__init__(buffer, offset)
+        self.nodes_count = SCENE_ROOT_HEADER_SCHEMA.read(buffer, offset)["nodes_count"]
+        self.name, offset = read_utf16_string(buffer, offset + SCENE_ROOT_HEADER_SCHEMA.size())
+
+        offset += SCENE_ROOT_DATA_SCHEMA.size() + UNKNOWN_SCENE_ROOT_DATA_1_SCHEMA.size() + CONST_UINT32_SIZE
+        self.file_info, offset = read_utf16_string(buffer, offset)
+        self.scene_nodes_offset = offset + SCENE_ROOT_FOOTER_SCHEMA.size()
+        self._scene_nodes = None
+
+    @property
+    def scene_nodes(self):
+        # The root counts itself, scene node i holds the transform of the node with node index i + 1
+        if self._scene_nodes is None:
+            scene_nodes = []
+            offset = self.scene_nodes_offset
+
+            for i in range(max(self.nodes_count - 1, 0)):
+                scene_node = SceneNodeView(self.buffer, offset)
+                scene_nodes.append(scene_node)
+                offset = scene_node.end
+
+            self._scene_nodes = scene_nodes
+
+        return self._scene_nodes
+
+class MaterialNodeView(NodeView):
+    def __init__(self, buffer, offset):
+        super().__init__(buffer, offset)
+        self.material_type, offset = read_uint32(buffer, offset + NODE_HEADER_SCHEMA.size())
+        self.name, offset = read_utf16_string(buffer, offset)
+        self.material_name, offset = read_utf16_string(buffer, offset)
+
+def create_node_view(buffer, offset):
+    node_type = node_type_from_value(NODE_HEADER_SCHEMA.read(buffer, offset)["node_type"])
+
+    if node_type in MODEL_NODE_TYPES or node_type in INSTANCE_NODE_TYPES:
+        return ModelNodeView(buffer, offset)
+
+    if node_type == NodeType.SCENE_ROOT:
+        return SceneRootView(buffer, offset)
+
+    if node_type == NodeType.MATERIAL:
+        return MaterialNodeView(buffer, offset)
+
+    return NodeView(buffer, offset)
+
+class Cas2File:
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.file = open(filepath, 'rb')
+
+        try:
+            self.buffer = mmap.mmap(self.file.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError(filepath + " is empty, not a .cs2 file")
+
+        try:
+            self.read_header()
+        except Exception:
+            self.close()
+            raise
+
+        self._nodes = None
+
+    def read_header(self):
+        buffer = self.buffer
+
+        if len(buffer) < CAS2_HEADER_SCHEMA.size() or buffer[:len(CONST_CS2_FILE_TAG)] != CONST_CS2_FILE_TAG:
+            raise ValueError(self.filepath + " is not a .cs2 file")
+
+        self.header = CAS2_HEADER_SCHEMA.read(buffer, 0)
+
+        offset = CAS2_HEADER_SCHEMA.size()
+        self.addon_details, offset = read_utf16_string(buffer, offset)
+        self.file_details, offset = read_utf16_string(buffer, offset)
+
+        self.scene_info = SCENE_INFO_SCHEMA.read(buffer, offset)
+        offset += self.scene_info["block_size"]
+
+        self.key_frames_1 = KEY_FRAMES_1_SCHEMA.read(buffer, offset)
+        offset += self.key_frames_1["block_size"]
+
+        self.key_frames_2 = KEY_FRAMES_2_SCHEMA.read(buffer, offset)
+        offset += self.key_frames_2["block_size"]
+
+        self.nodes_offset = offset
+
+    @property
+    def nodes(self):
+        # Walking only touches the node headers, every block records its full size
+        if self._nodes is None:
+            nodes = []
+            offset = self.nodes_offset
+
+            while offset + NODE_HEADER_SCHEMA.size() <= len(self.buffer):
+                node = create_node_view(self.buffer, offset)
+                if node.block_size < NODE_HEADER_SCHEMA.size() or node.end() > len(self.buffer):
+                    raise ValueError("Node at offset " + str(offset) + " has an invalid size of " + str(node.block_size))
+
+                nodes.append(node)
+                offset = node.end()
+
+            self._nodes = nodes
+
+        return self._nodes
+
+    def nodes_of_type(self, node_type):
+        return [node for node in self.nodes if node.node_type == node_type]
+
+    def find_node(self, name):
+        for node in self.nodes:
+            if node.name == name:
+                return node
+
+        return None
+
+    def close(self):
+        if self.buffer is not None:
+            try:
+                self.buffer.close()
+            except BufferError:
+                pass # arrays still reference the mapping, it is released together with them
+
+            self.buffer = None
+
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def print_summary(filepath):
+    with Cas2File(filepath) as cas2_file:
+        print(filepath)
+        print("  " + cas2_file.addon_details)
+        print("  " + cas2_file.file_details.replace("\n", "\n  "))
+        print("  key frames " + str(cas2_file.key_frames_1["key_start"]) + " to " + str(cas2_file.key_frames_1["key_end"]) + " s")
+
+        for node in cas2_file.nodes:
+            node_type = node.node_type.name if isinstance(node.node_type, NodeType) else str(node.node_type)
+            print("  " + node_type + " \"" + node.name + "\" (" + str(node.block_size) + " bytes)")
+
+            if node.node_type in (NodeType.RIGID_MODEL, NodeType.WEIGHTED_MODEL):
+                for geometry in node.geometry_data:
+                    print("    " + str(len(geometry.vertices)) + " vertices, " + str(geometry.triangles_count()) + " triangles, " + str(len(geometry.sub_meshes)) + " submeshes, " + str(len(geometry.uv_channels)) + " uv channels")
+            elif node.node_type == NodeType.LINE:
+                for geometry in node.geometry_data:
+                    for line in geometry.lines:
+                        print("    line of " + str(len(line.vertices)) + " vertices, " + str(len(line.segments)) + " segments")
+            elif node.node_type in INSTANCE_NODE_TYPES:
+                for geometry in node.geometry_data:
+                    print("    instance of node " + str(geometry.original_node_index) + ("" if geometry.material_id is None else ", material " + str(geometry.material_id)))
+            elif node.node_type == NodeType.SCENE_ROOT:
+                keys_count = sum(len(scene_node.anim_data.translation_times) + len(scene_node.anim_data.rotation_times) for scene_node in node.scene_nodes)
+                print("    " + str(len(node.scene_nodes)) + " scene nodes, " + str(keys_count) + " animation keys")
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        print_summary(path)
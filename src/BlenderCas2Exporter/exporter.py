@@ -0,0 +1,2183 @@
+# Coordinates system: Left-handed
+# Axes setup: X (right), Y (up), Z (front)
+# Units: Meters
+
+import bpy
+import os
+import bmesh
+import getpass
+import hashlib
+import itertools
+import math
+import tempfile
+import multiprocessing
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from enum import Enum
+
+from .cas2_format import (
+    CONST_FLOAT_MAX,
+    CONST_FLOAT_MIN,
+    CONST_CS2_FILE_TAG,
+    CONST_UINT16_SIZE,
+    CONST_UINT32_SIZE,
+    CONST_INT32_SIZE,
+    CONST_FLOAT_SIZE,
+    ANIM_TIME_DTYPE,
+    ANIM_TRANSLATION_DTYPE,
+    ANIM_ROTATION_DTYPE,
+    NodeType,
+    AttributeType,
+    GeometryDataType,
+    UINT16_SCHEMA,
+    UINT32_SCHEMA,
+    INT32_SCHEMA,
+    FLOAT_SCHEMA,
+    VEC2_SCHEMA,
+    VEC3_SCHEMA,
+    VEC4_SCHEMA,
+    QUAT_VEC3_TRANSFORM_SCHEMA,
+    STRING_ATTRIBUTE_SCHEMA,
+    INT_ATTRIBUTE_SCHEMA,
+    FLOAT_ATTRIBUTE_SCHEMA,
+    VEC3_ATTRIBUTE_SCHEMA,
+    VEC4_ATTRIBUTE_SCHEMA,
+    CAS2_HEADER_SCHEMA,
+    SCENE_INFO_SCHEMA,
+    KEY_FRAMES_1_SCHEMA,
+    KEY_FRAMES_2_SCHEMA,
+    UNKNOWN_SCENE_ROOT_DATA_1_SCHEMA,
+    BOUNDING_BOX_SCHEMA,
+    GEOMETRY_DATA_HEADER_SCHEMA,
+    INSTANCE_GEOMETRY_SCHEMA,
+    INSTANCE_OVERRIDE_GEOMETRY_SCHEMA,
+    NODE_HEADER_SCHEMA,
+    SCENE_ROOT_HEADER_SCHEMA,
+    SCENE_ROOT_DATA_SCHEMA,
+    SCENE_ROOT_FOOTER_SCHEMA,
+    SCENE_NODE_HEADER_SCHEMA,
+    SCENE_NODE_FOOTER_SCHEMA,
+    ANIM_DATA_UNKNOWN_SCHEMA,
+    LINE_VERTEX_DTYPE,
+    LINE_SEGMENT_DTYPE,
+    BlockSchema,
+    encode_weighted_vertices,
+)
+from .cas2_mesh import (
+    MeshArrays,
+    ProcessedMesh,
+    calc_triangle_normals,
+    reduce_bone_weights,
+    build_line_arrays,
+    count_missing_rows,
+    process_mesh_arrays,
+    share_arrays,
+    mesh_arrays_to_dict,
+    process_shared_mesh,
+    collect_shared_mesh,
+)
+from .cas2_anim import (
+    matrices_to_file_transforms,
+    bones_to_parent_space,
+    make_quaternions_continuous,
+    reduce_translation_keys,
+    reduce_rotation_keys,
+)
+from .cas2_profile import phase, record_block
+from .cas2_index import Cas2Index, index_filepath
+
+CONST_OBJECT_PROPERTY_PREFIX = "property_"
+CONST_OBJECT_ATTRIBUTE_PREFIX = "attribute_"
+CONST_ATTRIBUTES_STRING = "string_attributes"
+CONST_ATTRIBUTES_INT = "int_attributes"
+CONST_ATTRIBUTES_FLOAT = "float_attributes"
+CONST_ATTRIBUTES_VEC3 = "vec3_attributes"
+CONST_ATTRIBUTES_VEC4 = "vec4_attributes"
+
+# Bump whenever the encoding of model nodes changes, so cached nodes from older versions are not reused
+CONST_MODEL_CACHE_VERSION = 5
+CONST_MODEL_CACHE_DIRECTORY = os.path.join(tempfile.gettempdir(), "cas2_model_cache")
+
+# Name of the vertex group that keeps material boundaries and uv seams in place while decimating LODs
+CONST_LOD_LOCKED_GROUP = "cas2_lod_locked"
+# Decimate modifier vertex group factor, its maximum. Collapsing an edge with a locked vertex costs this
+# many times the edge length more, so those edges are collapsed last.
+CONST_LOD_LOCK_FACTOR = 1000.0
+
+# Keys of the texture coordinate channels holding tangent frames, after those of the uv layers
+CONST_TANGENT_CHANNEL = "cas2_tangent"
+CONST_BITANGENT_CHANNEL = "cas2_bitangent"
+
+# Prefix of every model cache entry, followed by the encoded node. The fields are the counts of ModelNode.counts.
+MODEL_CACHE_ENTRY_SCHEMA = BlockSchema(
+    ("unwelded_vertices_count", 'I'),
+    ("vertices_count", 'I'),
+    ("triangles_count", 'I'),
+    ("cache_misses_before", 'I'),
+    ("cache_misses_after", 'I'),
+    ("degenerate_triangles_count", 'I'),
+    ("unused_vertices_count", 'I'),
+    ("stripped_bytes", 'I'),
+    ("sub_meshes_count", 'I'),
+    ("dropped_lods_count", 'I'),
+)
+
+class TriangulationMethod(Enum):
+    LOOP_TRIANGLES = 0
+    BMESH = 1
+
+class ExportSettings:
+    def __init__(self):
+        self.triangulation_method = TriangulationMethod.LOOP_TRIANGLES
+        self.weld_vertices = True
+        self.weld_epsilon = 0.0
+        self.optimize_vertex_cache = False
+        self.measure_vertex_cache = False # also count the cache misses of the triangles before reordering, for reports
+        self.strip_unused_geometry = True
+        self.lod_ratios = [] # triangle ratio of every generated LOD, each becomes one more geometry data entry
+        self.export_instances = True # objects sharing a mesh become instances of the first of them
+        self.export_tangents = False # tangent and bitangent of the first uv layer as two more texture coordinates
+        self.export_animation = False # sample every frame of the scene's range instead of only the current one
+        self.translation_tolerance = 0.0001 # meters, keys interpolated within it from their neighbours are dropped
+        self.rotation_tolerance = math.radians(0.01) # radians, the same for rotation keys
+        self.encode_processes = 0 # 0 processes meshes on the main thread
+        self.write_index = False # a .index.json next to the file with the offset, size and hash of every node
+
+class Utf16String:
+    def __init__(self, value = ""):
+        self.string = value
+
+    def write(self, buffer, offset):
+        offset = UINT16_SCHEMA.write(buffer, offset, len(self.string))
+        return write_bytes(buffer, offset, self.string.encode('utf-16-le'))
+
+    def read(self, file):
+        length_data = file.read(2)
+        utf16_string_length = UINT16_SCHEMA.codec.unpack(length_data)[0]
+        utf16_string_bytes = file.read(utf16_string_length * 2)
+        self.string = utf16_string_bytes.decode('utf-16-le')
+    
+    def size(self):
+        return CONST_UINT16_SIZE + len(self.string) * 2
+
+class Vec2:
+    def __init__(self, x = 0.0, y = 0.0):
+        self.x = x
+        self.y = y
+
+    def write(self, buffer, offset):
+        return VEC2_SCHEMA.write(buffer, offset, self.x, self.y)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return VEC2_SCHEMA.size()
+
+class Vec3:
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def write(self, buffer, offset):
+        return VEC3_SCHEMA.write(buffer, offset, self.x, self.y, self.z)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return VEC3_SCHEMA.size()
+
+class Vec4:
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0, w = 0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.w = w
+
+    def write(self, buffer, offset):
+        return VEC4_SCHEMA.write(buffer, offset, self.x, self.y, self.z, self.w)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return VEC4_SCHEMA.size()
+
+class Quaternion:
+    def __init__(self, x = 0.0, y = 0.0, z = 0.0, w = 1.0):
+        self.vec4 = Vec4(x, y, z, w)
+
+    def write(self, buffer, offset):
+        return self.vec4.write(buffer, offset)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return self.vec4.size()
+
+class QuatVec3Transform:
+    def __init__(self):
+        self.rotation = Quaternion()
+        self.translation = Vec3()
+
+    def write(self, buffer, offset):
+        rotation = self.rotation.vec4
+        translation = self.translation
+        return QUAT_VEC3_TRANSFORM_SCHEMA.write(buffer, offset, rotation.x, rotation.y, rotation.z, rotation.w, translation.x, translation.y, translation.z)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return QUAT_VEC3_TRANSFORM_SCHEMA.size()
+
+class AttributeInfo:
+    def __init__(self, name, value):
+        self.name = name
+        self.value = value
+
+class StringAttribute:
+    def __init__(self, name, value):
+        self.name = Utf16String(name)
+        self.type = AttributeType.STRING
+        self.string_value = Utf16String(value)
+
+    def write(self, buffer, offset):
+        offset = self.name.write(buffer, offset)
+        offset = STRING_ATTRIBUTE_SCHEMA.write(buffer, offset, self.type.value)
+        return self.string_value.write(buffer, offset)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return self.name.size() + STRING_ATTRIBUTE_SCHEMA.size() + self.string_value.size()
+
+class IntAttribute:
+    def __init__(self, name, value):
+        self.name = Utf16String(name)
+        self.unknown_1 = 0
+        self.type = AttributeType.INT32
+        self.unknown_2 = 0
+        self.unknown_3 = 0
+        self.unknown_4 = 0
+        self.unknown_5 = 0
+        self.unknown_6 = 0
+        self.int_value = value
+
+    def write(self, buffer, offset):
+        offset = self.name.write(buffer, offset)
+        return INT_ATTRIBUTE_SCHEMA.write(buffer, offset, self.unknown_1, self.type.value, self.unknown_2, self.unknown_3, self.unknown_4, self.unknown_5, self.unknown_6, self.int_value)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return INT_ATTRIBUTE_SCHEMA.size() + self.name.size()
+
+class FloatAttribute:
+    def __init__(self, name, value):
+        self.name = Utf16String(name)
+        self.unknown_1 = 0
+        self.type = AttributeType.FLOAT
+        self.unknown_2 = 0
+        self.unknown_3 = 0
+        self.unknown_4 = 0
+        self.unknown_5 = 0
+        self.unknown_6 = 0
+        self.float_value = value
+
+    def write(self, buffer, offset):
+        offset = self.name.write(buffer, offset)
+        return FLOAT_ATTRIBUTE_SCHEMA.write(buffer, offset, self.unknown_1, self.type.value, self.unknown_2, self.unknown_3, self.unknown_4, self.unknown_5, self.unknown_6, self.float_value)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return FLOAT_ATTRIBUTE_SCHEMA.size() + self.name.size()
+
+class Vec3Attribute:
+    def __init__(self, name, value):
+        self.name = Utf16String(name)
+        self.unknown_1 = 0
+        self.type = AttributeType.VEC3
+        self.unknown_2 = 0
+        self.unknown_3 = 0
+        self.unknown_4 = 0
+        self.unknown_5 = 0
+        self.unknown_6 = 0
+        self.vec3_value = value
+
+    def write(self, buffer, offset):
+        offset = self.name.write(buffer, offset)
+        value = self.vec3_value
+        return VEC3_ATTRIBUTE_SCHEMA.write(buffer, offset, self.unknown_1, self.type.value, self.unknown_2, self.unknown_3, self.unknown_4, self.unknown_5, self.unknown_6, value.x, value.y, value.z)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return VEC3_ATTRIBUTE_SCHEMA.size() + self.name.size()
+
+class Vec4Attribute:
+    def __init__(self, name, value):
+        self.name = Utf16String(name)
+        self.unknown_1 = 0
+        self.type = AttributeType.VEC4
+        self.unknown_2 = 0
+        self.unknown_3 = 0
+        self.unknown_4 = 0
+        self.unknown_5 = 0
+        self.unknown_6 = 0
+        self.vec4_value = value
+
+    def write(self, buffer, offset):
+        offset = self.name.write(buffer, offset)
+        value = self.vec4_value
+        return VEC4_ATTRIBUTE_SCHEMA.write(buffer, offset, self.unknown_1, self.type.value, self.unknown_2, self.unknown_3, self.unknown_4, self.unknown_5, self.unknown_6, value.x, value.y, value.z, value.w)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return VEC4_ATTRIBUTE_SCHEMA.size() + self.name.size()
+
+class NodeAttributes:
+    def __init__(self, obj = None):
+        attributes = build_attributes(obj) if obj is not None else build_empty_attributes()
+
+        self.string_attributes = attributes[CONST_ATTRIBUTES_STRING]
+        self.int_attributes = attributes[CONST_ATTRIBUTES_INT]
+        self.float_attributes = attributes[CONST_ATTRIBUTES_FLOAT]
+        self.vec3_attributes = attributes[CONST_ATTRIBUTES_VEC3]
+        self.vec4_attributes = attributes[CONST_ATTRIBUTES_VEC4]
+
+    def all_attribute_arrays(self):
+        return [self.string_attributes, self.int_attributes, self.float_attributes, self.vec3_attributes, self.vec4_attributes]
+
+    def write_attributes_array(self, buffer, offset, attributes):
+        offset = write_uint32(buffer, offset, len(attributes))
+
+        for attribute in attributes:
+            offset = attribute.write(buffer, offset)
+
+        return offset
+
+    def write(self, buffer, offset):
+        for attributes in self.all_attribute_arrays():
+            offset = self.write_attributes_array(buffer, offset, attributes)
+
+        return offset
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        block_size = 0
+
+        for attributes in self.all_attribute_arrays():
+            block_size += CONST_UINT32_SIZE # length size
+            block_size += sum(attribute.size() for attribute in attributes)
+
+        return block_size
+
+class UnknownKeyFramesBlockStruct1:
+    def __init__(self):
+        self.unknown_count = 0
+        self.unknown_array_1 = []
+        self.unknown_array_2 = []
+
+    def fill_temp_data(self):
+        self.unknown_count = 1
+
+        for i in range(self.unknown_count):
+            self.unknown_array_1 = [0 for _ in range(2)]
+            self.unknown_array_2 = [0 for _ in range(1)]
+
+    def write(self, buffer, offset):
+        offset = write_uint32(buffer, offset, self.unknown_count)
+
+        for i in range(self.unknown_count):
+            offset = write_uint32(buffer, offset, len(self.unknown_array_1))
+            for value in self.unknown_array_1:
+                offset = write_uint32(buffer, offset, value)
+
+            offset = write_uint32(buffer, offset, len(self.unknown_array_2))
+            for value in self.unknown_array_2:
+                offset = write_uint32(buffer, offset, value)
+
+        return offset
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        struct_size = CONST_UINT32_SIZE # unknown_count
+
+        for i in range(self.unknown_count):
+            struct_size += 2 * CONST_UINT32_SIZE # len(unknown_array_1) + len(unknown_array_2)
+            struct_size += len(self.unknown_array_1) * CONST_UINT32_SIZE
+            struct_size += len(self.unknown_array_2) * CONST_UINT32_SIZE
+
+        return struct_size
+
+class UnknownKeyFramesBlockStruct2:
+    def __init__(self):
+        self.unknown_count = 0
+        self.unknown_array = []
+
+    def fill_temp_data(self):
+        self.unknown_count = 1
+        self.unknown_array = [QuatVec3Transform() for _ in range(self.unknown_count)]
+
+    def write(self, buffer, offset):
+        offset = write_uint32(buffer, offset, self.unknown_count)
+
+        for transform in self.unknown_array:
+            offset = transform.write(buffer, offset)
+
+        return offset
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return CONST_UINT32_SIZE + sum(transform.size() for transform in self.unknown_array)
+
+class UnknownKeyFramesBlockStruct3:
+    def __init__(self):
+        self.unknown_count = 0
+        self.unknown_1 = 0
+        self.unknown_2 = 0
+        self.unknown_3 = 0
+        self.unknown_array_1_count = 0
+        self.unknown_array_2_count = 0
+        self.unknown_array_1 = []
+        self.unknown_array_2 = []
+
+    def fill_temp_data(self):
+        self.unknown_count = 0
+
+        self.unknown_array_1_count = 10
+        self.unknown_array_2_count = 10
+
+        for i in range(self.unknown_count):
+            self.unknown_1 = 8
+            self.unknown_2 = 0
+            self.unknown_3 = 0
+            self.unknown_array_1 = [0.0 for _ in range(self.unknown_array_1_count)]
+            self.unknown_array_2 = [-1 for _ in range(self.unknown_array_2_count)]
+
+    def write(self, buffer, offset):
+        offset = write_uint32(buffer, offset, self.unknown_count)
+
+        for i in range(self.unknown_count):
+            offset = write_uint32(buffer, offset, self.unknown_1)
+            offset = write_uint32(buffer, offset, self.unknown_2)
+            offset = write_uint32(buffer, offset, self.unknown_3)
+
+            offset = write_uint32(buffer, offset, self.unknown_array_1_count)
+            for j in range(self.unknown_array_1_count):
+                offset = write_float(buffer, offset, self.unknown_array_1[j])
+
+            offset = write_uint32(buffer, offset, self.unknown_array_2_count)
+            for j in range(self.unknown_array_2_count):
+                offset = write_int32(buffer, offset, self.unknown_array_2[j])
+
+        return offset
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        struct_size = 4 # unknown_count size
+
+        for i in range(self.unknown_count):
+            struct_size += 20 # unknown_1 + unknown_2 + unknown_3 + unknown_array_1_count + unknown_array_2_count
+            struct_size += CONST_FLOAT_SIZE * self.unknown_array_1_count
+            struct_size += CONST_INT32_SIZE * self.unknown_array_2_count
+
+        return struct_size
+
+class UnknownSceneRootData1:
+    def __init__(self):
+        self.unknown_1 = 3
+        self.unknown_2 = 0
+        self.unknown_3 = 0
+        self.unknown_4 = 1
+        self.unknown_5 = 0
+        self.unknown_6 = 1
+        self.unknown_7 = 0
+        self.unknown_8 = 0
+        self.unknown_9 = 0
+        self.unknown_10 = 1
+        self.unknown_11 = 6
+        self.unknown_12 = 0
+        self.unknown_13 = 0
+        self.unknown_14 = 1
+        self.unknown_15 = 0
+        self.unknown_16 = 1
+        self.unknown_quaternion = Quaternion()
+
+    def write(self, buffer, offset):
+        quaternion = self.unknown_quaternion.vec4
+        return UNKNOWN_SCENE_ROOT_DATA_1_SCHEMA.write(
+            buffer, offset,
+            self.unknown_1, self.unknown_2, self.unknown_3, self.unknown_4,
+            self.unknown_5, self.unknown_6, self.unknown_7, self.unknown_8,
+            self.unknown_9, self.unknown_10, self.unknown_11, self.unknown_12,
+            self.unknown_13, self.unknown_14, self.unknown_15, self.unknown_16,
+            quaternion.x, quaternion.y, quaternion.z, quaternion.w,
+        )
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return UNKNOWN_SCENE_ROOT_DATA_1_SCHEMA.size()
+
+class Cas2Header:
+    CONST_CS2_FILE_TAG = CONST_CS2_FILE_TAG
+    CONST_EXPORTER_VERSION = "Unofficial Cas2 Exporter v1.0 by Mr.Jox aka victimized."
+    
+    def __init__(self, file_info):
+        self.unknown_1 = 0
+        self.unknown_2 = 1.16 # Unknown but looks like a file version
+        self.addon_details = Utf16String("Blender " + bpy.app.version_string + ". " + self.CONST_EXPORTER_VERSION)
+        self.file_details = Utf16String(file_info)
+
+    def header_size(self):
+        return self.size() - len(self.CONST_CS2_FILE_TAG) # everything after the file tag
+        
+    def write(self, buffer, offset):
+        offset = CAS2_HEADER_SCHEMA.write(buffer, offset, self.CONST_CS2_FILE_TAG, self.header_size(), self.unknown_1, self.unknown_2)
+        offset = self.addon_details.write(buffer, offset)
+        return self.file_details.write(buffer, offset)
+    
+    def read(self, file):
+        file_tag = file.read(4)
+        if file_tag != self.CONST_CS2_FILE_TAG:
+            print("Failed - The file i not a .CS2 file.")
+        else:
+            print("OK - The file is a .CS2 file.")
+
+    def size(self):
+        return CAS2_HEADER_SCHEMA.size() + self.addon_details.size() + self.file_details.size()
+
+class SceneInfoBlock:
+    def __init__(self):
+        self.unknown_1 = 1 # unknown but likely an array size
+        self.scene_object_types_count = 23 # total number of all scene object types (camera, line, etc)
+        self.unknown_2 = 0
+        self.cameras_count = 0
+        self.rigid_models_count = 0
+        self.unknown_3 = 0
+        self.unknown_4 = 0
+        self.weighted_models_count = 0
+        self.lines_count = 0
+        self.dummies_count = 0
+        self.materials_count = 0
+        self.unknown_5 = 0
+        self.unknown_6 = 0
+        self.instances_count = 0
+
+    def write(self, buffer, offset):
+        return SCENE_INFO_SCHEMA.write(
+            buffer, offset,
+            self.size(),
+            self.unknown_1,
+            self.scene_object_types_count,
+            self.unknown_2,
+            self.cameras_count,
+            self.rigid_models_count,
+            self.unknown_3,
+            self.unknown_4,
+            self.weighted_models_count,
+            self.lines_count,
+            self.dummies_count,
+            self.materials_count,
+            self.unknown_5,
+            self.unknown_6,
+            self.instances_count,
+        )
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return SCENE_INFO_SCHEMA.size() # block_size itself + unknown_1 + scene_object_types_count + 4 * scene_object_types_count
+
+class KeyFramesBlock1:
+    def __init__(self):
+        self.unknown_1 = 2 # No clue whatsoever
+        self.key_start = 0.0
+        self.key_end = 0.0
+
+        self.unknown_struct_1 = UnknownKeyFramesBlockStruct1()
+        self.unknown_struct_2 = UnknownKeyFramesBlockStruct2()
+
+        self.unknown_struct_1.fill_temp_data()
+        self.unknown_struct_2.fill_temp_data()
+
+    def write(self, buffer, offset):
+        offset = KEY_FRAMES_1_SCHEMA.write(buffer, offset, self.size(), self.unknown_1, self.key_start, self.key_end)
+        offset = self.unknown_struct_1.write(buffer, offset)
+        return self.unknown_struct_2.write(buffer, offset)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        block_size = KEY_FRAMES_1_SCHEMA.size() # block_size itself + unknown_1 + key_start + key_end
+        block_size += self.unknown_struct_1.size()
+        block_size += self.unknown_struct_2.size()
+        return block_size
+
+class KeyFramesBlock2:
+    def __init__(self):
+        self.unknown_1 = 22 # Unknown but always appears to be 22
+
+        self.unknown_struct_1 = UnknownKeyFramesBlockStruct3()
+        self.unknown_struct_1.fill_temp_data()
+
+    def write(self, buffer, offset):
+        offset = KEY_FRAMES_2_SCHEMA.write(buffer, offset, self.size(), self.unknown_1)
+        return self.unknown_struct_1.write(buffer, offset)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return KEY_FRAMES_2_SCHEMA.size() + self.unknown_struct_1.size() # block_size + unknown_1 + unknown_struct_1
+
+class SubMesh:
+    def __init__(self, material_index, triangles):
+        self.triangles = triangles # (triangles, 3) array of MESH_TRIANGLE_DTYPE
+        self.materialId = material_index
+
+    def write(self, buffer, offset):
+        offset = write_uint32(buffer, offset, len(self.triangles))
+        offset = write_array(buffer, offset, self.triangles)
+        return write_int32(buffer, offset, self.materialId)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return CONST_UINT32_SIZE + self.triangles.nbytes + CONST_INT32_SIZE # len(triangles) + triangles + materialId
+
+class BoundingBox:
+    def __init__(self, obj):
+        self.min_x = CONST_FLOAT_MAX
+        self.min_y = CONST_FLOAT_MAX
+        self.min_z = CONST_FLOAT_MAX
+        self.max_x = CONST_FLOAT_MIN
+        self.max_y = CONST_FLOAT_MIN
+        self.max_z = CONST_FLOAT_MIN
+
+        for corner in obj.bound_box:
+            if self.min_x > corner[0]:
+                self.min_x = corner[0]
+
+            if self.min_y > corner[1]:
+                self.min_y = corner[1]
+
+            if self.min_z > corner[2]:
+                self.min_z = corner[2]
+
+            if self.max_x < corner[0]:
+                self.max_x = corner[0]
+
+            if self.max_y < corner[1]:
+                self.max_y = corner[1]
+
+            if self.max_z < corner[2]:
+                self.max_z = corner[2]
+
+    def write(self, buffer, offset):
+        return BOUNDING_BOX_SCHEMA.write(buffer, offset, self.min_x, self.min_z, self.min_y, self.max_x, self.max_z, self.max_y)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return BOUNDING_BOX_SCHEMA.size()
+
+class GeometryDataHeader:
+    def __init__(self, obj):
+        self.unknown_1 = 11
+        self.unknown_2 = 0
+        self.unknown_3 = 0
+        self.unknown_float_array = [0.0]
+        self.bounding_box_array = [BoundingBox(obj)]
+        self.geometry_data_type = GeometryDataType.UNSET
+
+    def write_without_type(self, buffer, offset):
+        # Instance geometry data has the same header, without the geometry data type
+        offset = GEOMETRY_DATA_HEADER_SCHEMA.write(buffer, offset, self.unknown_1, self.unknown_2, self.unknown_3)
+
+        offset = write_uint32(buffer, offset, len(self.unknown_float_array))
+        for value in self.unknown_float_array:
+            offset = write_float(buffer, offset, value)
+
+        offset = write_uint32(buffer, offset, len(self.bounding_box_array))
+        for bbox in self.bounding_box_array:
+            offset = bbox.write(buffer, offset)
+
+        return offset
+
+    def write(self, buffer, offset):
+        offset = self.write_without_type(buffer, offset)
+        return write_int32(buffer, offset, self.geometry_data_type.value)
+
+    def read(self, file):
+        pass
+
+    def size_without_type(self):
+        block_size = GEOMETRY_DATA_HEADER_SCHEMA.size() # unknown_1 + unknown_2 + unknown_3
+        block_size += 4 + len(self.unknown_float_array) * CONST_FLOAT_SIZE
+        block_size += 4 + sum(bbox.size() for bbox in self.bounding_box_array)
+        return block_size
+
+    def size(self):
+        return self.size_without_type() + 4 # GeometryDataType
+
+class GeometryDataMesh:
+    def __init__(self, obj, settings, lod_mesh = None, first_bone_indices = None):
+        self.header = GeometryDataHeader(obj)
+        self.header.geometry_data_type = GeometryDataType.MESH
+        self.weighted = is_weighted_model(obj)
+
+        self.uv_channels = {}
+        for index, uv_layer in enumerate(obj.data.uv_layers):
+            self.uv_channels[uv_layer.name] = index
+
+        if settings.export_tangents and len(self.uv_channels) > 0:
+            self.uv_channels[CONST_TANGENT_CHANNEL] = len(self.uv_channels)
+            self.uv_channels[CONST_BITANGENT_CHANNEL] = len(self.uv_channels)
+
+        self.vertices = None # structured array of vertex_data_rigid_dtype(len(uv_channels)) or vertex_data_weighted_dtype
+        self.vertex_data = None # vertices as written, weighted vertices only keep the bone weights they use
+        self.processed_counts = ProcessedMesh().counts()
+        self.sub_meshes = []
+        self.materials_count = len(obj.data.materials)
+        self.mesh_arrays = None # extracted arrays, released once processed
+        fill_mesh_data(self, obj, self.weighted, settings, lod_mesh, first_bone_indices)
+        self.unknown_related_to_vertex_colors = 0
+
+    def apply_processed_mesh(self, processed):
+        self.vertices = processed.vertices
+        self.vertex_data = encode_weighted_vertices(processed.vertices) if self.weighted else processed.vertices
+        self.processed_counts = processed.counts()
+        self.sub_meshes = [SubMesh(material_index, triangles) for material_index, triangles in processed.sub_meshes]
+        self.mesh_arrays = None
+    
+    def stripped_bytes(self):
+        degenerate_triangles_count = self.processed_counts["degenerate_triangles_count"]
+        unused_vertices_count = self.processed_counts["unused_vertices_count"]
+        return degenerate_triangles_count * 3 * CONST_UINT32_SIZE + unused_vertices_count * self.vertices.dtype.itemsize
+
+    def write(self, buffer, offset):
+        offset = self.header.write(buffer, offset)
+
+        offset = write_uint32(buffer, offset, len(self.uv_channels))
+        for uv_layer in self.uv_channels:
+            offset = write_uint32(buffer, offset, self.uv_channels[uv_layer])
+
+        offset = write_uint32(buffer, offset, len(self.vertices))
+        offset = write_array(buffer, offset, self.vertex_data)
+
+        offset = write_uint32(buffer, offset, len(self.sub_meshes))
+        for submesh in self.sub_meshes:
+            offset = submesh.write(buffer, offset)
+
+        return write_uint32(buffer, offset, self.unknown_related_to_vertex_colors)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        block_size = self.header.size()
+        block_size += CONST_UINT32_SIZE + CONST_UINT32_SIZE + CONST_UINT32_SIZE + CONST_UINT32_SIZE # len(uv_channels) + len(vertices) + len(sub_meshes) + unknown_related_to_vertex_colors
+        block_size += len(self.uv_channels) * CONST_UINT32_SIZE
+        block_size += self.vertex_data.nbytes
+        block_size += sum(submesh.size() for submesh in self.sub_meshes)
+        return block_size
+
+class GeometryDataLine:
+    def __init__(self, obj):
+        self.header = GeometryDataHeader(obj)
+        self.header.geometry_data_type = GeometryDataType.LINE # read by the game as the number of lines, always one
+        self.vertices, self.segments = extract_line_arrays(obj) # (vertices, 3) float32 in file axes, (segments, 2) uint32
+        self.unknown = 0
+
+    def write(self, buffer, offset):
+        offset = self.header.write(buffer, offset)
+
+        for array in (self.vertices, self.segments):
+            offset = write_uint32(buffer, offset, len(array))
+            offset = write_array(buffer, offset, array)
+
+        return write_int32(buffer, offset, self.unknown)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        block_size = self.header.size()
+        block_size += CONST_UINT32_SIZE + self.vertices.nbytes
+        block_size += CONST_UINT32_SIZE + self.segments.nbytes
+        block_size += CONST_INT32_SIZE # unknown
+        return block_size
+
+class GeometryDataInstance:
+    def __init__(self, obj, original_node_index, material_id = None):
+        self.header = GeometryDataHeader(obj)
+        self.original_node_index = original_node_index
+        self.unknown_1 = 0
+        self.unknown_2 = 0
+        self.material_id = material_id # None keeps the materials of the original
+
+    def write(self, buffer, offset):
+        offset = self.header.write_without_type(buffer, offset)
+
+        if self.material_id is None:
+            return INSTANCE_GEOMETRY_SCHEMA.write(buffer, offset, self.original_node_index, self.unknown_1)
+
+        return INSTANCE_OVERRIDE_GEOMETRY_SCHEMA.write(buffer, offset, self.original_node_index, self.unknown_1, self.unknown_2, self.material_id)
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        schema = INSTANCE_GEOMETRY_SCHEMA if self.material_id is None else INSTANCE_OVERRIDE_GEOMETRY_SCHEMA
+        return self.header.size_without_type() + schema.size()
+
+class ModelNode:
+    # Weighted models need the first_bone_indices of find_first_bone_indices
+    def __init__(self, obj, settings, first_bone_indices = None):
+        self.node_type = obj_to_node_type(obj)
+        self.node_name = Utf16String(obj.name)
+        self.unknown_string = Utf16String() # Always empty?
+        self.user_defined_properties = Utf16String(build_properties(obj))
+        self.node_index = 0
+        with phase("attributes"):
+            self.attributes = NodeAttributes(obj)
+        self.dropped_lods_count = 0 # LODs left out because decimation moved material boundaries or uv seams
+
+        if self.node_type == NodeType.LINE:
+            with phase("lines"):
+                self.geometry_data = [GeometryDataLine(obj)]
+            return
+
+        self.geometry_data = [GeometryDataMesh(obj, settings, None, first_bone_indices)]
+
+        if len(settings.lod_ratios) > 0:
+            with phase("decimate"):
+                lod_meshes = build_lod_meshes(obj, settings.lod_ratios)
+                self.dropped_lods_count = len(settings.lod_ratios) - len(lod_meshes)
+
+            # Removed even when one of them fails to extract or process, none is left behind in bpy.data.meshes
+            try:
+                for lod_mesh in lod_meshes:
+                    self.geometry_data.append(GeometryDataMesh(obj, settings, lod_mesh, first_bone_indices))
+            finally:
+                for lod_mesh in lod_meshes:
+                    bpy.data.meshes.remove(lod_mesh)
+
+    def counts(self):
+        # Totals reported by ExportStats, stored along with cached nodes. Lines count for none of them.
+        meshes = [geometry for geometry in self.geometry_data if isinstance(geometry, GeometryDataMesh)]
+        counts = {
+            "vertices_count": sum(len(geometry.vertices) for geometry in meshes),
+            "triangles_count": sum(len(submesh.triangles) for geometry in meshes for submesh in geometry.sub_meshes),
+            "stripped_bytes": sum(geometry.stripped_bytes() for geometry in meshes),
+            "sub_meshes_count": sum(len(geometry.sub_meshes) for geometry in meshes),
+            "dropped_lods_count": self.dropped_lods_count,
+        }
+
+        for name in ProcessedMesh.CONST_COUNT_NAMES:
+            counts[name] = sum(geometry.processed_counts[name] for geometry in meshes)
+
+        return counts
+
+    def write(self, buffer, offset):
+        offset = NODE_HEADER_SCHEMA.write(buffer, offset, self.size(), self.node_type.value)
+        offset = self.node_name.write(buffer, offset)
+        offset = self.unknown_string.write(buffer, offset)
+        offset = self.user_defined_properties.write(buffer, offset)
+        offset = write_uint32(buffer, offset, self.node_index)
+        offset = self.attributes.write(buffer, offset)
+
+        offset = write_uint32(buffer, offset, len(self.geometry_data))
+        for geometry in self.geometry_data:
+            offset = geometry.write(buffer, offset)
+
+        return offset
+
+    def read(self, file):
+        pass
+    
+    def size(self):
+        block_size = NODE_HEADER_SCHEMA.size() # block_size + node_type
+        block_size += self.node_name.size()
+        block_size += self.unknown_string.size()
+        block_size += self.user_defined_properties.size()
+        block_size += 4 # node_index
+        block_size += self.attributes.size()
+        block_size += 4 # len(geometry_data)
+        block_size += sum(geometry.size() for geometry in self.geometry_data)
+        return block_size
+
+class EncodedModelNode:
+    # A model node that is already encoded, read from the model cache or about to be stored in it
+    def __init__(self, name, data, counts):
+        self.node_name = Utf16String(name)
+        self.data = data
+        self.model_counts = counts
+
+        # The node index depends on the other exported objects, it is patched in when the node is written
+        offset = NODE_HEADER_SCHEMA.size()
+        for i in range(3): # node name, unknown string, user defined properties
+            offset += CONST_UINT16_SIZE + UINT16_SCHEMA.read(data, offset)["value"] * 2
+
+        self.node_index_offset = offset
+        self.node_index = UINT32_SCHEMA.read(data, offset)["value"]
+
+    @staticmethod
+    def from_model(model):
+        return EncodedModelNode(model.node_name.string, encode_blocks([model]), model.counts())
+
+    @staticmethod
+    def from_cache_entry(name, entry):
+        # Returns None for entries that do not hold exactly one node
+        header_size = MODEL_CACHE_ENTRY_SCHEMA.size()
+        if len(entry) < header_size + NODE_HEADER_SCHEMA.size():
+            return None
+
+        data = memoryview(entry)[header_size:]
+        if NODE_HEADER_SCHEMA.read(data, 0)["block_size"] != len(data):
+            return None
+
+        return EncodedModelNode(name, data, MODEL_CACHE_ENTRY_SCHEMA.read(entry, 0))
+
+    def cache_entry(self):
+        header = bytearray(MODEL_CACHE_ENTRY_SCHEMA.size())
+        MODEL_CACHE_ENTRY_SCHEMA.write(header, 0, *(self.model_counts[name] for name, _ in MODEL_CACHE_ENTRY_SCHEMA.fields))
+        return header + self.data
+
+    def counts(self):
+        return self.model_counts
+
+    def write(self, buffer, offset):
+        end = write_bytes(buffer, offset, self.data)
+        write_uint32(buffer, offset + self.node_index_offset, self.node_index)
+        return end
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        return len(self.data)
+
+class InstanceNode:
+    def __init__(self, obj, original_node_index, material_id = None):
+        self.node_type = NodeType.INSTANCE_NO_MATERIAL if material_id is None else NodeType.INSTANCE_OVERRIDE_MATERIAL
+        self.unknown_1 = 0
+        self.node_name = Utf16String(obj.name)
+        self.unknown_string = Utf16String()
+        self.user_defined_properties = Utf16String(build_properties(obj))
+        self.node_index = 0
+        self.attributes = NodeAttributes(obj)
+        self.geometry_data = [GeometryDataInstance(obj, original_node_index, material_id)]
+
+    def write(self, buffer, offset):
+        offset = NODE_HEADER_SCHEMA.write(buffer, offset, self.size(), self.node_type.value)
+        offset = write_uint32(buffer, offset, self.unknown_1)
+        offset = self.node_name.write(buffer, offset)
+        offset = self.unknown_string.write(buffer, offset)
+        offset = self.user_defined_properties.write(buffer, offset)
+        offset = write_uint32(buffer, offset, self.node_index)
+        offset = self.attributes.write(buffer, offset)
+
+        offset = write_uint32(buffer, offset, len(self.geometry_data))
+        for geometry in self.geometry_data:
+            offset = geometry.write(buffer, offset)
+
+        return offset
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        block_size = NODE_HEADER_SCHEMA.size() # block_size + node_type
+        block_size += 4 # unknown_1
+        block_size += self.node_name.size()
+        block_size += self.unknown_string.size()
+        block_size += self.user_defined_properties.size()
+        block_size += 4 # node_index
+        block_size += self.attributes.size()
+        block_size += 4 # len(geometry_data)
+        block_size += sum(geometry.size() for geometry in self.geometry_data)
+        return block_size
+
+class AnimData:
+    def __init__(self):
+        self.translation_times = np.zeros(0, dtype=ANIM_TIME_DTYPE)
+        self.translations = np.zeros(0, dtype=ANIM_TRANSLATION_DTYPE) # (keys, 3) in file axes
+        self.rotation_times = np.zeros(0, dtype=ANIM_TIME_DTYPE)
+        self.rotations = np.zeros(0, dtype=ANIM_ROTATION_DTYPE) # (keys, 4) quaternions x, y, z, w in file axes
+
+    def set_transform(self, translation, rotation):
+        # A single key of each, for nodes that do not move
+        self.translation_times = np.zeros(1, dtype=ANIM_TIME_DTYPE)
+        self.translations = np.array([translation], dtype=ANIM_TRANSLATION_DTYPE.base)
+        self.rotation_times = np.zeros(1, dtype=ANIM_TIME_DTYPE)
+        self.rotations = np.array([rotation], dtype=ANIM_ROTATION_DTYPE.base)
+
+    def set_keys(self, translation_times, translations, rotation_times, rotations):
+        self.translation_times = np.ascontiguousarray(translation_times, dtype=ANIM_TIME_DTYPE)
+        self.translations = np.ascontiguousarray(translations, dtype=ANIM_TRANSLATION_DTYPE.base)
+        self.rotation_times = np.ascontiguousarray(rotation_times, dtype=ANIM_TIME_DTYPE)
+        self.rotations = np.ascontiguousarray(rotations, dtype=ANIM_ROTATION_DTYPE.base)
+
+    def keys_count(self):
+        return len(self.translation_times) + len(self.rotation_times)
+
+    def write(self, buffer, offset):
+        for array in (self.translation_times, self.translations):
+            offset = write_uint32(buffer, offset, len(array))
+            offset = write_array(buffer, offset, array)
+
+        offset = ANIM_DATA_UNKNOWN_SCHEMA.write(buffer, offset)
+
+        for array in (self.rotation_times, self.rotations):
+            offset = write_uint32(buffer, offset, len(array))
+            offset = write_array(buffer, offset, array)
+
+        return offset
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        block_size = 4 * CONST_UINT32_SIZE # len() of every array
+        block_size += self.translation_times.nbytes + self.translations.nbytes
+        block_size += ANIM_DATA_UNKNOWN_SCHEMA.size()
+        block_size += self.rotation_times.nbytes + self.rotations.nbytes
+        return block_size
+
+class SceneNode:
+    def __init__(self, name, anim_data, parent_index = 0):
+        self.node_name = Utf16String(name)
+        self.parent_index = parent_index # 0 places the node in world space below the scene root
+        self.anim_data = anim_data
+        self.unknown_value = 0
+        self.unknown_name = Utf16String()
+        self.attributes = NodeAttributes()
+
+    def write(self, buffer, offset):
+        offset = self.node_name.write(buffer, offset)
+        offset = SCENE_NODE_HEADER_SCHEMA.write(buffer, offset, self.parent_index)
+        offset = self.anim_data.write(buffer, offset)
+        offset = SCENE_NODE_FOOTER_SCHEMA.write(buffer, offset, self.unknown_value)
+        offset = self.unknown_name.write(buffer, offset)
+        return self.attributes.write(buffer, offset)
+
+    def read(self, file):
+        pass
+    
+    def size(self):
+        block_size = self.node_name.size()
+        block_size += SCENE_NODE_HEADER_SCHEMA.size() # parent_index + unknown data
+        block_size += self.anim_data.size()
+        block_size += SCENE_NODE_FOOTER_SCHEMA.size() # unknown_value
+        block_size += self.unknown_name.size()
+        block_size += self.attributes.size()
+        return block_size
+
+class SceneRootBlock:
+    def __init__(self, file_info, scene_nodes = ()):
+        self.node_type = NodeType.SCENE_ROOT
+        self.scene_nodes = list(scene_nodes) # one per exported node, in node index order
+        self.nodes_count = len(self.scene_nodes) + 1 if len(self.scene_nodes) > 0 else 0 # the root counts itself
+        self.node_name = Utf16String("Exporter Inserted Root")
+        self.unknown_1 = -1
+        self.unknown_2 = 1
+        self.unknown_data_1 = UnknownSceneRootData1()
+        self.unknown_3 = 0
+        self.file_info = Utf16String(file_info)
+        self.unknown_4 = 0
+        self.unknown_5 = 0
+        self.unknown_6 = 0
+        self.unknown_7 = 0
+        self.unknown_8 = 0
+
+    def write(self, buffer, offset):
+        offset = SCENE_ROOT_HEADER_SCHEMA.write(buffer, offset, self.size(), self.node_type.value, self.nodes_count)
+        offset = self.node_name.write(buffer, offset)
+        offset = SCENE_ROOT_DATA_SCHEMA.write(buffer, offset, self.unknown_1, self.unknown_2)
+        offset = self.unknown_data_1.write(buffer, offset)
+        offset = write_uint32(buffer, offset, self.unknown_3)
+        offset = self.file_info.write(buffer, offset)
+        offset = SCENE_ROOT_FOOTER_SCHEMA.write(buffer, offset, self.unknown_4, self.unknown_5, self.unknown_6, self.unknown_7, self.unknown_8)
+
+        for scene_node in self.scene_nodes:
+            offset = scene_node.write(buffer, offset)
+
+        return offset
+
+    def read(self, file):
+        pass
+
+    def size(self):
+        block_size = SCENE_ROOT_HEADER_SCHEMA.size() # block_size + node_type + nodes_count
+        block_size += self.node_name.size()
+        block_size += SCENE_ROOT_DATA_SCHEMA.size() # unknown_1 + unknown_2
+        block_size += self.unknown_data_1.size() + CONST_UINT32_SIZE # unknown_data_1 + unknown_3
+        block_size += self.file_info.size()
+        block_size += SCENE_ROOT_FOOTER_SCHEMA.size() # unknown_4 ... unknown_8
+        block_size += sum(scene_node.size() for scene_node in self.scene_nodes)
+        return block_size
+
+class ExportStats:
+    def __init__(self):
+        self.block_sizes = []
+        self.models_count = 0
+        self.instances_count = 0
+        self.bones_count = 0
+        self.sampled_keys_count = 0 # translation and rotation keys of the animated scene nodes, before and after reduction
+        self.animation_keys_count = 0
+        self.unwelded_vertices_count = 0
+        self.vertices_count = 0
+        self.triangles_count = 0
+        self.cache_misses_before = 0
+        self.cache_misses_after = 0
+        self.degenerate_triangles_count = 0
+        self.unused_vertices_count = 0
+        self.stripped_bytes = [] # (model name, bytes) of the models that had unused geometry
+        self.dropped_lods = [] # (model name, LODs count) of the models written without some of their LODs
+
+    def add_block(self, block):
+        size = block.size()
+
+        if isinstance(block, (ModelNode, EncodedModelNode)):
+            self.block_sizes.append((block.node_name.string, size))
+            self.models_count += 1
+
+            counts = block.counts()
+            record_block(block_type_name(block), size, block.node_name.string, counts)
+            self.unwelded_vertices_count += counts["unwelded_vertices_count"]
+            self.vertices_count += counts["vertices_count"]
+            self.triangles_count += counts["triangles_count"]
+            self.cache_misses_before += counts["cache_misses_before"]
+            self.cache_misses_after += counts["cache_misses_after"]
+            self.degenerate_triangles_count += counts["degenerate_triangles_count"]
+            self.unused_vertices_count += counts["unused_vertices_count"]
+            if counts["stripped_bytes"] > 0:
+                self.stripped_bytes.append((block.node_name.string, counts["stripped_bytes"]))
+            if counts["dropped_lods_count"] > 0:
+                self.dropped_lods.append((block.node_name.string, counts["dropped_lods_count"]))
+        elif isinstance(block, InstanceNode):
+            self.block_sizes.append((block.node_name.string, size))
+            self.instances_count += 1
+            record_block(block_type_name(block), size, block.node_name.string)
+        else:
+            self.block_sizes.append((type(block).__name__, size))
+            record_block(block_type_name(block), size)
+
+    def file_size(self):
+        return sum(size for _, size in self.block_sizes)
+
+def check_lod_ratios(ratios):
+    previous_ratio = 1.0
+    for ratio in ratios:
+        if not 0.0 < ratio < previous_ratio:
+            raise ValueError(f"LOD ratio {ratio} is not between 0 and {previous_ratio}, ratios must decrease")
+
+        previous_ratio = ratio
+
+    return ratios
+
+def parse_lod_ratios(text):
+    try:
+        ratios = [float(value) for value in text.replace(",", " ").split()]
+    except ValueError:
+        raise ValueError(f"LOD ratios \"{text}\" are not a list of numbers")
+
+    return check_lod_ratios(ratios)
+
+def write_uint32(buffer, offset, value):
+    return UINT32_SCHEMA.write(buffer, offset, value)
+
+def write_int32(buffer, offset, value):
+    return INT32_SCHEMA.write(buffer, offset, value)
+
+def write_float(buffer, offset, value):
+    return FLOAT_SCHEMA.write(buffer, offset, value)
+
+def write_bytes(buffer, offset, data):
+    end = offset + len(data)
+    buffer[offset:end] = data
+    return end
+
+def write_array(buffer, offset, array):
+    if array.nbytes > 0:
+        np.frombuffer(buffer, dtype=np.uint8, count=array.nbytes, offset=offset)[:] = array.view(np.uint8).reshape(-1)
+
+    return offset + array.nbytes
+
+def export_cas2(filepath, objects, settings, streaming = True, dry_run = False, cache = None):
+    # Exports the rigid models among objects, returns the ExportStats of the written blocks
+    with phase("find_objects"):
+        rigid_objects = find_rigid_objects(objects)
+
+        if settings.export_instances:
+            model_objects, instances = find_instances(rigid_objects)
+        else:
+            model_objects, instances = rigid_objects, []
+
+        # Weighted models follow the rigid ones, lines come last
+        model_objects += find_weighted_objects(objects)
+        model_objects += find_line_objects(objects)
+        first_bone_indices = find_first_bone_indices(model_objects, instances)
+
+    if settings.encode_processes > 0:
+        models = iter_models_in_pool(model_objects, settings, first_bone_indices, cache)
+    else:
+        models = iter_models(model_objects, settings, first_bone_indices, cache)
+
+    return write_cas2(filepath, model_objects, models, settings, first_bone_indices, instances, streaming, dry_run)
+
+def write_cas2(filepath, model_objects, models, settings, first_bone_indices, instances = (), streaming = True, dry_run = False):
+    # Writes a file around the model nodes of model_objects yielded by models, which may be built lazily,
+    # and the (object, original object, material id) instances of find_instances. Rigid models come first.
+    # The scene root numbers the bones with the first_bone_indices the weighted models were built with.
+    file_info = build_file_info(filepath)
+
+    # Node indices follow the scene nodes: models first, then instances, then the bones of the weighted models
+    node_objects = list(model_objects) + [obj for obj, _, _ in instances]
+    node_indices = {obj.name: node_index for node_index, obj in enumerate(node_objects, 1)}
+    armatures = find_armatures(model_objects)
+    with phase("scene_nodes"):
+        scene_nodes, sampled_anim_data, frames_count, length = build_scene_nodes(bpy.context.scene, node_objects, armatures, first_bone_indices, settings)
+
+    header = Cas2Header(file_info)
+    scene_info = SceneInfoBlock()
+    key_frames_1_info = KeyFramesBlock1()
+    key_frames_1_info.key_end = length
+    key_frames_2_info = KeyFramesBlock2()
+    scene_root = SceneRootBlock(file_info, scene_nodes)
+
+    # Counts are known before any model is built, so models can be created lazily
+    scene_info.weighted_models_count = sum(1 for obj in model_objects if is_weighted_model(obj))
+    scene_info.lines_count = sum(1 for obj in model_objects if is_line_model(obj))
+    scene_info.rigid_models_count = len(model_objects) - scene_info.weighted_models_count - scene_info.lines_count
+    scene_info.instances_count = len(instances)
+
+    instance_nodes = iter_instance_nodes(instances, node_indices)
+
+    blocks = itertools.chain(
+        [header, scene_info, key_frames_1_info, key_frames_2_info],
+        number_nodes(models, 1),
+        [scene_root],
+        number_nodes(instance_nodes, len(model_objects) + 1),
+    )
+    stats = ExportStats()
+    stats.bones_count = len(scene_nodes) - len(node_objects)
+    stats.sampled_keys_count = 2 * frames_count * len(sampled_anim_data)
+    stats.animation_keys_count = sum(anim_data.keys_count() for anim_data in sampled_anim_data)
+
+    # A dry run writes nothing, not even the index
+    index = Cas2Index() if settings.write_index and not dry_run else None
+
+    if dry_run:
+        for block in blocks:
+            stats.add_block(block)
+            del block
+    elif streaming:
+        # Written next to the target first, a failed export must not leave a truncated file behind
+        partial_filepath = filepath + ".partial"
+        try:
+            with open(partial_filepath, 'wb') as file:
+                stream_blocks(file, blocks, stats, index)
+        except BaseException:
+            os.remove(partial_filepath)
+            raise
+
+        os.replace(partial_filepath, filepath)
+    else:
+        blocks = list(blocks)
+        for block in blocks:
+            stats.add_block(block)
+
+        with phase("encode"):
+            buffer = encode_blocks(blocks)
+
+        if index is not None:
+            # Offsets follow from the block sizes counted above
+            offset = 0
+            for block, (_, size) in zip(blocks, stats.block_sizes):
+                with phase("index", block_node_name(block)):
+                    add_index_entry(index, block, memoryview(buffer)[offset:offset + size])
+
+                offset += size
+
+        with phase("write"), open(filepath, 'wb') as file:
+            file.write(buffer)
+
+    if index is not None:
+        with phase("write_index"):
+            index.write(index_filepath(filepath))
+
+    return stats
+
+def iter_instance_nodes(instances, node_indices):
+    for obj, original, material_id in instances:
+        with phase("build", obj.name):
+            instance_node = InstanceNode(obj, node_indices[original.name], material_id)
+
+        yield instance_node
+
+def number_nodes(nodes, first_node_index):
+    for node_index, node in enumerate(nodes, first_node_index):
+        node.node_index = node_index
+        yield node
+
+def stream_blocks(file, blocks, stats, index = None):
+    # Only one block is alive at a time, the loop variable is dropped before the next model is built
+    for block in blocks:
+        stats.add_block(block)
+        node_name = block_node_name(block)
+
+        with phase("encode", node_name):
+            data = encode_blocks([block])
+
+        if index is not None:
+            with phase("index", node_name):
+                add_index_entry(index, block, data)
+
+        with phase("write", node_name):
+            file.write(data)
+
+        del block, data
+
+def add_index_entry(index, block, data):
+    # Every block moves the offset, only the nodes get an entry
+    if isinstance(block, (ModelNode, EncodedModelNode)):
+        index.add_node(block.node_name.string, block_type_name(block), data, block.counts())
+    elif isinstance(block, (InstanceNode, SceneRootBlock)):
+        index.add_node(block.node_name.string, block.node_type.name, data)
+    else:
+        index.skip(len(data))
+
+def block_node_name(block):
+    # Name of the model and instance nodes, None for the other blocks
+    if isinstance(block, (ModelNode, EncodedModelNode, InstanceNode)):
+        return block.node_name.string
+
+    return None
+
+def block_type_name(block):
+    # Node type of the nodes, class name of the other blocks
+    if isinstance(block, EncodedModelNode):
+        return NodeType(NODE_HEADER_SCHEMA.read(block.data, 0)["node_type"]).name
+
+    if isinstance(block, (ModelNode, InstanceNode)):
+        return block.node_type.name
+
+    return type(block).__name__
+
+def encode_blocks(blocks):
+    # Sizing pass first, so the whole file is a single allocation filled at known offsets
+    file_size = sum(block.size() for block in blocks)
+    buffer = bytearray(file_size)
+
+    offset = 0
+    for block in blocks:
+        offset = block.write(buffer, offset)
+
+    assert offset == file_size, f"Encoded {offset} bytes, expected {file_size}."
+    return buffer
+
+def property_value_to_string(value):
+    if isinstance(value, (int, float, bool)):
+        return str(value)
+    elif isinstance(value, str):
+        return value
+    else:
+        if len(value) == 1:
+            return str(value[0])
+        elif len(value) == 2:
+            return str(f"x:\"{value[0]}\" y:\"{value[1]}\"")
+        elif len(value) == 3:
+            return str(f"x:\"{value[0]}\" y:\"{value[1]}\" z:\"{value[2]}\"")
+        elif len(value) == 4:
+            return str(f"x:\"{value[0]}\" y:\"{value[1]}\" z:\"{value[2]}\" w:\"{value[3]}\"")
+    
+    return str(value)
+
+def build_properties(obj):
+    if obj.data is None:
+        return ""
+
+    properties = ""
+
+    for prop_name, prop_value in obj.items():
+        if prop_name.startswith(CONST_OBJECT_PROPERTY_PREFIX):
+            properties += prop_name[len(CONST_OBJECT_PROPERTY_PREFIX):] + " = " + property_value_to_string(prop_value) + "\n"
+
+    return properties
+
+def build_file_info(filepath):
+    blend_file_name = bpy.data.filepath
+    if not blend_file_name:
+        blend_file_name = "unsaved"
+    
+    info_username = "USERNAME:\t" + getpass.getuser() # os.getlogin() fails without a controlling terminal
+    info_export_data = "EXPORTED:\t" + datetime.now().strftime('%d/%m/%Y,%H:%M:%S')
+    info_cas_name = "CAS_NAME:\t" + filepath
+    info_blend_file = "BLEND_FILE:\t" + blend_file_name
+    return info_username + "\n" + info_export_data + "\n" + info_cas_name + "\n" + info_blend_file
+
+def build_empty_attributes():
+    return {
+        CONST_ATTRIBUTES_STRING: [],
+        CONST_ATTRIBUTES_INT: [],
+        CONST_ATTRIBUTES_FLOAT: [],
+        CONST_ATTRIBUTES_VEC3: [],
+        CONST_ATTRIBUTES_VEC4: [],
+    }
+
+def build_attributes(obj):
+    if obj.data is None:
+        return {}
+
+    attributes = build_empty_attributes()
+
+    for prop_name, prop_value in obj.items():
+        if prop_name.startswith(CONST_OBJECT_ATTRIBUTE_PREFIX) == False:
+            continue
+
+        attribute_name = prop_name[len(CONST_OBJECT_ATTRIBUTE_PREFIX):]
+
+        if isinstance(prop_value, bool):
+            int_value = 1 if prop_value == True else 0
+            attributes[CONST_ATTRIBUTES_INT].append(IntAttribute(attribute_name, int_value))
+        elif isinstance(prop_value, int):
+            attributes[CONST_ATTRIBUTES_INT].append(IntAttribute(attribute_name, prop_value))
+        elif isinstance(prop_value, float):
+            attributes[CONST_ATTRIBUTES_FLOAT].append(FloatAttribute(attribute_name, prop_value))
+        elif isinstance(prop_value, str):
+            attributes[CONST_ATTRIBUTES_STRING].append(StringAttribute(attribute_name, prop_value))
+        elif len(prop_value) == 3:
+            attributes[CONST_ATTRIBUTES_VEC3].append(Vec3Attribute(attribute_name, Vec3(prop_value[0], prop_value[1], prop_value[2])))
+        elif len(prop_value) == 4:
+            attributes[CONST_ATTRIBUTES_VEC4].append(Vec4Attribute(attribute_name, Vec4(prop_value[0], prop_value[1], prop_value[2], prop_value[3])))
+
+    return attributes
+
+def find_armature(obj):
+    for mod in obj.modifiers:
+        if mod.type == 'ARMATURE' and mod.object:
+            return mod.object
+
+    return None
+
+def is_weighted_model(obj):
+    if obj.type != 'MESH':
+        return False
+
+    return find_armature(obj) is not None
+
+def is_rigid_model(obj):
+    if obj.type != 'MESH':
+        return False
+
+    return find_armature(obj) is None and not is_line_model(obj)
+
+def is_line_model(obj):
+    # Curves that are not beveled or extruded into a surface, and meshes made of edges only
+    if obj.type == 'CURVE':
+        curve = obj.data
+        return curve.bevel_depth == 0.0 and curve.extrude == 0.0 and (curve.bevel_mode != 'OBJECT' or curve.bevel_object is None)
+
+    if obj.type == 'MESH':
+        mesh = obj.data
+        return len(mesh.polygons) == 0 and len(mesh.edges) > 0 and find_armature(obj) is None
+
+    return False
+
+def find_rigid_objects(objects):
+    return [obj for obj in objects if is_rigid_model(obj)]
+
+def find_weighted_objects(objects):
+    return [obj for obj in objects if is_weighted_model(obj)]
+
+def find_line_objects(objects):
+    return [obj for obj in objects if is_line_model(obj)]
+
+def find_instances(objects):
+    # Objects sharing a mesh share its geometry, modifiers are never applied. Only the first of them is
+    # exported as a model, the others become instances of it: returns the model objects and a list of
+    # (instance object, original object, material id), the material id is None unless it overrides the original's.
+    model_objects = []
+    instances = []
+    originals = {} # mesh -> [(original object, its materials)]
+
+    for obj in objects:
+        materials = [slot.material for slot in obj.material_slots]
+        mesh_originals = originals.setdefault(obj.data, [])
+
+        for original, original_materials in mesh_originals:
+            if materials == original_materials:
+                instances.append((obj, original, None))
+                break
+
+            material_id = find_override_material_id(materials, original_materials)
+            if material_id is not None:
+                instances.append((obj, original, material_id))
+                break
+        else:
+            # Differing materials the format cannot override, such as several object linked ones, need their own model
+            mesh_originals.append((obj, materials))
+            model_objects.append(obj)
+
+    return model_objects, instances
+
+def find_override_material_id(materials, original_materials):
+    # An override replaces every material of the original by a single one of its materials, returns that slot index
+    if len(materials) == 0 or materials[0] is None or any(material != materials[0] for material in materials):
+        return None
+
+    if materials[0] not in original_materials:
+        return None
+
+    return original_materials.index(materials[0])
+
+def matrix_to_file_transform(matrix):
+    # Returns the translation and the x, y, z, w rotation quaternion, the format has no scale
+    translation, rotation, _ = matrix.decompose()
+
+    # Swap Y and Z axes, the mirrored rotation turns the other way round
+    return (translation.x, translation.z, translation.y), (-rotation.x, -rotation.z, -rotation.y, rotation.w)
+
+def find_armatures(objects):
+    # Armatures of the weighted models among objects, each once in the order they are first used
+    armatures = []
+    for obj in objects:
+        armature = find_armature(obj) if is_weighted_model(obj) else None
+        if armature is not None and armature not in armatures:
+            armatures.append(armature)
+
+    return armatures
+
+def find_first_bone_indices(model_objects, instances = ()):
+    # Armature name -> node index of its first bone. The bones of every armature of find_armatures follow the
+    # models and instances, in the armature's bone order, see build_scene_nodes. Vertex bone ids are these node indices.
+    first_bone_indices = {}
+    first_bone_index = len(model_objects) + len(instances) + 1
+
+    for armature in find_armatures(model_objects):
+        first_bone_indices[armature.name] = first_bone_index
+        first_bone_index += len(armature.data.bones)
+
+    return first_bone_indices
+
+def build_bone_parents(armature):
+    # Bone index -> index of its parent bone, -1 for root bones
+    bones = armature.data.bones
+    return [bones.find(bone.parent.name) if bone.parent else -1 for bone in bones]
+
+def is_animated(obj):
+    # Animated, driven or constrained, itself or through any of its parents
+    while obj is not None:
+        if obj.animation_data is not None or len(obj.constraints) > 0:
+            return True
+
+        obj = obj.parent
+
+    return False
+
+def sample_matrices(scene, frames, objects, armatures):
+    # Returns the (frames, objects, 4, 4) world matrices of objects and, for every armature, the (frames, bones, 4, 4)
+    # armature space matrices of its bones in armature.data.bones order. The scene is evaluated once per frame,
+    # all matrices of a frame are read in bulk.
+    all_objects = bpy.data.objects
+    object_rows = {obj: row for row, obj in enumerate(all_objects)}
+    object_rows = np.array([object_rows[obj] for obj in objects], dtype=np.int64)
+    frame_matrices = np.empty((len(all_objects), 16), dtype=np.float32)
+    object_matrices = np.empty((len(frames), len(objects), 16), dtype=np.float32)
+
+    pose_rows = [[armature.pose.bones.find(bone.name) for bone in armature.data.bones] for armature in armatures]
+    pose_matrices = [np.empty((len(frames), len(armature.pose.bones), 16), dtype=np.float32) for armature in armatures]
+
+    # Nothing to read, no need to evaluate every frame
+    evaluated_frames = frames if len(objects) > 0 else []
+
+    current_frame = scene.frame_current
+    try:
+        for i, frame in enumerate(evaluated_frames):
+            if frame != scene.frame_current:
+                scene.frame_set(frame)
+
+            if len(objects) > 0:
+                all_objects.foreach_get("matrix_world", frame_matrices.reshape(-1))
+                object_matrices[i] = frame_matrices[object_rows]
+
+            for armature, matrices in zip(armatures, pose_matrices):
+                armature.pose.bones.foreach_get("matrix", matrices[i].reshape(-1))
+    finally:
+        if scene.frame_current != current_frame:
+            scene.frame_set(current_frame)
+
+    # Blender stores matrices column by column
+    object_matrices = object_matrices.reshape(len(frames), len(objects), 4, 4).swapaxes(-1, -2)
+    bone_matrices = [matrices.reshape(len(frames), -1, 4, 4).swapaxes(-1, -2)[:, rows] for matrices, rows in zip(pose_matrices, pose_rows)]
+    return object_matrices, bone_matrices
+
+def build_scene_nodes(scene, node_objects, armatures, first_bone_indices, settings):
+    # One scene node per object of node_objects, followed by one per bone of every armature, numbered as in
+    # first_bone_indices from find_first_bone_indices. Without export_animation
+    # every node holds the transform of the current frame, with it the frames of the scene's range are sampled and
+    # reduced to the keys needed to interpolate them within the settings' tolerances.
+    # Returns the nodes, the AnimData of the sampled ones (animated objects and bones), the number of sampled
+    # frames and the length of the animation in seconds.
+    if settings.export_animation:
+        frames = list(range(scene.frame_start, scene.frame_end + 1))
+        animated_objects = [obj for obj in node_objects if is_animated(obj)]
+    else:
+        frames = [scene.frame_current]
+        animated_objects = []
+
+    object_matrices, bone_matrices = sample_matrices(scene, frames, animated_objects + armatures, armatures)
+
+    # Bones are placed below their parent bone, root bones in world space like the armature's other children
+    track_matrices = [object_matrices[:, :len(animated_objects)]]
+    bone_names = []
+    bone_parents = []
+
+    for armature_index, armature in enumerate(armatures):
+        parents = build_bone_parents(armature)
+        track_matrices.append(bones_to_parent_space(object_matrices[:, len(animated_objects) + armature_index], bone_matrices[armature_index], parents))
+        bone_names += [bone.name for bone in armature.data.bones]
+        bone_parents += [first_bone_indices[armature.name] + parent if parent >= 0 else 0 for parent in parents]
+
+    times = (np.array(frames) - frames[0]) / (scene.render.fps / scene.render.fps_base)
+    anim_data = build_anim_data(times, np.concatenate(track_matrices, axis=1), settings)
+    object_anim_data = dict(zip(animated_objects, anim_data))
+
+    scene_nodes = []
+    for obj in node_objects:
+        node_anim_data = object_anim_data.get(obj)
+        if node_anim_data is None:
+            node_anim_data = AnimData()
+            node_anim_data.set_transform(*matrix_to_file_transform(obj.matrix_world))
+
+        scene_nodes.append(SceneNode(obj.name, node_anim_data))
+
+    for name, parent_index, node_anim_data in zip(bone_names, bone_parents, anim_data[len(animated_objects):]):
+        scene_nodes.append(SceneNode(name, node_anim_data, parent_index))
+
+    return scene_nodes, anim_data, len(frames), float(times[-1])
+
+def build_anim_data(times, matrices, settings):
+    # (frames, tracks, 4, 4) sampled matrices -> one AnimData per track with the keys reduction kept
+    translations, rotations = matrices_to_file_transforms(matrices)
+    rotations = make_quaternions_continuous(rotations)
+    translation_keys = reduce_translation_keys(translations, settings.translation_tolerance)
+    rotation_keys = reduce_rotation_keys(rotations, settings.rotation_tolerance)
+
+    anim_data = []
+    for track in range(matrices.shape[1]):
+        track_anim_data = AnimData()
+        translation_frames = translation_keys[:, track]
+        rotation_frames = rotation_keys[:, track]
+        track_anim_data.set_keys(times[translation_frames], translations[translation_frames, track], times[rotation_frames], rotations[rotation_frames, track])
+        anim_data.append(track_anim_data)
+
+    return anim_data
+
+def iter_models(objects, settings, first_bone_indices, cache = None):
+    for obj in objects:
+        with phase("build", obj.name):
+            key, cached_model = find_cached_model(cache, obj, settings, first_bone_indices)
+            if cached_model is None:
+                cached_model = store_cached_model(cache, key, ModelNode(obj, settings, first_bone_indices))
+
+        yield cached_model
+
+def iter_models_in_pool(objects, settings, first_bone_indices, cache = None):
+    # Extraction needs bpy and stays on this thread, welding runs in the workers meanwhile.
+    # Models come back in scene order, at most two per worker are in flight at any time.
+    max_pending = settings.encode_processes * 2
+    pending = deque()
+
+    with ProcessPoolExecutor(max_workers=settings.encode_processes, mp_context=multiprocessing.get_context('spawn')) as executor:
+        try:
+            for obj in objects:
+                with phase("build", obj.name):
+                    key, cached_model = find_cached_model(cache, obj, settings, first_bone_indices)
+                    if cached_model is not None:
+                        pending.append((cached_model, [], None))
+                    else:
+                        model = ModelNode(obj, settings, first_bone_indices)
+                        pending.append((model, [submit_mesh_processing(executor, geometry, settings) for geometry in iter_mesh_geometry(model)], key))
+
+                if len(pending) > max_pending:
+                    yield finish_pending_model(cache, *pending.popleft())
+
+            while pending:
+                yield finish_pending_model(cache, *pending.popleft())
+        finally:
+            for model, jobs, key in pending:
+                discard_mesh_processing(jobs)
+
+def model_cache_key(obj, settings, first_bone_indices):
+    # Hash of everything a model node is built from, None for the nodes that are not cached.
+    # Lines are not cached, building them costs about as much as hashing their data.
+    if is_line_model(obj):
+        return None
+
+    # A mesh in edit mode holds the data from before edit mode was entered and its uv layers read as
+    # empty, hashing it would not see the edits. Its node is always built from the edit BMesh instead.
+    mesh = obj.data
+    if mesh.is_editmode:
+        return None
+
+    digest = hashlib.blake2b(digest_size=20)
+
+    custom_properties = []
+    for prop_name, prop_value in obj.items():
+        if prop_name.startswith((CONST_OBJECT_PROPERTY_PREFIX, CONST_OBJECT_ATTRIBUTE_PREFIX)):
+            value = prop_value.to_list() if hasattr(prop_value, "to_list") else prop_value
+            custom_properties.append((prop_name, type(value).__name__, value))
+
+    description = [
+        CONST_MODEL_CACHE_VERSION,
+        Cas2Header.CONST_EXPORTER_VERSION,
+        settings.triangulation_method.name,
+        settings.weld_vertices,
+        settings.weld_epsilon,
+        settings.optimize_vertex_cache,
+        settings.measure_vertex_cache,
+        settings.strip_unused_geometry,
+        settings.lod_ratios,
+        settings.export_tangents,
+        obj_to_node_type(obj).name,
+        obj.name,
+        custom_properties,
+        [tuple(corner) for corner in obj.bound_box],
+        len(mesh.materials),
+        [uv_layer.name for uv_layer in mesh.uv_layers],
+    ]
+    digest.update(repr(description).encode('utf-8'))
+
+    digest.update(foreach_get_array(mesh.vertices, "co", np.float32, 3))
+    digest.update(foreach_get_array(mesh.loops, "vertex_index", np.int32))
+    digest.update(foreach_get_array(mesh.polygons, "loop_start", np.int32))
+    digest.update(foreach_get_array(mesh.polygons, "material_index", np.int32))
+
+    for uv_layer in mesh.uv_layers:
+        digest.update(foreach_get_array(uv_layer.data, "uv", np.float32, 2))
+
+    color_attribute = find_color_attribute(mesh)
+    if color_attribute is not None:
+        digest.update(foreach_get_array(color_attribute.data, "color_srgb", np.float32, 4))
+
+    if is_weighted_model(obj):
+        digest.update(build_group_bones(obj, first_bone_indices))
+        for array in extract_vertex_groups(mesh):
+            digest.update(array)
+
+    return digest.hexdigest()
+
+def find_cached_model(cache, obj, settings, first_bone_indices):
+    # Returns the cache key and the cached node, either can be None
+    if cache is None:
+        return None, None
+
+    with phase("cache_key"):
+        key = model_cache_key(obj, settings, first_bone_indices)
+
+    if key is None:
+        return None, None
+
+    entry = cache.get(key)
+    if entry is None:
+        return key, None
+
+    cached_model = EncodedModelNode.from_cache_entry(obj.name, entry)
+    if cached_model is None:
+        cache.discard(key)
+
+    return key, cached_model
+
+def store_cached_model(cache, key, model):
+    # Encodes the model right away so the arrays behind it can be released
+    if cache is None or key is None:
+        return model
+
+    with phase("cache_store"):
+        encoded_model = EncodedModelNode.from_model(model)
+        cache.put(key, encoded_model.cache_entry())
+
+    return encoded_model
+
+def submit_mesh_processing(executor, geometry, settings):
+    with phase("share"):
+        shm, layout = share_arrays(mesh_arrays_to_dict(geometry.mesh_arrays))
+
+    geometry.mesh_arrays = None
+    future = executor.submit(process_shared_mesh, shm.name, layout, geometry.materials_count, settings.weld_vertices, settings.weld_epsilon, settings.optimize_vertex_cache, settings.strip_unused_geometry, settings.export_tangents, settings.measure_vertex_cache)
+    return future, shm
+
+def finish_pending_model(cache, model, jobs, key):
+    # Cached models are already encoded and have no jobs
+    with phase("finish", model.node_name.string):
+        if len(jobs) > 0:
+            model = finish_mesh_processing(model, jobs)
+
+        return store_cached_model(cache, key, model)
+
+def finish_mesh_processing(model, jobs):
+    # The model already left the pending queue, on failure the jobs of its other LODs are freed here
+    for job_index, (geometry, (future, shm)) in enumerate(zip(iter_mesh_geometry(model), jobs)):
+        try:
+            try:
+                with phase("wait_processing"):
+                    result = future.result()
+            finally:
+                shm.close()
+                shm.unlink()
+
+            geometry.apply_processed_mesh(collect_shared_mesh(*result))
+        except BaseException:
+            discard_mesh_processing(jobs[job_index + 1:])
+            raise
+
+    return model
+
+def iter_mesh_geometry(model):
+    # Lines are built on the main thread, they need no processing
+    return (geometry for geometry in model.geometry_data if isinstance(geometry, GeometryDataMesh))
+
+def discard_mesh_processing(jobs):
+    for future, shm in jobs:
+        if not future.cancel() and future.exception() is None:
+            collect_shared_mesh(*future.result())
+
+        shm.close()
+        shm.unlink()
+
+def obj_to_node_type(obj):
+    if is_rigid_model(obj):
+        return NodeType.RIGID_MODEL
+
+    if is_weighted_model(obj):
+        return NodeType.WEIGHTED_MODEL
+
+    if is_line_model(obj):
+        return NodeType.LINE
+
+def triangulate_mesh(obj):
+    if obj.data.is_editmode:
+        # The edits are only in the edit BMesh until edit mode is left
+        bm = bmesh.from_edit_mesh(obj.data).copy()
+        mesh_copy = None
+    else:
+        mesh_copy = obj.data.copy()
+        bm = bmesh.new()
+        bm.from_mesh(mesh_copy)
+
+    # Swap Y and Z axes
+    for v in bm.verts:
+        v.co.y, v.co.z = v.co.z, v.co.y
+        v.normal.y, v.normal.z = v.normal.z, v.normal.y
+    
+    bmesh.ops.triangulate(bm, faces=bm.faces)
+    if mesh_copy is not None:
+        bpy.data.meshes.remove(mesh_copy)
+
+    bm.normal_update()
+
+    return bm
+
+def foreach_get_array(collection, attribute, dtype, components = 1):
+    data = np.empty(len(collection) * components, dtype=dtype)
+    collection.foreach_get(attribute, data)
+
+    if components > 1:
+        return data.reshape(-1, components)
+
+    return data
+
+def find_color_attribute(mesh):
+    # BMesh loop color layers are the byte color corner attributes, in attribute order
+    for attribute in mesh.attributes:
+        if attribute.data_type == 'BYTE_COLOR' and attribute.domain == 'CORNER':
+            return attribute
+
+    return None
+
+def extract_mesh_arrays(mesh, vertex_positions, triangle_loops, material_indices, group_bones = None):
+    # vertex_positions are in export axes, triangle_loops in the winding of the source mesh.
+    # With group_bones from build_group_bones, the arrays include the bone weights of every corner.
+    loop_vertex_indices = foreach_get_array(mesh.loops, "vertex_index", np.int32)
+    triangle_positions = vertex_positions[loop_vertex_indices[triangle_loops]]
+    face_normals = calc_triangle_normals(triangle_positions[:, 0], triangle_positions[:, 1], triangle_positions[:, 2])
+
+    # face.normal_flip() keeps the first loop and reverses the rest: (0, 1, 2) -> (0, 2, 1)
+    corners = triangle_loops[:, [0, 2, 1]].ravel()
+
+    arrays = MeshArrays()
+    arrays.material_indices = material_indices
+    arrays.positions = vertex_positions[loop_vertex_indices[corners]]
+    arrays.normals = np.repeat(-face_normals, 3, axis=0)
+
+    color_attribute = find_color_attribute(mesh)
+    if color_attribute is not None:
+        # Round-trip through the stored bytes so values match BMesh's byte * (1 / 255) conversion
+        color_bytes = np.rint(foreach_get_array(color_attribute.data, "color_srgb", np.float32, 4) * 255.0)
+        arrays.colors = (color_bytes.astype(np.float32) * np.float32(1.0 / 255.0))[corners]
+    else:
+        arrays.colors = np.zeros((len(corners), 4), dtype=np.float32)
+
+    for uv_layer in mesh.uv_layers:
+        arrays.uvs.append(foreach_get_array(uv_layer.data, "uv", np.float32, 2)[corners])
+
+    if group_bones is not None:
+        bone_ids, bone_weights = extract_bone_weights(mesh, group_bones)
+        arrays.bone_ids = bone_ids[loop_vertex_indices[corners]]
+        arrays.bone_weights = bone_weights[loop_vertex_indices[corners]]
+
+    return arrays
+
+def build_group_bones(obj, first_bone_indices):
+    # Vertex group index -> node index of the armature bone of the same name, -1 for groups that are no bone.
+    # Bones are numbered like their scene nodes, so the bones of different armatures get different ids.
+    armature = find_armature(obj)
+    first_bone_index = first_bone_indices[armature.name]
+    bone_indices = {bone.name: first_bone_index + index for index, bone in enumerate(armature.data.bones)}
+    return np.array([bone_indices.get(group.name, -1) for group in obj.vertex_groups], dtype=np.int64)
+
+def extract_vertex_groups(mesh):
+    # Returns the vertex, group and weight of every vertex group entry, sorted by vertex.
+    # Weights have no bulk accessor, this is the one loop over the mesh in Python.
+    groups_counts = np.fromiter((len(vertex.groups) for vertex in mesh.vertices), dtype=np.int64, count=len(mesh.vertices))
+    entries = [(group.group, group.weight) for vertex in mesh.vertices for group in vertex.groups]
+    entries = np.array(entries, dtype=np.float64).reshape(-1, 2)
+
+    vertex_indices = np.repeat(np.arange(len(mesh.vertices)), groups_counts)
+    return vertex_indices, entries[:, 0].astype(np.int64), entries[:, 1].astype(np.float32)
+
+def extract_bone_weights(mesh, group_bones):
+    # Returns the (vertices, influences) bone ids and weights of reduce_bone_weights
+    vertex_indices, group_indices, weights = extract_vertex_groups(mesh)
+
+    # Groups past the table, such as the locked group left in decimated meshes, are no bones either
+    bone_indices = np.full(len(group_indices), -1, dtype=np.int64)
+    in_table = group_indices < len(group_bones)
+    bone_indices[in_table] = group_bones[group_indices[in_table]]
+    is_bone = bone_indices >= 0
+
+    return reduce_bone_weights(vertex_indices[is_bone], bone_indices[is_bone], weights[is_bone], len(mesh.vertices))
+
+def extract_bmesh_triangles(obj, group_bones = None):
+    with phase("triangulate"):
+        bm = triangulate_mesh(obj)
+
+    triangulated_mesh = bpy.data.meshes.new(obj.data.name + "_triangulated")
+    bm.to_mesh(triangulated_mesh)
+    bm.free()
+
+    loop_totals = foreach_get_array(triangulated_mesh.polygons, "loop_total", np.int32)
+    assert np.all(loop_totals == 3), "Mesh is not triangulated."
+
+    vertex_positions = foreach_get_array(triangulated_mesh.vertices, "co", np.float32, 3)
+    triangle_loops = np.arange(len(triangulated_mesh.loops), dtype=np.int32).reshape(-1, 3)
+    material_indices = foreach_get_array(triangulated_mesh.polygons, "material_index", np.int32)
+
+    arrays = extract_mesh_arrays(triangulated_mesh, vertex_positions, triangle_loops, material_indices, group_bones)
+    bpy.data.meshes.remove(triangulated_mesh)
+
+    return arrays
+
+def extract_loop_triangles(obj, group_bones = None):
+    mesh = obj.data
+    if mesh.is_editmode:
+        # obj.data holds the data from before edit mode was entered and its uv layers read as empty,
+        # the edits are only in the edit BMesh: copy it into a temporary mesh
+        edit_mesh = bpy.data.meshes.new("cas2_edit_mesh")
+        try:
+            bmesh.from_edit_mesh(mesh).to_mesh(edit_mesh)
+            return extract_mesh_triangles(edit_mesh, group_bones)
+        finally:
+            bpy.data.meshes.remove(edit_mesh)
+
+    return extract_mesh_triangles(mesh, group_bones)
+
+def extract_mesh_triangles(mesh, group_bones = None):
+    with phase("triangulate"):
+        mesh.calc_loop_triangles()
+
+    # Swap Y and Z axes
+    vertex_positions = foreach_get_array(mesh.vertices, "co", np.float32, 3)[:, [0, 2, 1]]
+    triangle_loops = foreach_get_array(mesh.loop_triangles, "loops", np.int32, 3)
+    material_indices = foreach_get_array(mesh.loop_triangles, "material_index", np.int32)
+
+    return extract_mesh_arrays(mesh, vertex_positions, triangle_loops, material_indices, group_bones)
+
+def extract_line_arrays(obj):
+    # Returns the vertices and segments of build_line_arrays, curves are read from their evaluated mesh
+    if obj.type == 'CURVE':
+        evaluated_obj = obj.evaluated_get(bpy.context.evaluated_depsgraph_get())
+        try:
+            return extract_mesh_lines(evaluated_obj.to_mesh())
+        finally:
+            evaluated_obj.to_mesh_clear()
+
+    mesh = obj.data
+    if mesh.is_editmode:
+        # The edits are only in the edit BMesh until edit mode is left, copy it into a temporary mesh
+        edit_mesh = bpy.data.meshes.new("cas2_edit_lines")
+        try:
+            bmesh.from_edit_mesh(mesh).to_mesh(edit_mesh)
+            return extract_mesh_lines(edit_mesh)
+        finally:
+            bpy.data.meshes.remove(edit_mesh)
+
+    return extract_mesh_lines(mesh)
+
+def extract_mesh_lines(mesh):
+    # Swap Y and Z axes
+    positions = foreach_get_array(mesh.vertices, "co", np.float32, 3)[:, [0, 2, 1]]
+    edges = foreach_get_array(mesh.edges, "vertices", np.int32, 2)
+    edge_faces_counts = np.bincount(foreach_get_array(mesh.loops, "edge_index", np.int32), minlength=len(edges))
+    return build_line_arrays(positions, edges, edge_faces_counts)
+
+def differs_around_vertices(loop_vertices, loop_values, vertices_count):
+    # Compares every loop with an arbitrary loop of the same vertex, linear unlike a min/max reduction
+    vertex_values = np.zeros((vertices_count,) + loop_values.shape[1:], dtype=loop_values.dtype)
+    vertex_values[loop_vertices] = loop_values
+
+    mismatches = loop_values != vertex_values[loop_vertices]
+    if mismatches.ndim > 1:
+        mismatches = np.any(mismatches, axis=1)
+
+    differs = np.zeros(vertices_count, dtype=bool)
+    differs[loop_vertices[mismatches]] = True
+    return differs
+
+def find_lod_locked_vertices(mesh):
+    # Vertices whose loops differ in material or uv, they lie on material boundaries and uv seams
+    vertices_count = len(mesh.vertices)
+    loop_vertices = foreach_get_array(mesh.loops, "vertex_index", np.int32)
+    loop_totals = foreach_get_array(mesh.polygons, "loop_total", np.int32)
+    loop_materials = np.repeat(foreach_get_array(mesh.polygons, "material_index", np.int32), loop_totals)
+
+    locked = differs_around_vertices(loop_vertices, loop_materials, vertices_count)
+    for uv_layer in mesh.uv_layers:
+        locked |= differs_around_vertices(loop_vertices, foreach_get_array(uv_layer.data, "uv", np.float32, 2), vertices_count)
+
+    return np.flatnonzero(locked)
+
+def decimate_mesh(mesh, ratio, vertex_groups):
+    # Blender's collapse decimation (quadric error edge collapse) on a temporary object. Locked vertices
+    # get weight 0 in the inverted vertex group, which makes collapsing their edges cost more than any
+    # other. The weight only raises the cost, so the locked vertices that moved anyway are counted.
+    # Returns the decimated mesh and that count.
+    mesh_copy = mesh.copy()
+    lod_object = bpy.data.objects.new(mesh.name + "_lod", mesh_copy)
+    bpy.context.scene.collection.objects.link(lod_object)
+
+    try:
+        # The mesh keeps the weights of the object's groups, the locked group is numbered after them.
+        # Since Blender 3.0 the group names are stored in the mesh and the copy already has them.
+        group_names = {group.name for group in lod_object.vertex_groups}
+        for group in vertex_groups:
+            if group.name not in group_names:
+                lod_object.vertex_groups.new(name=group.name)
+
+        locked_vertices = find_lod_locked_vertices(mesh_copy)
+        locked_group = lod_object.vertex_groups.get(CONST_LOD_LOCKED_GROUP) or lod_object.vertex_groups.new(name=CONST_LOD_LOCKED_GROUP)
+        # Meshes decimated before hold the locked vertices of their own source in this group
+        locked_group.remove(list(range(len(mesh_copy.vertices))))
+        locked_group.add(locked_vertices.tolist(), 1.0, 'REPLACE')
+
+        modifier = lod_object.modifiers.new("Cas2Lod", 'DECIMATE')
+        modifier.decimate_type = 'COLLAPSE'
+        modifier.ratio = ratio
+        modifier.use_collapse_triangulate = True
+        modifier.vertex_group = locked_group.name
+        modifier.invert_vertex_group = True
+        modifier.vertex_group_factor = CONST_LOD_LOCK_FACTOR
+
+        depsgraph = bpy.context.evaluated_depsgraph_get()
+        lod_mesh = bpy.data.meshes.new_from_object(lod_object.evaluated_get(depsgraph))
+
+        locked_positions = foreach_get_array(mesh_copy.vertices, "co", np.float32, 3)[locked_vertices]
+        moved_count = count_missing_rows(locked_positions, foreach_get_array(lod_mesh.vertices, "co", np.float32, 3))
+        return lod_mesh, moved_count
+    finally:
+        bpy.data.objects.remove(lod_object)
+        bpy.data.meshes.remove(mesh_copy)
+
+def build_lod_meshes(obj, ratios):
+    # Every LOD is decimated from the one before, the ratios decrease so that costs less than starting over.
+    # A LOD that moves material boundaries or uv seams is dropped, the next one starts from the same mesh.
+    lod_meshes = []
+    source_mesh = obj.data
+    source_ratio = 1.0
+
+    edit_mesh = None
+    if source_mesh.is_editmode:
+        # Decimated from the edit BMesh like the full mesh is extracted from it, obj.data is stale
+        edit_mesh = bpy.data.meshes.new("cas2_edit_lod")
+        bmesh.from_edit_mesh(source_mesh).to_mesh(edit_mesh)
+        source_mesh = edit_mesh
+
+    try:
+        for ratio in ratios:
+            lod_mesh, moved_count = decimate_mesh(source_mesh, ratio / source_ratio, obj.vertex_groups)
+            if moved_count > 0:
+                bpy.data.meshes.remove(lod_mesh)
+                continue
+
+            lod_meshes.append(lod_mesh)
+            source_mesh = lod_mesh
+            source_ratio = ratio
+    except BaseException:
+        for lod_mesh in lod_meshes:
+            bpy.data.meshes.remove(lod_mesh)
+        raise
+    finally:
+        if edit_mesh is not None:
+            bpy.data.meshes.remove(edit_mesh)
+
+    return lod_meshes
+
+def fill_mesh_data(geometry_data, obj, fill_skin_data, settings, lod_mesh = None, first_bone_indices = None):
+    # Decimated meshes keep the vertex groups, with their weights interpolated
+    with phase("extract"):
+        group_bones = build_group_bones(obj, first_bone_indices) if fill_skin_data else None
+
+        if lod_mesh is not None:
+            # Decimated meshes are already triangulated and never in edit mode
+            geometry_data.mesh_arrays = extract_mesh_triangles(lod_mesh, group_bones)
+        elif settings.triangulation_method == TriangulationMethod.BMESH:
+            geometry_data.mesh_arrays = extract_bmesh_triangles(obj, group_bones)
+        else:
+            geometry_data.mesh_arrays = extract_loop_triangles(obj, group_bones)
+
+    # With worker processes the arrays are processed later, see iter_models_in_pool
+    if settings.encode_processes == 0:
+        with phase("process"):
+            processed = process_mesh_arrays(geometry_data.mesh_arrays, geometry_data.materials_count, settings.weld_vertices, settings.weld_epsilon, settings.optimize_vertex_cache, settings.strip_unused_geometry, settings.export_tangents, settings.measure_vertex_cache)
+            geometry_data.apply_processed_mesh(processed)
@@ -0,0 +1,261 @@
+# Coordinates system: Left-handed
+# Axes setup: X (right), Y (up), Z (front)
+# Units: Meters
+
+import bpy
+import numpy as np
+from mathutils import Quaternion
+
+from .cas2_format import NodeType
+from .cas2_reader import Cas2File, INSTANCE_NODE_TYPES
+from .exporter import CONST_OBJECT_PROPERTY_PREFIX, CONST_OBJECT_ATTRIBUTE_PREFIX
+from .cas2_mesh import calc_triangle_normals, unique_rows
+
+class ImportedMeshArrays:
+    def __init__(self):
+        self.positions = None           # (vertices, 3) float32, unique positions in Blender axes
+        self.loop_vertices = None       # (triangles * 3,) int32, Blender winding
+        self.loop_normals = None        # (triangles * 3, 3) float32
+        self.flat_normals = False       # every loop normal is the flat normal of its triangle
+        self.loop_colors = None         # (triangles * 3, 4) float32 or None when the file has no colors
+        self.loop_uvs = []              # one (triangles * 3, 2) float32 array per uv channel
+        self.material_indices = None    # (triangles,) int32, index into the node's material slots
+
+    def triangles_count(self):
+        return len(self.material_indices)
+
+class ImportStats:
+    def __init__(self):
+        self.models_count = 0
+        self.lines_count = 0
+        self.instances_count = 0
+        self.skipped_count = 0 # weighted models and instances of missing models
+
+def import_cas2(filepath, collection, import_normals = True):
+    # Links an object for every supported node to collection, raises OSError or ValueError for unreadable files
+    stats = ImportStats()
+
+    with Cas2File(filepath) as cas2_file:
+        materials = {}
+        model_objects = {} # node index -> object, instances refer to models by node index
+        imported_objects = [] # (node index, object)
+        instance_nodes = []
+        scene_nodes = []
+
+        for node in cas2_file.nodes:
+            if node.node_type == NodeType.RIGID_MODEL:
+                obj = create_model_object(node, materials, import_normals)
+                collection.objects.link(obj)
+                model_objects[node.node_index] = obj
+                imported_objects.append((node.node_index, obj))
+                stats.models_count += 1
+            elif node.node_type == NodeType.LINE:
+                obj = create_line_object(node)
+                collection.objects.link(obj)
+                imported_objects.append((node.node_index, obj))
+                stats.lines_count += 1
+            elif node.node_type in INSTANCE_NODE_TYPES:
+                instance_nodes.append(node)
+            elif node.node_type == NodeType.SCENE_ROOT:
+                scene_nodes = node.scene_nodes
+            elif node.node_type == NodeType.WEIGHTED_MODEL:
+                stats.skipped_count += 1
+
+        for node in instance_nodes:
+            obj = create_instance_object(node, model_objects, materials)
+            if obj is None:
+                stats.skipped_count += 1
+                continue
+
+            collection.objects.link(obj)
+            imported_objects.append((node.node_index, obj))
+            stats.instances_count += 1
+
+        # Files without scene nodes leave every object at the origin
+        for node_index, obj in imported_objects:
+            if 0 < node_index <= len(scene_nodes):
+                apply_scene_node_transform(obj, scene_nodes[node_index - 1])
+
+    return stats
+
+def foreach_set_array(collection, attribute, array):
+    collection.foreach_set(attribute, np.ascontiguousarray(array).ravel())
+
+def build_mesh_arrays(geometry):
+    vertices = geometry.vertices
+
+    # Split vertices sharing a position become one Blender vertex, adding 0.0 turns -0.0 into 0.0 so those merge too.
+    # Swap Y and Z axes.
+    file_positions = vertices["position"][:, [0, 2, 1]] + np.float32(0.0)
+    first_uses, position_indices = unique_rows(file_positions.view(np.uint32))
+    position_indices = position_indices.astype(np.int32)
+    positions = file_positions[first_uses]
+
+    triangles = []
+    material_indices = []
+    for slot_index, submesh in enumerate(geometry.sub_meshes):
+        triangles.append(submesh.triangles)
+        material_indices.append(np.full(len(submesh.triangles), slot_index, dtype=np.int32))
+
+    if len(triangles) > 0:
+        triangles = np.concatenate(triangles)
+        material_indices = np.concatenate(material_indices)
+    else:
+        triangles = np.zeros((0, 3), dtype=np.int32)
+        material_indices = np.zeros(0, dtype=np.int32)
+
+    # The exporter flips the winding to make up for the axis swap: (0, 1, 2) -> (0, 2, 1)
+    corners = triangles[:, [0, 2, 1]].astype(np.int64)
+
+    # Blender rejects faces that use a vertex twice, which happens once split vertices are merged
+    corner_vertices = position_indices[corners]
+    valid = (corner_vertices[:, 0] != corner_vertices[:, 1]) & (corner_vertices[:, 1] != corner_vertices[:, 2]) & (corner_vertices[:, 0] != corner_vertices[:, 2])
+    corners = corners[valid]
+
+    # Same computation as the exporter, so its flat normals are recognized exactly
+    triangle_positions = vertices["position"][corners]
+    flat_normals = -calc_triangle_normals(triangle_positions[:, 0], triangle_positions[:, 1], triangle_positions[:, 2])
+    file_normals = vertices["normal"][corners]
+
+    corners = corners.ravel()
+
+    arrays = ImportedMeshArrays()
+    arrays.positions = positions
+    arrays.loop_vertices = position_indices[corners]
+    arrays.loop_normals = file_normals.reshape(-1, 3)[:, [0, 2, 1]]
+    arrays.flat_normals = bool(np.all(file_normals == flat_normals[:, None, :]))
+    arrays.material_indices = material_indices[valid]
+
+    colors = vertices["color"][corners]
+    if np.any(colors != 0.0):
+        arrays.loop_colors = colors
+
+    for i in range(vertices["tex_coords"].shape[1]):
+        arrays.loop_uvs.append(vertices["tex_coords"][corners, i, :2])
+
+    return arrays
+
+def build_mesh(name, arrays, uv_channel_ids, import_normals):
+    mesh = bpy.data.meshes.new(name)
+
+    triangles_count = arrays.triangles_count()
+    mesh.vertices.add(len(arrays.positions))
+    mesh.loops.add(triangles_count * 3)
+    mesh.polygons.add(triangles_count)
+
+    foreach_set_array(mesh.vertices, "co", arrays.positions)
+    foreach_set_array(mesh.loops, "vertex_index", arrays.loop_vertices)
+    foreach_set_array(mesh.polygons, "loop_start", np.arange(0, triangles_count * 3, 3, dtype=np.int32))
+    foreach_set_array(mesh.polygons, "material_index", arrays.material_indices)
+
+    for channel_id, uvs in zip(uv_channel_ids, arrays.loop_uvs):
+        uv_layer = mesh.uv_layers.new(name="UVChannel_" + str(channel_id), do_init=False)
+        foreach_set_array(uv_layer.data, "uv", uvs)
+
+    if arrays.loop_colors is not None:
+        color_attribute = mesh.color_attributes.new(name="Color", type='BYTE_COLOR', domain='CORNER')
+        foreach_set_array(color_attribute.data, "color_srgb", arrays.loop_colors)
+
+    mesh.update(calc_edges=True)
+
+    if arrays.flat_normals:
+        # Flat normals, as the exporter writes them, only need sharp faces. Custom normals
+        # are parsed through RNA and cost more than building the rest of the mesh.
+        foreach_set_array(mesh.polygons, "use_smooth", np.zeros(triangles_count, dtype=bool))
+    elif import_normals and triangles_count > 0:
+        mesh.normals_split_custom_set(arrays.loop_normals)
+
+    return mesh
+
+def get_material(materials, material_id):
+    if material_id not in materials:
+        materials[material_id] = bpy.data.materials.new("Cas2Material_" + str(material_id))
+
+    return materials[material_id]
+
+def parse_properties(properties):
+    parsed = {}
+
+    for line in properties.splitlines():
+        name, separator, value = line.partition(" = ")
+        if separator:
+            parsed[name] = value
+
+    return parsed
+
+def create_model_object(node, materials, import_normals):
+    geometry = node.geometry_data[0]
+    arrays = build_mesh_arrays(geometry)
+    mesh = build_mesh(node.name, arrays, geometry.uv_channels, import_normals)
+
+    # Meshes without materials are exported as a single submesh with material id -1
+    if any(submesh.material_id >= 0 for submesh in geometry.sub_meshes):
+        for submesh in geometry.sub_meshes:
+            mesh.materials.append(get_material(materials, submesh.material_id) if submesh.material_id >= 0 else None)
+
+    obj = bpy.data.objects.new(node.name, mesh)
+    apply_node_properties(obj, node)
+    return obj
+
+def create_line_object(node):
+    # Every line of the node becomes part of one mesh made of edges only
+    positions = []
+    edges = []
+    vertices_count = 0
+    for line in node.geometry_data[0].lines:
+        # Swap Y and Z axes
+        positions.append(line.vertices[:, [0, 2, 1]])
+        edges.append(line.segments.astype(np.int32) + vertices_count)
+        vertices_count += len(line.vertices)
+
+    mesh = bpy.data.meshes.new(node.name)
+    if vertices_count > 0:
+        positions = np.concatenate(positions)
+        edges = np.concatenate(edges)
+        mesh.vertices.add(len(positions))
+        mesh.edges.add(len(edges))
+        foreach_set_array(mesh.vertices, "co", positions)
+        foreach_set_array(mesh.edges, "vertices", edges)
+        mesh.update()
+
+    obj = bpy.data.objects.new(node.name, mesh)
+    apply_node_properties(obj, node)
+    return obj
+
+def create_instance_object(node, model_objects, materials):
+    # Shares the mesh of the model it refers to, None if that model is not part of the file
+    geometry = node.geometry_data[0]
+    original = model_objects.get(geometry.original_node_index)
+    if original is None:
+        return None
+
+    obj = bpy.data.objects.new(node.name, original.data)
+
+    if geometry.material_id is not None:
+        material = get_material(materials, geometry.material_id)
+        for slot in obj.material_slots:
+            slot.link = 'OBJECT'
+            slot.material = material
+
+    apply_node_properties(obj, node)
+    return obj
+
+def apply_node_properties(obj, node):
+    for name, value in parse_properties(node.user_defined_properties).items():
+        obj[CONST_OBJECT_PROPERTY_PREFIX + name] = value
+
+    for values in node.attributes.values():
+        for name, value in values.items():
+            obj[CONST_OBJECT_ATTRIBUTE_PREFIX + name] = value
+
+def apply_scene_node_transform(obj, scene_node):
+    # The first key of each, swap Y and Z axes back
+    anim_data = scene_node.anim_data
+
+    if len(anim_data.translations) > 0:
+        x, y, z = anim_data.translations[0]
+        obj.location = (x, z, y)
+
+    if len(anim_data.rotations) > 0:
+        x, y, z, w = anim_data.rotations[0]
+        obj.rotation_euler = Quaternion((w, -x, -z, -y)).to_euler()
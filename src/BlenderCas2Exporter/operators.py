@@ -0,0 +1,350 @@
+# Operators and menu entries, the rest of the add-on is imported when an operator first runs.
+
+import bpy
+import math
+import os
+import sys
+
+def loaded_watch_module():
+    # Nothing can be watched before the watch module is imported, menus must not import it to find out
+    return sys.modules.get(__package__ + ".watch")
+
+def is_watching():
+    watch = loaded_watch_module()
+    return watch is not None and watch.is_watching()
+
+class ExportCas2File(bpy.types.Operator):
+    bl_idname = "export_scene.cas2_file"
+    bl_label = "Export Cas2 file (.cs2)"
+    bl_options = {'REGISTER', 'UNDO'}
+    
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    triangulation_method: bpy.props.EnumProperty(
+        name="Triangulation",
+        items=[
+            ('LOOP_TRIANGLES', "Loop Triangles", "Read Blender's cached loop triangles in bulk, no temporary mesh copy"),
+            ('BMESH', "BMesh", "Copy the mesh into BMesh and triangulate with bmesh.ops.triangulate (slower, for comparison)"),
+        ],
+        default='LOOP_TRIANGLES',
+    )
+    weld_vertices: bpy.props.BoolProperty(
+        name="Weld Vertices",
+        description="Share identical vertices between triangles instead of writing one vertex per triangle corner",
+        default=True,
+    )
+    weld_epsilon: bpy.props.FloatProperty(
+        name="Weld Epsilon",
+        description="Quantization step used to compare vertex values when welding, 0 only welds bit-identical vertices",
+        default=0.0,
+        min=0.0,
+        precision=6,
+    )
+    strip_unused_geometry: bpy.props.BoolProperty(
+        name="Strip Unused Geometry",
+        description="Remove zero-area triangles and unused vertices, and number vertices in the order triangles first use them",
+        default=True,
+    )
+    lod_ratios: bpy.props.StringProperty(
+        name="LOD Ratios",
+        description="Triangle ratios of the LODs generated for every model, for example \"0.5, 0.25\", empty exports only the full mesh",
+        default="",
+    )
+    export_instances: bpy.props.BoolProperty(
+        name="Export Instances",
+        description="Objects sharing a mesh are exported as instances of the first of them, its geometry is written once",
+        default=True,
+    )
+    export_tangents: bpy.props.BoolProperty(
+        name="Export Tangents",
+        description="Write the tangent and bitangent of the first UV layer as two more texture coordinates of every vertex",
+        default=False,
+    )
+    export_animation: bpy.props.BoolProperty(
+        name="Export Animation",
+        description="Sample every frame of the scene's frame range and keep the keys needed to interpolate it, otherwise only the current frame is written",
+        default=False,
+    )
+    translation_tolerance: bpy.props.FloatProperty(
+        name="Translation Tolerance",
+        description="Translation keys that interpolating their neighbours reproduces within this distance are dropped",
+        default=0.0001,
+        min=0.0,
+        precision=6,
+        subtype='DISTANCE',
+    )
+    rotation_tolerance: bpy.props.FloatProperty(
+        name="Rotation Tolerance",
+        description="Rotation keys that interpolating their neighbours reproduces within this angle are dropped",
+        default=math.radians(0.01),
+        min=0.0,
+        precision=4,
+        subtype='ANGLE',
+    )
+    optimize_vertex_cache: bpy.props.BoolProperty(
+        name="Optimize Vertex Cache",
+        description="Reorder the triangles of every submesh so the game's post-transform vertex cache reuses more vertices (needs welding)",
+        default=False,
+    )
+    streaming: bpy.props.BoolProperty(
+        name="Streaming",
+        description="Build, write and release one model at a time instead of encoding the whole file in memory",
+        default=True,
+    )
+    encode_processes: bpy.props.IntProperty(
+        name="Encode Processes",
+        description="Worker processes that compute tangent frames, weld and split model geometry while the next objects are read, 0 does it all on the main thread",
+        default=0,
+        min=0,
+        soft_max=os.cpu_count() or 1,
+    )
+    use_cache: bpy.props.BoolProperty(
+        name="Use Model Cache",
+        description="Reuse encoded model nodes from previous exports when the mesh, its properties and the settings are unchanged",
+        default=False,
+    )
+    cache_directory: bpy.props.StringProperty(
+        name="Cache Directory",
+        description="Where encoded model nodes are cached, empty uses the system temporary directory",
+        subtype='DIR_PATH',
+    )
+    cache_size_mb: bpy.props.IntProperty(
+        name="Cache Size (MB)",
+        description="Least recently used nodes are removed once the cache grows past this size",
+        default=1024,
+        min=1,
+    )
+    dry_run: bpy.props.BoolProperty(
+        name="Dry Run",
+        description="Only compute and report the size of every block, nothing is written to disk",
+        default=False,
+    )
+    write_index: bpy.props.BoolProperty(
+        name="Write Index",
+        description="Write a .index.json next to the exported file with the offset, size, counts and hash of every node, so tools can read a single node without parsing the whole file",
+        default=False,
+    )
+    profile: bpy.props.BoolProperty(
+        name="Profile",
+        description="Record wall time and peak memory of every export phase per model, and the bytes of every block type, in a .profile.json file next to the exported file",
+        default=False,
+    )
+    watch: bpy.props.BoolProperty(
+        name="Watch for Changes",
+        description="Keep the file up to date after exporting, only objects changed since the last write are encoded again",
+        default=False,
+    )
+
+    def build_settings(self):
+        from .exporter import ExportSettings, TriangulationMethod, parse_lod_ratios
+
+        settings = ExportSettings()
+        settings.triangulation_method = TriangulationMethod[self.triangulation_method]
+        settings.weld_vertices = self.weld_vertices
+        settings.weld_epsilon = self.weld_epsilon
+        settings.optimize_vertex_cache = self.optimize_vertex_cache
+        settings.measure_vertex_cache = self.optimize_vertex_cache # the ACMR before reordering is reported
+        settings.strip_unused_geometry = self.strip_unused_geometry
+        settings.lod_ratios = parse_lod_ratios(self.lod_ratios)
+        settings.export_instances = self.export_instances
+        settings.export_tangents = self.export_tangents
+        settings.export_animation = self.export_animation
+        settings.translation_tolerance = self.translation_tolerance
+        settings.rotation_tolerance = self.rotation_tolerance
+        settings.encode_processes = self.encode_processes
+        settings.write_index = self.write_index
+        return settings
+
+    def report_welding(self, stats):
+        # Welding comes before stripping, the vertices stripped afterwards were part of its result
+        self.report({'INFO'}, f"Welded {stats.unwelded_vertices_count} vertices into {stats.vertices_count + stats.unused_vertices_count}")
+
+    def report_stripping(self, stats):
+        stripped_bytes = sum(size for _, size in stats.stripped_bytes)
+        self.report({'INFO'}, f"Stripped {stats.degenerate_triangles_count} zero-area triangles and {stats.unused_vertices_count} unused vertices, {stripped_bytes} bytes")
+
+        for name, size in stats.stripped_bytes:
+            self.report({'INFO'}, f"  {name}: {size} bytes")
+
+    def report_dropped_lods(self, stats):
+        dropped_count = sum(count for _, count in stats.dropped_lods)
+        self.report({'WARNING'}, f"Left out {dropped_count} LODs whose decimation moved material boundaries or uv seams, use higher ratios")
+
+        for name, count in stats.dropped_lods:
+            self.report({'WARNING'}, f"  {name}: {count} LODs")
+
+    def report_vertex_cache(self, stats):
+        from .cas2_mesh import calc_acmr
+
+        acmr_before = calc_acmr(stats.cache_misses_before, stats.triangles_count)
+        acmr_after = calc_acmr(stats.cache_misses_after, stats.triangles_count)
+        self.report({'INFO'}, f"Vertex cache misses per triangle (ACMR): {acmr_before:.3f} before, {acmr_after:.3f} after reordering")
+
+    def report_layout(self, stats):
+        self.report({'INFO'}, f"Dry run: {stats.file_size()} bytes")
+
+        for name, size in stats.block_sizes:
+            self.report({'INFO'}, f"  {name}: {size} bytes")
+
+    def report_profile(self, profile):
+        from .cas2_profile import report_filepath
+
+        for line in profile.summary_lines():
+            self.report({'INFO'}, line)
+
+        # A dry run writes nothing to disk, the summary is all there is
+        if not self.dry_run:
+            filepath = report_filepath(profile.filepath)
+            profile.write_report(filepath)
+            self.report({'INFO'}, f"Profile written to {filepath}")
+
+    def execute(self, context):
+        try:
+            settings = self.build_settings()
+        except ValueError as error:
+            self.report({'ERROR'}, str(error))
+            return {'CANCELLED'}
+
+        if self.watch and not self.dry_run:
+            from .watch import start_watch
+            try:
+                stats = start_watch(self.filepath + ".cs2", settings, self.streaming)
+            except ValueError as error:
+                self.report({'ERROR'}, str(error))
+                return {'CANCELLED'}
+
+            self.report({'INFO'}, f"Watching {stats.models_count} models, the file is rewritten after every change")
+            return {'FINISHED'}
+
+        from .cas2_cache import BlockCache
+        from .cas2_profile import ExportProfile, Profiling
+        from .exporter import CONST_MODEL_CACHE_DIRECTORY, export_cas2
+
+        cache = None
+        if self.use_cache and not self.dry_run:
+            cache = BlockCache(self.cache_directory or CONST_MODEL_CACHE_DIRECTORY, self.cache_size_mb * 1024 * 1024)
+
+        profile = ExportProfile(self.filepath + ".cs2") if self.profile else None
+        try:
+            with Profiling(profile):
+                stats = export_cas2(self.filepath + ".cs2", bpy.data.objects, settings, self.streaming, self.dry_run, cache)
+        except ValueError as error:
+            self.report({'ERROR'}, str(error))
+            return {'CANCELLED'}
+
+        if stats.instances_count > 0:
+            self.report({'INFO'}, f"Exported {stats.models_count} models and {stats.instances_count} instances of them")
+
+        if settings.export_animation:
+            self.report({'INFO'}, f"Kept {stats.animation_keys_count} of {stats.sampled_keys_count} sampled animation keys")
+
+        if settings.weld_vertices:
+            self.report_welding(stats)
+
+            if settings.optimize_vertex_cache:
+                self.report_vertex_cache(stats)
+
+        if settings.strip_unused_geometry:
+            self.report_stripping(stats)
+
+        if len(stats.dropped_lods) > 0:
+            self.report_dropped_lods(stats)
+
+        if cache is not None:
+            self.report({'INFO'}, f"Model cache: {cache.hits} hits, {cache.misses} misses")
+
+        if self.dry_run:
+            self.report_layout(stats)
+
+        if profile is not None:
+            self.report_profile(profile)
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class ImportCas2File(bpy.types.Operator):
+    bl_idname = "import_scene.cas2_file"
+    bl_label = "Import Cas2 file (.cs2)"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath: bpy.props.StringProperty(subtype="FILE_PATH")
+    filter_glob: bpy.props.StringProperty(default="*.cs2", options={'HIDDEN'})
+    import_normals: bpy.props.BoolProperty(
+        name="Import Normals",
+        description="Keep the file's vertex normals, flat normals become sharp faces and any others custom split normals",
+        default=True,
+    )
+
+    def execute(self, context):
+        from .importer import import_cas2
+
+        try:
+            stats = import_cas2(self.filepath, context.collection, self.import_normals)
+        except (OSError, ValueError) as error:
+            self.report({'ERROR'}, str(error))
+            return {'CANCELLED'}
+
+        self.report({'INFO'}, f"Imported {stats.models_count} models, {stats.lines_count} lines and {stats.instances_count} instances")
+        if stats.skipped_count > 0:
+            self.report({'WARNING'}, f"Skipped {stats.skipped_count} weighted model and instance nodes, they are not supported yet or refer to missing models")
+
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class StopCas2Watch(bpy.types.Operator):
+    bl_idname = "export_scene.cas2_stop_watch"
+    bl_label = "Stop Cas2 Watch"
+    bl_options = {'REGISTER'}
+
+    @classmethod
+    def poll(cls, context):
+        return is_watching()
+
+    def execute(self, context):
+        watch = loaded_watch_module()
+        session = watch.active_session
+        watch.stop_watch()
+
+        if session.last_error is not None:
+            self.report({'ERROR'}, session.last_error)
+        elif session.last_status:
+            self.report({'INFO'}, session.last_status)
+
+        self.report({'INFO'}, f"Stopped watching {session.filepath}")
+        return {'FINISHED'}
+
+def menu_func_export(self, context):
+    self.layout.operator(ExportCas2File.bl_idname, text="Export Cas2 (.cs2)")
+
+def menu_func_stop_watch(self, context):
+    if is_watching():
+        failed = loaded_watch_module().active_session.last_error is not None
+        self.layout.operator(StopCas2Watch.bl_idname, text="Stop Cas2 Watch (Last Export Failed)" if failed else "Stop Cas2 Watch")
+
+def menu_func_import(self, context):
+    self.layout.operator(ImportCas2File.bl_idname, text="Cas2 (.cs2)")
+
+def register():
+    bpy.utils.register_class(ExportCas2File)
+    bpy.utils.register_class(ImportCas2File)
+    bpy.utils.register_class(StopCas2Watch)
+    bpy.types.TOPBAR_MT_file_export.append(menu_func_export)
+    bpy.types.TOPBAR_MT_file_export.append(menu_func_stop_watch)
+    bpy.types.TOPBAR_MT_file_import.append(menu_func_import)
+
+def unregister():
+    watch = loaded_watch_module()
+    if watch is not None:
+        watch.stop_watch()
+
+    bpy.types.TOPBAR_MT_file_import.remove(menu_func_import)
+    bpy.types.TOPBAR_MT_file_export.remove(menu_func_stop_watch)
+    bpy.types.TOPBAR_MT_file_export.remove(menu_func_export)
+    bpy.utils.unregister_class(StopCas2Watch)
+    bpy.utils.unregister_class(ImportCas2File)
+    bpy.utils.unregister_class(ExportCas2File)
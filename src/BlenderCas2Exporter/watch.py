@@ -0,0 +1,175 @@
+# Live export: the file is rewritten after every change, encoding only the changed objects again.
+
+import bpy
+import copy
+import time
+
+from .exporter import (
+    EncodedModelNode,
+    ModelNode,
+    find_first_bone_indices,
+    find_instances,
+    find_line_objects,
+    find_rigid_objects,
+    find_weighted_objects,
+    is_line_model,
+    is_rigid_model,
+    is_weighted_model,
+    write_cas2,
+)
+
+# Seconds without further updates before the file is rewritten, dragging a vertex fires one update per redraw
+CONST_WATCH_DELAY = 0.5
+
+class WatchSession:
+    def __init__(self, filepath, settings, streaming):
+        self.filepath = filepath
+        self.settings = settings
+        self.streaming = streaming
+        self.models = {}            # object name -> EncodedModelNode of its last export
+        self.dirty_objects = set()  # object names
+        self.dirty_meshes = set()   # mesh and curve names, every object using them is dirty
+        self.first_bone_indices = {} # bone numbering of the last export, weighted model nodes hold these ids
+        self.exporting = False
+        self.last_encoded_count = 0
+        self.last_seconds = 0.0
+        self.last_status = ""       # outcome of the last export, reported when the watch stops
+        self.last_error = None      # why the last export failed, None once one succeeds again
+
+    def mark_dirty(self, depsgraph):
+        # Updates during the export come from its own temporary meshes and objects
+        if self.exporting:
+            return False
+
+        marked = False
+
+        for update in depsgraph.updates:
+            data = update.id.original
+            if isinstance(data, bpy.types.Object) and (is_rigid_model(data) or is_weighted_model(data) or is_line_model(data)):
+                # Transforms are written to the scene root on every export, moving an object leaves its node unchanged
+                if not update.is_updated_transform or update.is_updated_geometry:
+                    self.dirty_objects.add(data.name)
+
+                marked = True
+            elif isinstance(data, bpy.types.Object) and data.type == 'ARMATURE':
+                # Posed bones are written to the scene root as well
+                marked = True
+            elif isinstance(data, (bpy.types.Mesh, bpy.types.Curve)):
+                # Temporary meshes of the exporter itself have no users
+                if data.users > 0:
+                    self.dirty_meshes.add(data.name)
+                    marked = True
+
+        return marked
+
+    def iter_models(self, objects):
+        for obj in objects:
+            model = self.models.get(obj.name)
+            if model is None:
+                model = EncodedModelNode.from_model(ModelNode(obj, self.settings, self.first_bone_indices))
+                self.models[obj.name] = model
+                self.last_encoded_count += 1
+
+            yield model
+
+    def export(self):
+        start = time.perf_counter()
+
+        rigid_objects = find_rigid_objects(bpy.data.objects)
+
+        # Instances are cheap to build and found again on every export, only model nodes are kept
+        if self.settings.export_instances:
+            model_objects, instances = find_instances(rigid_objects)
+        else:
+            model_objects, instances = rigid_objects, []
+
+        model_objects += find_weighted_objects(bpy.data.objects)
+        model_objects += find_line_objects(bpy.data.objects)
+        names = {obj.name for obj in model_objects}
+
+        # Removed, renamed and newly instanced objects are dropped, new ones miss and are encoded
+        for name in list(self.models):
+            if name not in names or name in self.dirty_objects:
+                del self.models[name]
+
+        for obj in model_objects:
+            if obj.data.name in self.dirty_meshes:
+                self.models.pop(obj.name, None)
+
+        # Bones are numbered after every model and instance node, adding or removing one renumbers them all
+        first_bone_indices = find_first_bone_indices(model_objects, instances)
+        if first_bone_indices != self.first_bone_indices:
+            for obj in model_objects:
+                if is_weighted_model(obj):
+                    self.models.pop(obj.name, None)
+
+            self.first_bone_indices = first_bone_indices
+
+        self.dirty_objects.clear()
+        self.dirty_meshes.clear()
+        self.last_encoded_count = 0
+
+        self.exporting = True
+        try:
+            stats = write_cas2(self.filepath, model_objects, self.iter_models(model_objects), self.settings, self.first_bone_indices, instances, self.streaming)
+
+            # Adding and removing the temporary data tags every object for an update, evaluating it
+            # now keeps those updates from triggering another export
+            bpy.context.evaluated_depsgraph_get()
+        finally:
+            self.exporting = False
+
+        self.last_seconds = time.perf_counter() - start
+        self.last_status = f"Wrote {self.filepath} in {self.last_seconds:.3f} s, encoded {self.last_encoded_count} of {stats.models_count} models"
+        self.last_error = None
+        return stats
+
+active_session = None
+
+def on_depsgraph_update(scene, depsgraph):
+    if active_session is not None and active_session.mark_dirty(depsgraph):
+        # Every further update within the delay is picked up by the same export
+        if not bpy.app.timers.is_registered(on_watch_timer):
+            bpy.app.timers.register(on_watch_timer, first_interval=CONST_WATCH_DELAY)
+
+def on_watch_timer():
+    if active_session is not None:
+        try:
+            active_session.export()
+        except Exception as error:
+            active_session.last_error = f"Export to {active_session.filepath} failed: {str(error).strip()}"
+
+    # None unregisters the timer
+    return None
+
+def is_watching():
+    return active_session is not None and on_depsgraph_update in bpy.app.handlers.depsgraph_update_post
+
+def start_watch(filepath, settings, streaming = True):
+    # Exports right away, then keeps the file up to date until stop_watch
+    global active_session
+    stop_watch()
+
+    # Single objects are encoded as they change, worker processes would only add startup time.
+    # The caller's settings keep theirs.
+    settings = copy.copy(settings)
+    settings.encode_processes = 0
+    active_session = WatchSession(filepath, settings, streaming)
+    bpy.app.handlers.depsgraph_update_post.append(on_depsgraph_update)
+
+    try:
+        return active_session.export()
+    except BaseException:
+        stop_watch()
+        raise
+
+def stop_watch():
+    global active_session
+
+    if on_depsgraph_update in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(on_depsgraph_update)
+
+    if bpy.app.timers.is_registered(on_watch_timer):
+        bpy.app.timers.unregister(on_watch_timer)
+
+    active_session = None
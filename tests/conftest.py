@@ -0,0 +1,17 @@
+# The add-on's bpy-free modules are imported from src, the exporter through the bpy stand-in of the benchmark.
+
+import os
+import sys
+
+import pytest
+
+CONST_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(CONST_ROOT, "src"), os.path.join(CONST_ROOT, "bench")]
+
+@pytest.fixture(scope="session")
+def exporter():
+    import fake_blender
+    fake_blender.install()
+
+    from BlenderCas2Exporter import exporter
+    return exporter
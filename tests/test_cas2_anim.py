@@ -0,0 +1,85 @@
+import numpy as np
+
+from BlenderCas2Exporter.cas2_anim import (
+    lerp,
+    slerp,
+    make_quaternions_continuous,
+    reduce_translation_keys,
+    reduce_rotation_keys,
+    rotation_distance,
+)
+
+def interpolate_kept(values, kept, interpolate):
+    # Every frame of one track rebuilt from its kept keys, the way the game plays them back
+    frames = np.flatnonzero(kept)
+    ends = np.searchsorted(frames, np.arange(len(values)), side='left')
+    ends = np.clip(ends, 1, len(frames) - 1)
+    starts = frames[ends - 1]
+    ends = frames[ends]
+    t = np.clip((np.arange(len(values)) - starts) / (ends - starts), 0.0, 1.0)
+    return interpolate(values[starts], values[ends], t)
+
+def axis_rotations(angles):
+    # (frames,) angles about z -> (frames, 4) x, y, z, w quaternions
+    quaternions = np.zeros((len(angles), 4))
+    quaternions[:, 2] = np.sin(np.asarray(angles) / 2.0)
+    quaternions[:, 3] = np.cos(np.asarray(angles) / 2.0)
+    return quaternions
+
+def test_reduce_keys_keeps_only_the_first_key_of_constant_tracks():
+    translations = np.ones((10, 2, 3))
+    kept = reduce_translation_keys(translations, 1.0e-4)
+
+    assert kept[:, 0].tolist() == [True] + [False] * 9
+    assert kept[:, 1].tolist() == [True] + [False] * 9
+
+def test_reduce_keys_keeps_the_ends_of_linear_tracks():
+    translations = np.zeros((20, 1, 3))
+    translations[:, 0, 0] = np.linspace(0.0, 5.0, 20)
+    kept = reduce_translation_keys(translations, 1.0e-4)
+
+    assert np.flatnonzero(kept[:, 0]).tolist() == [0, 19]
+
+def test_reduce_keys_keeps_corners():
+    translations = np.zeros((21, 1, 3))
+    translations[:, 0, 1] = 10.0 - np.abs(np.arange(21) - 10.0)
+    kept = reduce_translation_keys(translations, 1.0e-4)
+
+    assert np.flatnonzero(kept[:, 0]).tolist() == [0, 10, 20]
+
+def test_reduce_keys_reproduce_every_frame_within_tolerance():
+    rng = np.random.default_rng(0)
+    translations = np.cumsum(rng.normal(0.0, 0.1, (200, 3, 3)), axis=0)
+    tolerance = 0.05
+    kept = reduce_translation_keys(translations, tolerance)
+
+    assert np.count_nonzero(kept) < kept.size
+    for track in range(translations.shape[1]):
+        rebuilt = interpolate_kept(translations[:, track], kept[:, track], lerp)
+        assert np.all(np.linalg.norm(rebuilt - translations[:, track], axis=-1) <= tolerance)
+
+def test_reduce_rotation_keys_keeps_the_ends_of_constant_speed_rotations():
+    rotations = axis_rotations(np.linspace(0.0, 2.0, 30))[:, None]
+    kept = reduce_rotation_keys(make_quaternions_continuous(rotations), 1.0e-4)
+
+    assert np.flatnonzero(kept[:, 0]).tolist() == [0, 29]
+
+def test_reduce_rotation_keys_reproduce_every_frame_within_tolerance():
+    rotations = axis_rotations(np.sin(np.linspace(0.0, 6.0, 100)) * 3.0)[:, None]
+    tolerance = 0.01
+    kept = reduce_rotation_keys(make_quaternions_continuous(rotations), tolerance)
+
+    rebuilt = interpolate_kept(rotations[:, 0], kept[:, 0], slerp)
+    assert np.all(rotation_distance(rebuilt, rotations[:, 0]) <= tolerance + 1.0e-9)
+
+def test_reduce_keys_of_a_single_frame():
+    kept = reduce_translation_keys(np.zeros((1, 4, 3)), 1.0e-4)
+
+    assert kept.tolist() == [[True] * 4]
+
+def test_make_quaternions_continuous_flips_into_the_previous_hemisphere():
+    rotations = axis_rotations([0.0, 0.1, 0.2])[:, None]
+    rotations[1] *= -1.0
+    rotations = make_quaternions_continuous(rotations)
+
+    assert np.all(np.sum(rotations[1:] * rotations[:-1], axis=-1) > 0.0)
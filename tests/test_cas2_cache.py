@@ -0,0 +1,59 @@
+import os
+
+from BlenderCas2Exporter.cas2_cache import BlockCache
+
+def test_cache_round_trip(tmp_path):
+    cache = BlockCache(str(tmp_path), 1000)
+    cache.put("a", b"first")
+
+    assert cache.get("a") == b"first"
+    assert cache.get("b") is None
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.size() == 5
+
+def test_cache_survives_reopening(tmp_path):
+    BlockCache(str(tmp_path), 1000).put("a", b"first")
+    cache = BlockCache(str(tmp_path), 1000)
+
+    assert cache.size() == 5
+    assert cache.get("a") == b"first"
+
+def test_cache_evicts_least_recently_used_first(tmp_path):
+    cache = BlockCache(str(tmp_path), 10)
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    # Explicit times, puts and gets in a row may share a clock tick
+    cache.entries["a"][1] = 2.0
+    cache.entries["b"][1] = 1.0
+    cache.put("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.get("c") == b"cccc"
+    assert cache.size() <= 10
+    assert not os.path.exists(cache.entry_path("b"))
+
+def test_cache_evicts_by_file_time_when_reopened_smaller(tmp_path):
+    cache = BlockCache(str(tmp_path), 100)
+    for i, key in enumerate(["old", "new"]):
+        cache.put(key, b"0123456789")
+        os.utime(cache.entry_path(key), (1000.0 + i, 1000.0 + i))
+
+    cache = BlockCache(str(tmp_path), 15)
+    assert list(cache.entries) == ["new"]
+
+def test_cache_skips_blocks_larger_than_the_cache(tmp_path):
+    cache = BlockCache(str(tmp_path), 4)
+    cache.put("a", b"too large")
+
+    assert cache.get("a") is None
+    assert os.listdir(str(tmp_path)) == []
+
+def test_cache_discard_counts_a_miss(tmp_path):
+    cache = BlockCache(str(tmp_path), 1000)
+    cache.put("a", b"stale")
+    cache.get("a")
+    cache.discard("a")
+
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.get("a") is None
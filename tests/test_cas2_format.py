@@ -0,0 +1,56 @@
+import numpy as np
+
+from BlenderCas2Exporter.cas2_format import (
+    BlockSchema,
+    NODE_HEADER_SCHEMA,
+    QUAT_VEC3_TRANSFORM_SCHEMA,
+    BONE_WEIGHT_DTYPE,
+    vertex_data_rigid_dtype,
+    vertex_data_weighted_dtype,
+    encode_weighted_vertices,
+)
+
+def test_block_schema_round_trip():
+    schema = BlockSchema(("count", 'I'), ("offset", 'i'), ("scale", 'f'), ("padding", '8x'), ("vector", '3f'))
+    buffer = bytearray(schema.size() + 4)
+
+    assert schema.size() == 4 + 4 + 4 + 8 + 12
+    # Values are written flat, read groups the multi-value fields
+    assert schema.write(buffer, 4, 7, -3, 0.5, 1.0, 2.0, 3.0) == len(buffer)
+    assert schema.read(buffer, 4) == {"count": 7, "offset": -3, "scale": 0.5, "vector": (1.0, 2.0, 3.0)}
+
+def test_block_schema_is_little_endian():
+    buffer = bytearray(NODE_HEADER_SCHEMA.size())
+    NODE_HEADER_SCHEMA.write(buffer, 0, 0x01020304, 5)
+
+    assert bytes(buffer) == bytes([4, 3, 2, 1, 5, 0, 0, 0])
+
+def test_quat_vec3_transform_schema_groups_components():
+    buffer = bytearray(QUAT_VEC3_TRANSFORM_SCHEMA.size())
+    QUAT_VEC3_TRANSFORM_SCHEMA.write(buffer, 0, 0.0, 0.0, 0.0, 1.0, 1.0, 2.0, 3.0)
+
+    assert QUAT_VEC3_TRANSFORM_SCHEMA.read(buffer, 0) == {"rotation": (0.0, 0.0, 0.0, 1.0), "translation": (1.0, 2.0, 3.0)}
+
+def test_vertex_data_sizes():
+    # position, normal, color, tex_coords_count, tex_coords as VEC3, unknown
+    assert vertex_data_rigid_dtype(0).itemsize == 4 * (3 + 3 + 4 + 1 + 1)
+    assert vertex_data_rigid_dtype(2).itemsize == vertex_data_rigid_dtype(0).itemsize + 2 * 12
+    # ... then bones_count, the weights and a second position and normal
+    assert vertex_data_weighted_dtype(2, 3).itemsize == vertex_data_rigid_dtype(2).itemsize + 4 + 3 * BONE_WEIGHT_DTYPE.itemsize + 24
+
+def test_encode_weighted_vertices_drops_unused_weights():
+    vertices = np.zeros(3, dtype=vertex_data_weighted_dtype(1, 4))
+    vertices["position"] = np.arange(9, dtype=np.float32).reshape(3, 3)
+    vertices["position_2"] = vertices["position"]
+    vertices["bones_count"] = [1, 4, 0]
+    vertices["bone_weights"]["bone_id"] = np.arange(12).reshape(3, 4)
+    vertices["bone_weights"]["weight"] = 0.25
+
+    data = encode_weighted_vertices(vertices)
+    row_size = vertex_data_weighted_dtype(1, 0).itemsize
+    assert len(data) == 3 * row_size + (1 + 4) * BONE_WEIGHT_DTYPE.itemsize
+
+    # The second vertex starts right after the one weight of the first
+    second = np.frombuffer(data.tobytes(), dtype=vertex_data_weighted_dtype(1, 4), count=1, offset=row_size + BONE_WEIGHT_DTYPE.itemsize)
+    assert second["position"].tolist() == [[3.0, 4.0, 5.0]]
+    assert second["bone_weights"]["bone_id"].tolist() == [[4, 5, 6, 7]]
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+import fake_blender
+from BlenderCas2Exporter.cas2_index import Cas2Index, IndexedCas2File, index_filepath, load_index
+from BlenderCas2Exporter.cas2_reader import Cas2File
+
+def write_indexed_file(exporter, path, names):
+    # Streams the blocks like write_cas2 does with write_index, then writes the index next to the file
+    models = [exporter.ModelNode(fake_blender.build_grid_mesh(name, 50 * (i + 1), 1, 2), exporter.ExportSettings()) for i, name in enumerate(names)]
+    blocks = [exporter.Cas2Header("test"), exporter.SceneInfoBlock(), exporter.KeyFramesBlock1(), exporter.KeyFramesBlock2()]
+    blocks += exporter.number_nodes(models, 1)
+
+    index = Cas2Index()
+    with open(path, 'wb') as file:
+        exporter.stream_blocks(file, blocks, exporter.ExportStats(), index)
+
+    index.write(index_filepath(str(path)))
+    return str(path), index, models
+
+def test_index_filepath():
+    assert index_filepath("/tmp/scene.cs2") == "/tmp/scene.index.json"
+
+def test_index_finds_every_node(exporter, tmp_path):
+    filepath, index, models = write_indexed_file(exporter, tmp_path / "scene.cs2", ["A", "B", "C"])
+
+    assert index.file_size == (tmp_path / "scene.cs2").stat().st_size
+    assert [entry.name for entry in index.entries] == ["A", "B", "C"]
+    assert [entry.triangles_count for entry in index.entries] == [model.counts()["triangles_count"] for model in models]
+
+    with Cas2File(filepath) as cas2_file, IndexedCas2File(filepath) as indexed_file:
+        for node in cas2_file.nodes:
+            entry = indexed_file.index.find(node.name)
+            assert (entry.offset, entry.size, entry.node_type) == (node.offset, node.block_size, node.node_type.name)
+
+            indexed_node = indexed_file.find_node(node.name, verify_hash=True)
+            assert bytes(indexed_node.data()) == bytes(node.data())
+            assert indexed_node.geometry_data[0].vertices.tobytes() == node.geometry_data[0].vertices.tobytes()
+
+        assert indexed_file.find_node("Missing") is None
+
+def test_index_round_trip(exporter, tmp_path):
+    filepath, index, _ = write_indexed_file(exporter, tmp_path / "scene.cs2", ["A", "B"])
+    loaded = load_index(index_filepath(filepath))
+
+    assert loaded.to_dict() == index.to_dict()
+
+def test_index_rejects_changed_files(exporter, tmp_path):
+    filepath, _, _ = write_indexed_file(exporter, tmp_path / "scene.cs2", ["A", "B"])
+    data = bytearray((tmp_path / "scene.cs2").read_bytes())
+
+    # Same size, different bytes: only the hash notices
+    data[-8] ^= 0xFF
+    (tmp_path / "scene.cs2").write_bytes(data)
+    with IndexedCas2File(filepath) as indexed_file:
+        indexed_file.find_node("B")
+        with pytest.raises(ValueError):
+            indexed_file.find_node("B", verify_hash=True)
+
+    (tmp_path / "scene.cs2").write_bytes(data + b"\0")
+    with pytest.raises(ValueError):
+        IndexedCas2File(filepath)
+
+def test_index_rejects_other_versions(exporter, tmp_path):
+    filepath, index, _ = write_indexed_file(exporter, tmp_path / "scene.cs2", ["A"])
+    data = index.to_dict()
+    data["version"] += 1
+    with open(index_filepath(filepath), 'w', encoding='utf-8') as file:
+        json.dump(data, file)
+
+    with pytest.raises(ValueError):
+        load_index(index_filepath(filepath))
@@ -0,0 +1,184 @@
+import numpy as np
+
+from BlenderCas2Exporter.cas2_format import vertex_data_rigid_dtype
+from BlenderCas2Exporter.cas2_mesh import MeshArrays, weld_vertices, count_cache_misses, optimize_vertex_cache, find_degenerate_triangles, process_mesh_arrays, calc_tangents
+
+def make_grid_triangles(columns, rows):
+    # Two triangles per cell of a columns x rows grid of quads
+    corners = np.arange((columns + 1) * (rows + 1)).reshape(rows + 1, columns + 1)
+    a, b, c, d = corners[:-1, :-1].ravel(), corners[:-1, 1:].ravel(), corners[1:, 1:].ravel(), corners[1:, :-1].ravel()
+    return np.concatenate([np.stack([a, b, c], axis=1), np.stack([a, c, d], axis=1)]).astype(np.uint32)
+
+def make_vertices(positions, uv_channels_count = 1):
+    vertices = np.zeros(len(positions), dtype=vertex_data_rigid_dtype(uv_channels_count))
+    vertices["position"] = positions
+    vertices["normal"] = (0.0, 0.0, 1.0)
+    vertices["color"] = 1.0
+    vertices["tex_coords_count"] = uv_channels_count
+    return vertices
+
+def test_weld_vertices_merges_identical_vertices_in_first_use_order():
+    vertices = make_vertices([(1, 0, 0), (0, 1, 0), (1, 0, 0), (0, 0, 1), (0, 1, 0)])
+    welded, remap = weld_vertices(vertices)
+
+    assert welded["position"].tolist() == [[1, 0, 0], [0, 1, 0], [0, 0, 1]]
+    assert remap.tolist() == [0, 1, 0, 2, 1]
+    assert np.array_equal(welded[remap], vertices)
+
+def test_weld_vertices_keeps_vertices_differing_in_any_attribute():
+    vertices = make_vertices([(1, 0, 0), (1, 0, 0), (1, 0, 0)])
+    vertices["normal"][1] = (0.0, 1.0, 0.0)
+    vertices["tex_coords"][2, 0] = (0.5, 0.5, 0.0)
+    welded, remap = weld_vertices(vertices)
+
+    assert len(welded) == 3
+    assert remap.tolist() == [0, 1, 2]
+
+def test_weld_vertices_merges_negative_zero():
+    vertices = make_vertices([(0, 0, 0), (0, 0, 0)])
+    vertices["normal"][1] = (-0.0, -0.0, 1.0)
+    welded, remap = weld_vertices(vertices)
+
+    assert len(welded) == 1
+    assert remap.tolist() == [0, 0]
+
+def test_weld_vertices_with_epsilon_merges_nearby_floats_only():
+    vertices = make_vertices([(1.0, 0, 0), (1.0 + 1.0e-6, 0, 0), (1.1, 0, 0)])
+    vertices["tex_coords_count"][1] = 2
+    welded, remap = weld_vertices(vertices, 1.0e-4)
+    assert remap.tolist() == [0, 1, 2] # the counts are compared exactly
+
+    vertices["tex_coords_count"][1] = 1
+    welded, remap = weld_vertices(vertices, 1.0e-4)
+    assert remap.tolist() == [0, 0, 1]
+    assert welded["position"][0, 0] == np.float32(1.0)
+
+def test_weld_vertices_empty():
+    welded, remap = weld_vertices(make_vertices(np.zeros((0, 3))))
+
+    assert len(welded) == 0
+    assert len(remap) == 0
+
+def make_mesh_arrays(triangle_positions, material_indices):
+    # Unwelded corners with flat normals, as extracted
+    arrays = MeshArrays()
+    arrays.positions = np.asarray(triangle_positions, dtype=np.float32).reshape(-1, 3)
+    arrays.normals = np.zeros_like(arrays.positions)
+    arrays.normals[:, 2] = 1.0
+    arrays.colors = np.ones((len(arrays.positions), 4), dtype=np.float32)
+    arrays.material_indices = np.asarray(material_indices, dtype=np.int32)
+    return arrays
+
+def sorted_triangles(triangles):
+    return sorted(map(tuple, triangles.tolist()))
+
+def test_optimize_vertex_cache_reorders_without_changing_triangles():
+    triangles = make_grid_triangles(20, 20)
+    optimized, misses = optimize_vertex_cache(triangles)
+
+    # Whole triangles move, their winding stays
+    assert sorted_triangles(optimized) == sorted_triangles(triangles)
+    assert misses == count_cache_misses(optimized)
+
+def test_optimize_vertex_cache_reduces_misses():
+    triangles = make_grid_triangles(40, 40)
+    shuffled = triangles[np.random.default_rng(0).permutation(len(triangles))]
+    optimized, misses = optimize_vertex_cache(shuffled)
+
+    assert misses < count_cache_misses(shuffled)
+    assert misses < count_cache_misses(triangles)
+    # A grid has one vertex per two triangles, without any reuse it would take three
+    assert misses / len(triangles) < 1.0
+
+def test_optimize_vertex_cache_counts_misses_for_any_cache_size():
+    triangles = make_grid_triangles(15, 10)
+    for cache_size in (3, 8, 32):
+        optimized, misses = optimize_vertex_cache(triangles, cache_size)
+        assert misses == count_cache_misses(optimized, cache_size)
+
+def test_optimize_vertex_cache_small_inputs():
+    empty = np.zeros((0, 3), dtype=np.uint32)
+    assert optimize_vertex_cache(empty)[1] == 0
+
+    triangle = np.array([[4, 5, 6]], dtype=np.uint32)
+    optimized, misses = optimize_vertex_cache(triangle)
+    assert optimized.tolist() == [[4, 5, 6]]
+    assert misses == 3
+
+def test_find_degenerate_triangles():
+    vertices = make_vertices([(0, 0, 0), (1, 0, 0), (0, 1, 0), (2, 0, 0), (0, 0, 0)])
+    triangles = np.array([
+        [0, 1, 2], # regular
+        [0, 1, 3], # collinear
+        [0, 4, 1], # two corners at the same position
+        [2, 2, 2], # one vertex
+    ], dtype=np.uint32)
+
+    assert find_degenerate_triangles(vertices, triangles).tolist() == [False, True, True, True]
+
+def test_process_mesh_arrays_strips_degenerate_triangles_and_unused_vertices():
+    arrays = make_mesh_arrays([
+        [(0, 0, 0), (1, 0, 0), (0, 1, 0)],
+        [(5, 0, 0), (6, 0, 0), (7, 0, 0)],
+        [(1, 0, 0), (1, 1, 0), (0, 1, 0)],
+    ], [0, 0, 0])
+    processed = process_mesh_arrays(arrays, 1, True, 0.0, strip=True)
+
+    assert processed.degenerate_triangles_count == 1
+    assert processed.unused_vertices_count == 3
+    # Welded and renumbered in the order the triangles first use them
+    assert processed.vertices["position"].tolist() == [[0, 0, 0], [1, 0, 0], [0, 1, 0], [1, 1, 0]]
+    assert [triangles.tolist() for _, triangles in processed.sub_meshes] == [[[0, 1, 2], [1, 3, 2]]]
+
+def test_process_mesh_arrays_keeps_triangles_past_the_last_material():
+    arrays = make_mesh_arrays([
+        [(0, 0, 0), (1, 0, 0), (0, 1, 0)],
+        [(1, 0, 0), (1, 1, 0), (0, 1, 0)],
+        [(0, 1, 0), (1, 1, 0), (0, 2, 0)],
+    ], [0, 1, 3])
+    processed = process_mesh_arrays(arrays, 2, True, 0.0, strip=True)
+
+    assert [(material_index, len(triangles)) for material_index, triangles in processed.sub_meshes] == [(0, 1), (1, 2)]
+
+def make_quad_arrays(uv_scale_u = 1.0):
+    # A unit quad in the xy plane as two triangles, u along x and v along y
+    arrays = make_mesh_arrays([
+        [(0, 0, 0), (1, 0, 0), (1, 1, 0)],
+        [(0, 0, 0), (1, 1, 0), (0, 1, 0)],
+    ], [0, 0])
+    uvs = arrays.positions[:, :2].copy()
+    uvs[:, 0] *= uv_scale_u
+    arrays.uvs = [uvs]
+    return arrays
+
+def test_calc_tangents_follow_the_uv_directions():
+    arrays = make_quad_arrays()
+    tangents, bitangents = calc_tangents(arrays.positions, arrays.normals, arrays.uvs[0])
+
+    assert np.allclose(tangents, (1.0, 0.0, 0.0))
+    assert np.allclose(bitangents, (0.0, 1.0, 0.0))
+
+def test_calc_tangents_flip_the_bitangent_of_mirrored_uvs():
+    arrays = make_quad_arrays(-1.0)
+    tangents, bitangents = calc_tangents(arrays.positions, arrays.normals, arrays.uvs[0])
+
+    # The tangent still points along +u, which is -x now, the frame stays orthonormal
+    assert np.allclose(tangents, (-1.0, 0.0, 0.0))
+    assert np.allclose(bitangents, (0.0, 1.0, 0.0))
+    assert np.allclose(np.sum(tangents * arrays.normals, axis=1), 0.0)
+
+def test_calc_tangents_without_uv_area_stay_in_the_normal_plane():
+    arrays = make_quad_arrays(0.0)
+    tangents, bitangents = calc_tangents(arrays.positions, arrays.normals, arrays.uvs[0])
+
+    assert np.allclose(np.linalg.norm(tangents, axis=1), 1.0)
+    assert np.allclose(np.sum(tangents * arrays.normals, axis=1), 0.0)
+    assert np.allclose(np.sum(bitangents * tangents, axis=1), 0.0)
+
+def test_process_mesh_arrays_stores_tangents_after_the_uvs():
+    processed = process_mesh_arrays(make_quad_arrays(), 1, True, 0.0, tangents=True)
+
+    assert len(processed.vertices) == 4
+    assert processed.vertices["tex_coords_count"].tolist() == [3] * 4
+    assert np.allclose(processed.vertices["tex_coords"][:, 1], (1.0, 0.0, 0.0))
+    assert np.allclose(processed.vertices["tex_coords"][:, 2], (0.0, 1.0, 0.0))
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import fake_blender
+from BlenderCas2Exporter.cas2_format import NodeType
+from BlenderCas2Exporter.cas2_mesh import MeshArrays, process_mesh_arrays
+from BlenderCas2Exporter.cas2_reader import Cas2File
+
+def write_file(exporter, path, nodes):
+    # The blocks write_cas2 puts before the nodes, without the scene root which needs a scene
+    blocks = [exporter.Cas2Header("test"), exporter.SceneInfoBlock(), exporter.KeyFramesBlock1(), exporter.KeyFramesBlock2()]
+    blocks += exporter.number_nodes(nodes, 1)
+    path.write_bytes(exporter.encode_blocks(blocks))
+    return str(path)
+
+def make_weighted_model(exporter, name):
+    # A rigid model whose geometry is swapped for skinned vertices with one to three bones each
+    model = exporter.ModelNode(fake_blender.build_grid_mesh(name, 8, 1, 1), exporter.ExportSettings())
+    geometry = model.geometry_data[0]
+
+    arrays = MeshArrays()
+    arrays.positions = np.random.default_rng(1).random((24, 3), dtype=np.float32)
+    arrays.normals = np.zeros_like(arrays.positions)
+    arrays.colors = np.ones((24, 4), dtype=np.float32)
+    arrays.uvs = [arrays.positions[:, :2].copy()]
+    arrays.material_indices = np.zeros(8, dtype=np.int32)
+    arrays.bone_ids = np.arange(24 * 3, dtype=np.uint32).reshape(24, 3) % 5
+    arrays.bone_weights = np.zeros((24, 3), dtype=np.float32)
+    for influences in range(1, 4):
+        arrays.bone_weights[influences - 1::3, :influences] = 1.0 / influences
+
+    model.node_type = NodeType.WEIGHTED_MODEL
+    geometry.weighted = True
+    geometry.apply_processed_mesh(process_mesh_arrays(arrays, 1, True, 0.0))
+    return model
+
+def test_rigid_model_round_trip(exporter, tmp_path):
+    model = exporter.ModelNode(fake_blender.build_grid_mesh("Grid", 200, 2, 3), exporter.ExportSettings())
+    geometry = model.geometry_data[0]
+    filepath = write_file(exporter, tmp_path / "rigid.cs2", [model])
+
+    with Cas2File(filepath) as cas2_file:
+        assert "test" in cas2_file.file_details
+        assert [node.name for node in cas2_file.nodes] == ["Grid"]
+
+        node = cas2_file.find_node("Grid")
+        assert node.node_type == NodeType.RIGID_MODEL
+        assert node.node_index == 1
+        assert node.block_size == model.size()
+        assert len(node.geometry_data) == 1
+
+        view = node.geometry_data[0]
+        assert view.uv_channels.tolist() == list(geometry.uv_channels.values())
+        assert view.vertices.tobytes() == geometry.vertices.tobytes()
+        assert [submesh.material_id for submesh in view.sub_meshes] == [submesh.materialId for submesh in geometry.sub_meshes]
+        for submesh_view, submesh in zip(view.sub_meshes, geometry.sub_meshes):
+            assert np.array_equal(submesh_view.triangles, submesh.triangles)
+        assert view.triangles_count() == 200
+
+def test_weighted_model_round_trip(exporter, tmp_path):
+    model = make_weighted_model(exporter, "Skinned")
+    rigid_model = exporter.ModelNode(fake_blender.build_grid_mesh("Rigid", 2, 0, 1), exporter.ExportSettings())
+    filepath = write_file(exporter, tmp_path / "weighted.cs2", [rigid_model, model])
+
+    with Cas2File(filepath) as cas2_file:
+        assert [node.name for node in cas2_file.nodes_of_type(NodeType.WEIGHTED_MODEL)] == ["Skinned"]
+
+        vertices = cas2_file.find_node("Skinned").geometry_data[0].vertices
+        expected = model.geometry_data[0].vertices
+        assert vertices["bones_count"].tolist() == expected["bones_count"].tolist()
+        assert np.array_equal(vertices["position_2"], expected["position_2"])
+        # Weights past bones_count are not stored and come back as zero
+        used = np.arange(3) < expected["bones_count"][:, None]
+        assert np.array_equal(vertices["bone_weights"][used], expected["bone_weights"][used])
+        assert not np.any(vertices["bone_weights"]["weight"][~used])
+
+def test_rejects_files_that_are_not_cs2(tmp_path):
+    empty = tmp_path / "empty.cs2"
+    empty.write_bytes(b"")
+    other = tmp_path / "other.cs2"
+    other.write_bytes(b"not a cs2 file at all")
+
+    for path in (empty, other):
+        with pytest.raises(ValueError):
+            Cas2File(str(path))
+
+def test_rejects_truncated_nodes(exporter, tmp_path):
+    model = exporter.ModelNode(fake_blender.build_grid_mesh("Grid", 20, 1, 1), exporter.ExportSettings())
+    filepath = tmp_path / "truncated.cs2"
+    write_file(exporter, filepath, [model])
+    filepath.write_bytes(filepath.read_bytes()[:-16])
+
+    with Cas2File(str(filepath)) as cas2_file:
+        with pytest.raises(ValueError):
+            cas2_file.nodes